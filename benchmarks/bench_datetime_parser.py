@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+日期时间解析基准测试
+
+对比原先先调用dateutil的解析方式与utils/datetime_parser.py中
+预编译正则快速路径、自然语言语法（utils/time_grammar.py）在常用输入上
+的每秒解析次数（含缓存/不含缓存）。原实现无法解析自然语言表达式，
+对应一列为其报错返回None的耗时。
+
+运行: python benchmarks/bench_datetime_parser.py [每组次数]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil import parser
+from utils import datetime_parser, time_grammar
+
+SAMPLES = ["2024-12-25 18:00", "12-25 14:30", "18:00", "2024-12-25", "2024/12/25 18:00:30",
+           "明天下午3点半", "3小时后", "下周一 9:30", "tomorrow 9am", "in 20 minutes"]
+
+
+def legacy_parse(date_str):
+    """原实现：先交给dateutil，失败再逐个尝试strptime"""
+    if not date_str:
+        return None
+    try:
+        return parser.parse(date_str)
+    except (ValueError, TypeError):
+        for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d', '%m-%d %H:%M', '%H:%M'):
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+        return None
+
+
+def uncached_parse(date_str):
+    now = datetime.now()
+    expression = time_grammar.parse_expression.__wrapped__(date_str.strip())
+    if expression is not None:
+        return expression.resolve(now)
+    return datetime_parser._parse_cached.__wrapped__(date_str.strip(), now.date())
+
+
+def rate(func, text: str, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func(text)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'输入':<22} {'原实现':>10} {'新实现':>10} {'带缓存':>10}   (次/秒)")
+    for text in SAMPLES:
+        legacy = rate(legacy_parse, text, count)
+        fast = rate(uncached_parse, text, count)
+        cached = rate(datetime_parser.parse_datetime, text, count)
+        print(f"{text:<22} {legacy:>10.0f} {fast:>10.0f} {cached:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
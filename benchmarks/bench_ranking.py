@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+任务紧急度排序基准测试
+
+对比纯Python排序键与NumPy向量化实现在不同任务数下的全量排序和
+top-K耗时，用于确定utils/ranking.py中VECTORIZE_MIN_TASKS的交叉点。
+
+运行: python benchmarks/bench_ranking.py [最大任务数]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.task import Task
+from utils import ranking
+
+
+def make_tasks(count: int, now: datetime):
+    rng = random.Random(count)
+    return [Task(i, f"任务{i}", priority=rng.choice(["高", "中", "低", None]),
+                 due_date=now + timedelta(minutes=rng.randint(-3 * 1440, 90 * 1440))
+                 if rng.random() < 0.8 else None)
+            for i in range(count)]
+
+
+def best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    max_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    if ranking._numpy() is None:
+        print("未安装numpy，无法对比")
+        return
+
+    now = datetime.now()
+    sizes = [size for size in (100, 1000, 2000, 5000, 10000, 100000, 1000000) if size <= max_count]
+    print(f"{'任务数':>8} {'Python排序':>12} {'NumPy排序':>12} {'Python top10':>13} {'NumPy top10':>12}")
+    crossover = None
+    for size in sizes:
+        tasks = make_tasks(size, now)
+        repeat = 5 if size <= 100000 else 1
+        py_rank = best_of(lambda: ranking.rank_tasks(tasks, now, vectorize=False), repeat)
+        np_rank = best_of(lambda: ranking.rank_tasks(tasks, now, vectorize=True), repeat)
+        py_top = best_of(lambda: ranking.top_tasks(tasks, 10, now, vectorize=False), repeat)
+        np_top = best_of(lambda: ranking.top_tasks(tasks, 10, now, vectorize=True), repeat)
+        print(f"{size:>8} {py_rank * 1000:>10.2f}ms {np_rank * 1000:>10.2f}ms "
+              f"{py_top * 1000:>11.2f}ms {np_top * 1000:>10.2f}ms")
+        if crossover is None and np_rank < py_rank:
+            crossover = size
+    print(f"NumPy全量排序开始更快的任务数: {crossover}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+提醒调度后端基准测试
+
+对比内置堆调度器与APScheduler在大量一次性提醒任务下的
+添加、重新调度、删除耗时，以及模块导入耗时。
+
+运行: python benchmarks/bench_scheduler.py [任务数]
+"""
+
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.scheduler_backends import create_scheduler
+
+
+def noop(task_id):
+    pass
+
+
+def import_time(module: str) -> float:
+    """在新进程中测量导入模块的耗时（秒）"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+    return float(output)
+
+
+def bench_backend(name: str, count: int):
+    scheduler = create_scheduler(name)
+    scheduler.start()
+    base = datetime.now() + timedelta(days=1)
+
+    start = time.perf_counter()
+    for i in range(count):
+        scheduler.add_date_job(f"reminder_{i}", base + timedelta(seconds=i), noop, args=(i,))
+    added = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(count):
+        scheduler.add_date_job(f"reminder_{i}", base + timedelta(seconds=count - i), noop, args=(i,))
+    rescheduled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(count):
+        scheduler.remove_job(f"reminder_{i}")
+    removed = time.perf_counter() - start
+
+    scheduler.shutdown()
+    print(f"{name:<12} 添加 {added * 1000:>9.1f} ms   重新调度 {rescheduled * 1000:>9.1f} ms   "
+          f"删除 {removed * 1000:>9.1f} ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"任务数: {count}")
+    bench_backend('heap', count)
+    try:
+        import apscheduler  # noqa: F401
+    except ImportError:
+        print("未安装apscheduler，跳过对比")
+        return
+    bench_backend('apscheduler', count)
+
+    print(f"导入耗时: managers.scheduler_backends {import_time('managers.scheduler_backends') * 1000:.1f} ms, "
+          f"apscheduler.schedulers.background "
+          f"{import_time('apscheduler.schedulers.background') * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Task模型构造与内存占用基准测试
+
+对比旧实现（sqlite3.Row -> dict -> 普通类Task(**data)）与
+带__slots__的Task + 元组行工厂的构造耗时和内存占用。Task的时间字段
+在首次访问时才解码，另外测量读取后访问全部时间字段的总耗时。
+
+运行: python benchmarks/bench_task_model.py [任务数]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.task_manager import TASK_COLUMNS, task_row_factory
+from utils.timestamps import to_epoch, from_epoch
+
+
+class LegacyTask:
+    """旧版带__dict__的Task，用于对比"""
+    def __init__(self, id=None, content="", status="pending", priority=None,
+                 due_date=None, reminder_time=None, created_at=None, recurrence=None):
+        self.id = id
+        self.content = content
+        self.status = status
+        self.priority = priority
+        self.due_date = due_date
+        self.reminder_time = reminder_time
+        self.created_at = created_at or datetime.now()
+        self.recurrence = recurrence
+
+
+def legacy_load(conn):
+    conn.row_factory = sqlite3.Row
+    tasks = []
+    for row in conn.execute(f'SELECT {TASK_COLUMNS} FROM tasks'):
+        task_data = dict(row)
+        task_data['due_date'] = from_epoch(task_data['due_date'])
+        task_data['reminder_time'] = from_epoch(task_data['reminder_time'])
+        task_data['created_at'] = from_epoch(task_data['created_at'])
+        tasks.append(LegacyTask(**task_data))
+    conn.row_factory = None
+    return tasks
+
+
+def slotted_load(conn):
+    cursor = conn.cursor()
+    cursor.row_factory = task_row_factory
+    return cursor.execute(f'SELECT {TASK_COLUMNS} FROM tasks').fetchall()
+
+
+def slotted_load_decoded(conn):
+    tasks = slotted_load(conn)
+    for task in tasks:
+        task.due_date, task.reminder_time, task.created_at
+    return tasks
+
+
+def measure(name, loader, conn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(conn)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    tasks = loader(conn)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<28} {best * 1000:>9.1f} ms   {current / len(tasks):>7.0f} B/任务")
+    return best, current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE tasks (id INTEGER PRIMARY KEY, content TEXT, status TEXT, priority TEXT,
+                            due_date INTEGER, reminder_time INTEGER, created_at INTEGER, recurrence TEXT)
+    ''')
+    base = datetime.now()
+    conn.executemany(
+        'INSERT INTO tasks (content, status, priority, due_date, reminder_time, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        ((f"任务 {i}", 'completed' if i % 3 else 'pending', '高中低'[i % 3],
+          to_epoch(base + timedelta(hours=i)), to_epoch(base + timedelta(hours=i, minutes=-30)),
+          to_epoch(base - timedelta(minutes=i)))
+         for i in range(count)))
+    conn.commit()
+
+    print(f"任务数: {count}")
+    legacy_time, legacy_mem = measure("旧实现 (Row->dict->Task)", legacy_load, conn)
+    slotted_time, slotted_mem = measure("__slots__ + 元组行工厂", slotted_load, conn)
+    print(f"耗时降低 {1 - slotted_time / legacy_time:.0%}，内存降低 {1 - slotted_mem / legacy_mem:.0%}")
+    measure("同上 + 访问全部时间字段", slotted_load_decoded, conn)
+
+    conn.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,4 +8,56 @@ GLOBAL_HOTKEY = 'ctrl+shift+t'
 
 # 每日提醒时间配置
 DAILY_REMINDER_HOUR = 8
-DAILY_REMINDER_MINUTE = 0
\ No newline at end of file
+DAILY_REMINDER_MINUTE = 0
+DAILY_SUMMARY_MAX_TASKS = 10  # 每日摘要中列出的最紧急任务数
+
+# 调度后端：'heap'为内置单线程堆调度器，'apscheduler'使用APScheduler
+SCHEDULER_BACKEND = 'heap'
+
+# 提醒调度窗口：调度器只保留未来N小时内的提醒，并定期补充
+REMINDER_WINDOW_HOURS = 24
+REMINDER_REFILL_MINUTES = 60  # 必须小于调度窗口
+
+# 错过提醒补发：守护进程定期记录存活时间，重启后把停机期间错过的提醒合并为一条摘要
+HEARTBEAT_SECONDS = 60
+MISSED_REMINDER_LOOKBACK_DAYS = 7  # 只补发最近N天内错过的提醒
+
+# SQLite连接配置
+DB_JOURNAL_MODE = 'WAL'
+DB_SYNCHRONOUS = 'NORMAL'
+DB_CACHE_SIZE = -8000  # 负数表示以KiB为单位，约8MB
+DB_MMAP_SIZE = 64 * 1024 * 1024
+DB_BUSY_TIMEOUT = 5000  # 毫秒
+
+# 任务缓存配置
+TASK_CACHE_SIZE = 1000  # 按ID缓存的任务数上限
+TASK_QUERY_CACHE_SIZE = 32  # 缓存的列表查询结果数上限
+
+# 归档配置：完成超过N天的任务每天定时移入归档表
+ARCHIVE_COMPLETED_AFTER_DAYS = 30
+ARCHIVE_HOUR = 3
+ARCHIVE_MINUTE = 0
+
+# 守护进程写队列配置
+WRITE_BATCH_WINDOW = 0.005  # 秒，窗口内到达的写操作合并为一次提交
+WRITE_MAX_BATCH = 256
+WRITE_LOCK_RETRIES = 3  # 数据库被锁定时开启事务的重试次数
+
+# 守护进程RPC配置：CLI命令通过本地Unix域套接字把写操作交给守护进程
+DAEMON_SOCKET_PATH = os.path.join(os.path.dirname(__file__), 'data', 'echo.sock')
+DAEMON_RPC_TIMEOUT = 5  # 秒
+
+# 通知合并与限流：窗口内到达的提醒合并为一条摘要，每个周期最多发送N条通知
+NOTIFY_COALESCE_WINDOW = 2.0  # 秒
+NOTIFY_MAX_RATE = 5
+NOTIFY_RATE_PERIOD = 60.0  # 秒
+NOTIFY_DIGEST_MAX_LINES = 10  # 摘要中逐条列出的提醒数
+NOTIFY_MAX_PENDING = 1000  # 等待发送的提醒上限，超出时丢弃最早的
+
+# 通知分发队列：固定数量的工作线程异步显示通知
+NOTIFY_WORKERS = 2
+NOTIFY_QUEUE_SIZE = 100
+NOTIFY_QUEUE_OVERFLOW = 'drop_oldest'  # 队列满时: 'drop_oldest'、'drop_newest'或'block'
+NOTIFY_BLOCK_TIMEOUT = 1.0  # 秒，'block'策略下提交方最长等待时间
+NOTIFY_METRICS_HISTORY = 1000  # 保留最近N条通知的投递延迟记录
+NOTIFY_STOP_TIMEOUT = 5.0  # 秒，停止时等待队列投递完毕的最长时间
@@ -1,35 +1,45 @@
 import argparse
-import sys
-import threading
-from ui.cli_handler import CLIHandler
-from ui.quick_input import QuickInputWindow
-from managers.reminder_manager import ReminderManager
-from config import GLOBAL_HOTKEY
+from config import GLOBAL_HOTKEY, ARCHIVE_COMPLETED_AFTER_DAYS
 
-try:
-    import keyboard
-except ImportError:
-    keyboard = None
-    print("警告: 未安装keyboard库，全局快捷键功能不可用")
-    print("请运行: pip install keyboard")
+# 模块顶层只导入参数解析所需的内容：各子命令在执行时才导入自己用到的模块，
+# list/done等轻量命令不加载tkinter、keyboard和调度器（见tests/test_startup.py）
 
-def setup_global_hotkey():
-    """设置全局快捷键"""
-    if not keyboard:
-        return
+def setup_global_hotkey(reminder_manager=None) -> bool:
+    """设置全局快捷键，未安装keyboard库时返回False"""
+    try:
+        import keyboard
+    except ImportError:
+        print("警告: 未安装keyboard库，全局快捷键功能不可用")
+        print("请运行: pip install keyboard")
+        return False
     
     def show_quick_input():
-        quick_input = QuickInputWindow()
+        from ui.quick_input import QuickInputWindow
+        quick_input = QuickInputWindow(reminder_manager)
         quick_input.show()
     
     keyboard.add_hotkey(GLOBAL_HOTKEY, show_quick_input)
     print(f"全局快捷键已设置: {GLOBAL_HOTKEY}")
+    return True
+
+def non_negative_int(value: str) -> int:
+    """argparse参数类型：非负整数（负数的LIMIT在SQLite中表示不限制）"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的整数: {value}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"不能为负数: {value}")
+    return number
+
+def positive_int(value: str) -> int:
+    """argparse参数类型：正整数（数量上限为0时没有可显示的内容）"""
+    number = non_negative_int(value)
+    if number == 0:
+        raise argparse.ArgumentTypeError(f"必须大于0: {value}")
+    return number
 
 def main():
-    cli_handler = CLIHandler()
-    reminder_manager = ReminderManager()
-    reminder_manager.start()
-    
     parser = argparse.ArgumentParser(description='任务管理工具')
     subparsers = parser.add_subparsers(dest='command', help='可用命令')
     
@@ -37,19 +47,44 @@ def main():
     add_parser = subparsers.add_parser('add', help='添加任务')
     add_parser.add_argument('content', help='任务内容')
     add_parser.add_argument('-p', '--priority', help='优先级')
-    add_parser.add_argument('-d', '--due-date', help='截止日期 (YYYY-MM-DD HH:MM)')
-    add_parser.add_argument('-r', '--remind', help='提醒时间 (YYYY-MM-DD HH:MM)')
+    add_parser.add_argument('-d', '--due-date', help='截止日期 (YYYY-MM-DD HH:MM，或"明天 18点"等)')
+    add_parser.add_argument('-r', '--remind', help='提醒时间 (YYYY-MM-DD HH:MM，或"3小时后"等)')
+    add_parser.add_argument('-R', '--repeat',
+                            help='重复规则: daily/weekdays/weekly/monthly/yearly 或 RRULE (如 FREQ=WEEKLY;BYDAY=MO)')
     
     # list命令
-    subparsers.add_parser('list', help='列出所有任务')
+    list_parser = subparsers.add_parser('list', help='列出所有任务')
+    list_parser.add_argument('--limit', type=positive_int, help='最多显示的任务数')
+    list_parser.add_argument('--offset', type=non_negative_int, default=0, help='跳过前N个任务')
+    list_parser.add_argument('--archived', action='store_true', help='列出归档任务')
     
     # done命令
     done_parser = subparsers.add_parser('done', help='标记任务完成')
-    done_parser.add_argument('id', type=int, help='任务ID')
+    done_parser.add_argument('ids', nargs='+', help='任务ID，支持多个ID和区间 (如 3 5 10-40)')
     
     # delete命令
     delete_parser = subparsers.add_parser('delete', help='删除任务')
-    delete_parser.add_argument('id', type=int, help='任务ID')
+    delete_parser.add_argument('ids', nargs='+', help='任务ID，支持多个ID和区间 (如 3 5 10-40)')
+    
+    # archive命令 - 归档已完成任务
+    archive_parser = subparsers.add_parser('archive', help='归档已完成任务')
+    archive_parser.add_argument('--days', type=int, default=ARCHIVE_COMPLETED_AFTER_DAYS,
+                                help=f'归档完成超过N天的任务 (默认 {ARCHIVE_COMPLETED_AFTER_DAYS})')
+    
+    # restore命令 - 从归档中恢复任务
+    restore_parser = subparsers.add_parser('restore', help='从归档中恢复任务')
+    restore_parser.add_argument('ids', nargs='+', help='任务ID，支持多个ID和区间 (如 3 5 10-40)')
+    
+    # search命令 - 全文搜索任务
+    search_parser = subparsers.add_parser('search', help='搜索任务')
+    search_parser.add_argument('query', help='搜索关键词，多个词以空格分隔')
+    search_parser.add_argument('-n', '--limit', type=positive_int, default=20, help='最多显示的结果数')
+    
+    # batch命令 - 从标准输入或文件批量执行操作
+    batch_parser = subparsers.add_parser('batch', help='批量执行操作（每行一条命令或一个JSON对象）')
+    batch_parser.add_argument('file', nargs='?', default='-', help='输入文件，默认或"-"为标准输入')
+    batch_parser.add_argument('--continue-on-error', action='store_true',
+                              help='跳过无效或出错的行，其余照常提交（默认任何错误都回滚全部操作）')
     
     # today命令 - 显示今日任务摘要
     subparsers.add_parser('today', help='显示今日任务摘要')
@@ -58,7 +93,7 @@ def main():
     subparsers.add_parser('show', help='打开任务管理界面')
     
     # daemon命令 - 启动后台监听
-    subparsers.add_parser('daemon', help='启动后台快捷键监听')
+    subparsers.add_parser('daemon', help='启动后台服务（提醒调度、快捷键监听）')
     
     args = parser.parse_args()
     
@@ -66,33 +101,74 @@ def main():
         parser.print_help()
         return
     
+    if args.command == 'daemon':
+        run_daemon()
+        return
+    
+    # 普通命令不启动调度器，写操作交给正在运行的守护进程，未运行时直接访问数据库
+    from managers.rpc import RPCClient
+    from ui.cli_handler import CLIHandler, parse_id_ranges
+    cli_handler = CLIHandler(daemon=RPCClient())
+    
     if args.command == 'add':
-        task = cli_handler.add_task(args.content, args.priority, args.due_date, args.remind)
-        if task and task.reminder_time:
-            reminder_manager.add_reminder(task)
+        cli_handler.add_task(args.content, args.priority, args.due_date, args.remind, args.repeat)
     elif args.command == 'list':
-        cli_handler.list_tasks()
-    elif args.command == 'done':
-        cli_handler.mark_done(args.id)
-    elif args.command == 'delete':
-        cli_handler.delete_task(args.id)
+        cli_handler.list_tasks(args.limit, args.offset, args.archived)
+    elif args.command in ('done', 'delete', 'restore'):
+        try:
+            task_ids = parse_id_ranges(args.ids)
+        except ValueError as e:
+            print(f"无效的任务ID: {e}")
+            return
+        if args.command == 'done':
+            cli_handler.mark_done(task_ids)
+        elif args.command == 'delete':
+            cli_handler.delete_task(task_ids)
+        else:
+            cli_handler.restore_tasks(task_ids)
+    elif args.command == 'archive':
+        cli_handler.archive_tasks(args.days)
+    elif args.command == 'search':
+        cli_handler.search_tasks(args.query, args.limit)
+    elif args.command == 'batch':
+        if args.file == '-':
+            import sys
+            committed = cli_handler.run_batch(sys.stdin, args.continue_on_error)
+        else:
+            try:
+                with open(args.file, encoding='utf-8') as f:
+                    committed = cli_handler.run_batch(f, args.continue_on_error)
+            except OSError as e:
+                print(f"无法读取文件: {e}")
+                committed = False
+        if not committed:
+            raise SystemExit(1)
     elif args.command == 'today':
         cli_handler.show_today_summary()
     elif args.command == 'show':
         from ui.task_detail_window import TaskDetailWindow
         detail_window = TaskDetailWindow()
         detail_window.show()
-    elif args.command == 'daemon':
-        if keyboard:
-            setup_global_hotkey()
-            print("后台监听已启动，按Ctrl+C退出")
-            try:
-                keyboard.wait()
-            except KeyboardInterrupt:
-                print("\n后台监听已停止")
-                reminder_manager.stop()
-        else:
-            print("无法启动后台监听，请安装keyboard库")
+
+def run_daemon():
+    """运行守护进程：持有提醒调度器并响应CLI命令的RPC请求"""
+    from managers.daemon import EchoDaemon
+    daemon = EchoDaemon()
+    try:
+        daemon.start()
+    except RuntimeError as e:
+        print(f"无法启动后台服务: {e}")
+        daemon.stop()
+        return
+    
+    setup_global_hotkey(daemon.reminder_manager)
+    print("后台服务已启动，按Ctrl+C退出")
+    try:
+        daemon.wait()
+    except KeyboardInterrupt:
+        print("\n后台服务已停止")
+    finally:
+        daemon.stop()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,145 @@
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from managers.reminder_manager import ReminderManager
+from managers.rpc import RPCServer, UNIX_SOCKETS_AVAILABLE
+from managers.write_queue import WriteQueue, install_writer
+
+
+class EchoDaemon:
+    """后台守护进程
+
+    唯一持有提醒调度器和写队列的进程。CLI命令通过本地RPC把增删改请求
+    交给守护进程执行，由守护进程同步更新提醒调度；守护进程未运行时
+    CLI直接访问数据库，提醒在守护进程下次启动或补充调度窗口时加载。
+
+    RPC套接字同时用于保证只有一个守护进程运行。不支持Unix域套接字的平台
+    （如旧版Windows）没有这一检查，重复启动会重复调度提醒和发送通知。
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.writer = WriteQueue()
+        self.reminder_manager = ReminderManager()
+        self.task_manager = self.reminder_manager.task_manager
+        self.rpc_server = RPCServer({
+            'ping': self.ping,
+            'add_task': self.add_task,
+            'mark_done': self.mark_done,
+            'delete_tasks': self.delete_tasks,
+            'restore_tasks': self.restore_tasks,
+            'apply_batch': self.apply_batch,
+        }, socket_path)
+        self._stopped = threading.Event()
+
+    def start(self):
+        # 先占用套接字：已有守护进程在运行时在此抛出RuntimeError，
+        # 不会重复发送错过提醒的摘要、写入存活时间或调度提醒
+        if UNIX_SOCKETS_AVAILABLE:
+            self.rpc_server.bind()
+        else:
+            print("警告: 当前平台不支持Unix域套接字，CLI命令将直接访问数据库，"
+                  "且无法检测是否已有后台服务在运行")
+        # 守护进程内的所有写操作由单一写线程组提交，避免多连接争用写锁
+        self.writer.start()
+        install_writer(self.writer)
+        self.reminder_manager.start()
+        # 调度器就绪后再处理排队中的RPC请求
+        if UNIX_SOCKETS_AVAILABLE:
+            self.rpc_server.start()
+
+    def stop(self):
+        self.rpc_server.stop()
+        self.reminder_manager.stop()
+        install_writer(None)
+        self.writer.stop()
+        self._stopped.set()
+
+    def wait(self):
+        """阻塞直到stop()被调用或收到Ctrl+C"""
+        # 带超时等待，保证Windows下也能及时响应KeyboardInterrupt
+        while not self._stopped.wait(1):
+            pass
+
+    def ping(self) -> dict:
+        return {'pid': os.getpid()}
+
+    def add_task(self, content: str, priority: Optional[str] = None,
+                 due_date: Optional[str] = None, reminder_time: Optional[str] = None,
+                 recurrence: Optional[str] = None) -> dict:
+        task = self.task_manager.add_task(
+            content, priority,
+            datetime.fromisoformat(due_date) if due_date else None,
+            datetime.fromisoformat(reminder_time) if reminder_time else None,
+            recurrence)
+        self.reminder_manager.add_reminder(task)
+        return task.to_dict()
+
+    def mark_done(self, task_ids: List[int]) -> Dict[int, bool]:
+        results = self.task_manager.complete_many(task_ids)
+        # 重复任务完成后顺延到下一次发生，需要按新的起点重新调度
+        self._reschedule_reminders(task_id for task_id, ok in results.items() if ok)
+        return results
+
+    def delete_tasks(self, task_ids: List[int]) -> Dict[int, bool]:
+        results = self.task_manager.delete_many(task_ids)
+        self._remove_reminders(results)
+        return results
+
+    def restore_tasks(self, task_ids: List[int]) -> Dict[int, bool]:
+        results = self.task_manager.restore_archived(task_ids)
+        for task_id, ok in results.items():
+            task = self.task_manager.get_task_by_id(task_id) if ok else None
+            if task and task.status != "completed":
+                self.reminder_manager.add_reminder(task)
+        return results
+
+    def apply_batch(self, operations: List[dict], continue_on_error: bool = False) -> dict:
+        """在单个事务中执行批量操作（见TaskManager.apply_batch），提交后同步提醒调度"""
+        operations = [self._decode_operation(operation) for operation in operations]
+        committed, results = self.task_manager.apply_batch(operations, continue_on_error)
+        if committed:
+            for operation, result in zip(operations, results):
+                if result.ok:
+                    self._sync_batch_reminders(operation, result.value)
+        return {
+            'committed': committed,
+            'results': [{'ok': result.ok,
+                         'value': result.value.to_dict() if operation['op'] == 'add' and result.ok
+                         else result.value,
+                         'error': result.error}
+                        for operation, result in zip(operations, results)],
+        }
+
+    @staticmethod
+    def _decode_operation(operation: dict) -> dict:
+        def decode(values: dict) -> dict:
+            return {key: datetime.fromisoformat(value) if key in ('due_date', 'reminder_time') and value
+                    else value
+                    for key, value in values.items()}
+        decoded = decode(operation)
+        if 'fields' in operation:
+            decoded['fields'] = decode(operation['fields'])
+        return decoded
+
+    def _sync_batch_reminders(self, operation: dict, value):
+        if operation['op'] == 'add':
+            self.reminder_manager.add_reminder(value)
+            return
+        if operation['op'] == 'delete':
+            self._remove_reminders({task_id: True for task_id in value})
+        else:
+            self._reschedule_reminders(value)
+
+    def _reschedule_reminders(self, task_ids):
+        """按数据库中的最新状态重新调度提醒，已完成的任务只移除"""
+        for task_id in task_ids:
+            self.reminder_manager.remove_reminder(task_id)
+            task = self.task_manager.get_task_by_id(task_id)
+            if task and task.status != "completed":
+                self.reminder_manager.add_reminder(task)
+
+    def _remove_reminders(self, results: Dict[int, bool]):
+        for task_id, ok in results.items():
+            if ok:
+                self.reminder_manager.remove_reminder(task_id)
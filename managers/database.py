@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+import config
+from managers.migrations import migrate
+
+
+class ConnectionManager:
+    """线程本地的SQLite长连接管理器
+
+    每个线程对每个数据库文件持有一个长期打开的连接，连接建立、PRAGMA设置
+    和结构迁移检查只在首次使用时执行一次。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Tuple[threading.Thread, str, sqlite3.Connection]] = []
+        self._initialized: Set[str] = set()
+
+    def get_connection(self, path: Optional[str] = None) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        path = path or config.DATABASE_PATH
+        connections: Dict[str, sqlite3.Connection] = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn = connections.get(path)
+        if conn is None:
+            conn = self._open(path)
+            connections[path] = conn
+        return conn
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        """打开新连接并应用调优参数"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(path, timeout=config.DB_BUSY_TIMEOUT / 1000,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(config.DB_BUSY_TIMEOUT)}')
+        conn.execute(f'PRAGMA journal_mode = {config.DB_JOURNAL_MODE}')
+        conn.execute(f'PRAGMA synchronous = {config.DB_SYNCHRONOUS}')
+        conn.execute(f'PRAGMA cache_size = {int(config.DB_CACHE_SIZE)}')
+        conn.execute(f'PRAGMA mmap_size = {int(config.DB_MMAP_SIZE)}')
+
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections.append((threading.current_thread(), path, conn))
+            if path not in self._initialized:
+                migrate(conn)
+                self._initialized.add(path)
+
+        return conn
+
+    def _prune_dead_threads(self):
+        """关闭已退出线程遗留的连接（调用方需持有锁）"""
+        alive = []
+        for thread, path, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, path, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def close_all(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            for _, _, conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = []
+            self._initialized.clear()
+        self._local = threading.local()
+
+
+_manager = ConnectionManager()
+
+
+def get_connection(path: Optional[str] = None) -> sqlite3.Connection:
+    """获取当前线程的共享数据库连接"""
+    return _manager.get_connection(path)
+
+
+def close_all():
+    """关闭所有数据库连接（用于测试和进程退出）"""
+    _manager.close_all()
@@ -0,0 +1,216 @@
+import sqlite3
+from typing import Callable, List, Tuple
+from utils.timestamps import iso_to_epoch
+
+# 已注册的迁移步骤，按版本号升序排列
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = []
+
+
+def migration(version: int):
+    """注册一个迁移步骤，版本号必须严格递增"""
+    def decorator(func: Callable[[sqlite3.Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"迁移版本号必须递增: {version}")
+        MIGRATIONS.append((version, func))
+        return func
+    return decorator
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """执行所有未应用的迁移，返回执行的步骤数
+
+    已是最新版本时只读取一次PRAGMA user_version，不执行任何DDL，
+    也不开启写事务。
+    """
+    if get_version(conn) >= latest_version():
+        return 0
+
+    conn.create_function('iso_to_epoch', 1, iso_to_epoch, deterministic=True)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # 加锁后重新读取版本，其他进程可能已经完成迁移
+        current = get_version(conn)
+        applied = 0
+        for version, step in MIGRATIONS:
+            if version <= current:
+                continue
+            step(conn)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            applied += 1
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+
+
+_TASKS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        content TEXT NOT NULL,
+        status TEXT NOT NULL,
+        priority TEXT,
+        due_date INTEGER,
+        reminder_time INTEGER,
+        created_at INTEGER
+    )
+'''
+
+_TIMESTAMP_COLUMNS = ('due_date', 'reminder_time', 'created_at')
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> dict:
+    return {row[1]: row[2].upper() for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+@migration(1)
+def _create_tasks_table(conn: sqlite3.Connection):
+    """创建任务表；早期版本的数据库补充reminder_time列"""
+    conn.execute(_TASKS_TABLE_SQL.format(name='tasks'))
+    if 'reminder_time' not in _table_columns(conn, 'tasks'):
+        conn.execute('ALTER TABLE tasks ADD COLUMN reminder_time DATETIME')
+
+
+@migration(2)
+def _convert_timestamps_to_epoch(conn: sqlite3.Connection):
+    """将ISO-8601文本时间列转换为整数时间戳列
+
+    SQLite不支持修改列类型，因此新建表、转换复制数据后替换旧表，
+    并保留AUTOINCREMENT序列值，避免已删除的ID被重新使用。
+    """
+    column_types = _table_columns(conn, 'tasks')
+    if all(column_types.get(column) == 'INTEGER' for column in _TIMESTAMP_COLUMNS):
+        return
+
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+    sequence = row[0] if row else 0
+
+    conn.execute('DROP TABLE IF EXISTS tasks_migrating')
+    conn.execute(_TASKS_TABLE_SQL.format(name='tasks_migrating'))
+    conn.execute('''
+        INSERT INTO tasks_migrating (id, content, status, priority, due_date, reminder_time, created_at)
+        SELECT id, content, status, priority,
+               iso_to_epoch(due_date), iso_to_epoch(reminder_time), iso_to_epoch(created_at)
+        FROM tasks
+    ''')
+    conn.execute('DROP TABLE tasks')
+    conn.execute('ALTER TABLE tasks_migrating RENAME TO tasks')
+    if sequence:
+        cursor = conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'",
+                              (sequence,))
+        if cursor.rowcount == 0:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (sequence,))
+
+
+@migration(3)
+def _create_task_indexes(conn: sqlite3.Connection):
+    """常用过滤条件的索引，避免"今日任务"和提醒加载时全表扫描
+
+    以status开头的复合索引同时覆盖按状态过滤和按时间范围查询。
+    """
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status_due_date ON tasks (status, due_date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status_reminder_time ON tasks (status, reminder_time)')
+
+
+@migration(4)
+def _create_created_at_indexes(conn: sqlite3.Connection):
+    """支持按(created_at, id)键集分页的索引
+
+    分页游标不能处理NULL，无法解析的旧数据创建时间置为0。
+    """
+    conn.execute('UPDATE tasks SET created_at = 0 WHERE created_at IS NULL')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at ON tasks (status, created_at)')
+
+
+def _create_fts_table(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                content, content='tasks', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+@migration(5)
+def _create_full_text_index(conn: sqlite3.Connection):
+    """任务内容的FTS5全文索引，由触发器与tasks表保持同步
+
+    trigram分词不依赖空格切词，适合中文；SQLite未编译FTS5或不支持trigram
+    分词时跳过，搜索退化为LIKE查询。其他分词器会把连续的中文当作一个词，
+    子串搜索查不到结果，因此不作为备选。
+    """
+    if not _create_fts_table(conn):
+        return
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, content) VALUES (new.id, new.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF content ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO tasks_fts (rowid, content) VALUES (new.id, new.content);
+        END
+    ''')
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+@migration(6)
+def _create_archive_table(conn: sqlite3.Connection):
+    """已完成任务的归档表
+
+    新增completed_at列记录完成时间，作为归档策略的依据。已有的已完成任务
+    没有完成时间，以迁移时刻代替，避免升级后立即被归档。
+    """
+    if 'completed_at' not in _table_columns(conn, 'tasks'):
+        conn.execute('ALTER TABLE tasks ADD COLUMN completed_at INTEGER')
+    conn.execute('''
+        UPDATE tasks SET completed_at = CAST(strftime('%s', 'now') AS INTEGER)
+        WHERE status = 'completed' AND completed_at IS NULL
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status_completed_at ON tasks (status, completed_at)')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id INTEGER PRIMARY KEY,
+            content TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority TEXT,
+            due_date INTEGER,
+            reminder_time INTEGER,
+            created_at INTEGER,
+            completed_at INTEGER,
+            archived_at INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_archive_created_at ON tasks_archive (created_at)')
+
+
+@migration(7)
+def _add_recurrence_column(conn: sqlite3.Connection):
+    """重复规则列，只保存规则本身，各次发生时间按需计算
+
+    部分索引只包含重复任务，加载重复任务时不必扫描全表。
+    """
+    for table in ('tasks', 'tasks_archive'):
+        if 'recurrence' not in _table_columns(conn, table):
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN recurrence TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_recurring ON tasks (status) WHERE recurrence IS NOT NULL')
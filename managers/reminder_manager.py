@@ -1,72 +1,103 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, date
+import os
+from datetime import datetime, date, timedelta
 from typing import Optional, List
 from models.task import Task
 from managers.task_manager import TaskManager
-from config import DAILY_REMINDER_HOUR, DAILY_REMINDER_MINUTE
+from managers.scheduler_backends import create_scheduler
+import config
+from config import (DAILY_REMINDER_HOUR, DAILY_REMINDER_MINUTE, ARCHIVE_COMPLETED_AFTER_DAYS,
+                    ARCHIVE_HOUR, ARCHIVE_MINUTE, REMINDER_WINDOW_HOURS, REMINDER_REFILL_MINUTES,
+                    HEARTBEAT_SECONDS, MISSED_REMINDER_LOOKBACK_DAYS, NOTIFY_DIGEST_MAX_LINES,
+                    DAILY_SUMMARY_MAX_TASKS)
 from utils.notification_helper import NotificationHelper
-import threading
+from utils.recurrence import next_occurrence, occurrence_of, occurrences_between
+from utils.timestamps import to_epoch, from_epoch
+from utils.ranking import top_tasks
+
+# 守护进程最后存活时间记录在数据库旁的文件中（取文件修改时间），不写入数据库：
+# 每次提交都会改变其他连接的data_version，使任务缓存被整体清空
+HEARTBEAT_FILE_SUFFIX = '-alive'
+
+def heartbeat_path() -> str:
+    return config.DATABASE_PATH + HEARTBEAT_FILE_SUFFIX
 
 class ReminderManager:
     def __init__(self):
-        self.scheduler = BackgroundScheduler()
+        self.scheduler = create_scheduler()
         self.task_manager = TaskManager()
         self.notification_helper = NotificationHelper()
+        # 已加载到调度器的提醒时间上限，超出部分由定时补充任务加载
+        self._window_end: Optional[datetime] = None
     
     def start(self):
         """启动调度器"""
         if not self.scheduler.running:
             self.scheduler.start()
-            # 加载现有任务的提醒
-            self._load_existing_reminders()
+            # 补发停机期间错过的提醒，并开始定期记录存活时间
+            self._send_missed_digest()
+            self._setup_heartbeat()
+            # 只加载调度窗口内的提醒，并定期补充
+            self._refill_window()
+            self._setup_window_refill()
             # 设置每日定时提醒
             self._setup_daily_reminder()
+            # 设置每日自动归档
+            self._setup_archive_job()
     
     def stop(self):
         """停止调度器"""
         if self.scheduler.running:
             self.scheduler.shutdown()
+            self._record_alive()
+            self.notification_helper.close()
     
-    def add_reminder(self, task: Task):
-        """为任务添加提醒"""
+    def add_reminder(self, task: Task, after: Optional[datetime] = None):
+        """为任务添加提醒，重复任务只调度after（默认当前时间）之后的下一次发生"""
         if not task.reminder_time or not task.id:
             return
         
-        # 如果提醒时间已过，不添加提醒
-        if task.reminder_time <= datetime.now():
-            return
+        now = datetime.now()
+        remind_at = next_occurrence(task, max(now, after or now)) if task.recurrence else task.reminder_time
         
-        job_id = f"task_{task.id}"
+        # 如果提醒时间已过（或重复规则已结束），不添加提醒
+        if remind_at is None or remind_at <= now:
+            return
         
-        # 移除已存在的提醒
-        try:
-            self.scheduler.remove_job(job_id)
-        except:
-            pass
+        # 超出调度窗口的提醒由定时补充任务加载
+        if remind_at > self._current_window_end():
+            return
         
-        # 添加新提醒
-        self.scheduler.add_job(
-            func=self._send_notification,
-            trigger='date',
-            run_date=task.reminder_time,
-            args=[task.id],
-            id=job_id
+        # 添加新提醒（替换已存在的同名提醒）
+        self.scheduler.add_date_job(
+            f"task_{task.id}",
+            remind_at,
+            self._send_notification,
+            args=(task.id, remind_at.timestamp())
         )
     
     def remove_reminder(self, task_id: int):
         """移除任务提醒"""
-        job_id = f"task_{task_id}"
-        try:
-            self.scheduler.remove_job(job_id)
-        except:
-            pass
+        self.scheduler.remove_job(f"task_{task_id}")
     
-    def _send_notification(self, task_id: int):
+    def _send_notification(self, task_id: int, scheduled_at: Optional[float] = None):
         """发送桌面通知"""
         task = self.task_manager.get_task_by_id(task_id)
-        if not task:
+        if not task or task.status == "completed":
+            return
+        
+        # 其他进程（守护进程未运行时的CLI、无RPC的平台）可能已修改提醒时间，
+        # 旧的调度任务不再有效，新的时间由补充窗口或重新调度加载
+        if (not task.recurrence and scheduled_at is not None
+                and to_epoch(task.reminder_time) != int(scheduled_at)):
             return
         
+        if task.recurrence:
+            # 重复任务发出本次提醒后调度下一次，通知中显示本次发生的时间
+            occurred_at = datetime.fromtimestamp(scheduled_at) if scheduled_at is not None else None
+            self.add_reminder(task, after=occurred_at)
+            if occurred_at is not None:
+                task = occurrence_of(task, occurred_at)
+        
         title = "任务提醒"
         message = f"{task.content}"
         
@@ -74,12 +105,13 @@ class ReminderManager:
             due_str = task.due_date.strftime('%Y-%m-%d %H:%M')
             message += f"\n截止时间: {due_str}"
         
-        # 使用新的通知系统，支持点击回调
-        self.notification_helper.show_clickable_notification(
+        # 同一时刻的多条提醒合并为摘要通知发送，支持点击回调
+        self.notification_helper.show_reminder(
             title=title,
             message=message,
             callback=self._open_task_detail_window,
-            timeout=10
+            timeout=10,
+            scheduled_at=scheduled_at
         )
     
     def _open_task_detail_window(self):
@@ -93,22 +125,36 @@ class ReminderManager:
     
     def _setup_daily_reminder(self):
         """设置每日定时提醒"""
-        self.scheduler.add_job(
-            func=self._send_daily_summary,
-            trigger='cron',
-            hour=DAILY_REMINDER_HOUR,
-            minute=DAILY_REMINDER_MINUTE,
-            id='daily_reminder'
+        self.scheduler.add_daily_job(
+            'daily_reminder',
+            DAILY_REMINDER_HOUR,
+            DAILY_REMINDER_MINUTE,
+            self._send_daily_summary
+        )
+    
+    def _setup_archive_job(self):
+        """设置每日自动归档已完成任务"""
+        self.scheduler.add_daily_job(
+            'archive_completed',
+            ARCHIVE_HOUR,
+            ARCHIVE_MINUTE,
+            self._archive_completed_tasks
         )
     
+    def _archive_completed_tasks(self):
+        """归档完成超过指定天数的任务"""
+        count = self.task_manager.archive_completed(ARCHIVE_COMPLETED_AFTER_DAYS)
+        if count:
+            print(f"已归档 {count} 个已完成任务")
+    
     def _send_daily_summary(self):
         """发送每日任务摘要"""
         today_tasks = self._get_today_tasks()
         if not today_tasks:
             return
         
-        # 按优先级和截止时间排序
-        sorted_tasks = self._sort_tasks_by_priority_and_deadline(today_tasks)
+        # 按优先级和截止时间只取最紧急的若干项
+        sorted_tasks = top_tasks(today_tasks, DAILY_SUMMARY_MAX_TASKS)
         
         # 构建通知内容
         message = "⚠️ 早上好！这是今天的待办事项：\n\n--- 待办事项 ---\n"
@@ -124,6 +170,9 @@ class ReminderManager:
             
             message += f"{priority_str} {task.content}{due_str}\n"
         
+        if len(today_tasks) > len(sorted_tasks):
+            message += f"…另有 {len(today_tasks) - len(sorted_tasks)} 项\n"
+        
         # 使用新的通知系统发送每日提醒
         self.notification_helper.show_clickable_notification(
             title="今日任务提醒",
@@ -136,57 +185,94 @@ class ReminderManager:
     
     def _get_today_tasks(self) -> List[Task]:
         """获取今日相关任务"""
-        all_tasks = self.task_manager.get_all_tasks()
-        today = date.today()
-        today_tasks = []
+        return self.task_manager.get_today_tasks()
+    
+    def _setup_heartbeat(self):
+        """定期记录存活时间，作为下次启动时补发错过提醒的起点"""
+        self._record_alive()
+        self.scheduler.add_interval_job('heartbeat', HEARTBEAT_SECONDS, self._record_alive)
+    
+    def _record_alive(self, at: Optional[datetime] = None):
+        path = heartbeat_path()
+        timestamp = to_epoch(at or datetime.now())
+        with open(path, 'a'):
+            pass
+        os.utime(path, (timestamp, timestamp))
+    
+    def get_last_alive(self) -> Optional[datetime]:
+        """守护进程最后一次记录的存活时间，从未记录时返回None"""
+        try:
+            return from_epoch(int(os.path.getmtime(heartbeat_path())))
+        except FileNotFoundError:
+            return None
+    
+    def get_missed_reminders(self, now: Optional[datetime] = None) -> List[Task]:
+        """查询上次存活时间到现在之间错过的提醒
+
+        普通任务使用一次按索引的范围查询；重复任务按规则计算，每个任务只取
+        最近错过的一次。最多回溯MISSED_REMINDER_LOOKBACK_DAYS天。
+        """
+        last_alive = self.get_last_alive()
+        if last_alive is None:
+            return []
+        now = now or datetime.now()
+        start = max(last_alive, now - timedelta(days=MISSED_REMINDER_LOOKBACK_DAYS))
+        if start >= now:
+            return []
         
-        for task in all_tasks:
-            if task.status == "completed":
+        missed = [task for task in self.task_manager.get_pending_reminders_between(start, now)
+                  if not task.recurrence]
+        for task in self.task_manager.get_recurring_tasks():
+            if not task.reminder_time:
                 continue
-            
-            # 今天截止的任务
-            if task.due_date and task.due_date.date() == today:
-                today_tasks.append(task)
-            # 今天提醒的任务
-            elif task.reminder_time and task.reminder_time.date() == today:
-                today_tasks.append(task)
-            # 过期任务
-            elif task.due_date and task.due_date.date() < today:
-                today_tasks.append(task)
-        
-        return today_tasks
-    
-    def _sort_tasks_by_priority_and_deadline(self, tasks: List[Task]) -> List[Task]:
-        """按优先级和截止时间排序"""
-        priority_order = {"高": 3, "中": 2, "低": 1, None: 0}
-        
-        def sort_key(task):
-            # 优先级权重
-            priority_weight = priority_order.get(task.priority, 0)
-            
-            # 时间紧急度（越近的时间权重越高）
-            time_weight = 0
-            if task.due_date:
-                now = datetime.now()
-                time_diff = (task.due_date - now).total_seconds()
-                # 过期任务最高优先级
-                if time_diff < 0:
-                    time_weight = 1000
-                # 今天内的任务
-                elif time_diff < 86400:  # 24小时
-                    time_weight = 100
-                # 未来任务
-                else:
-                    time_weight = max(0, 50 - time_diff / 86400)
-            
-            # 综合权重（优先级 * 10 + 时间紧急度）
-            return -(priority_weight * 10 + time_weight)
+            occurrences = occurrences_between(task, start + timedelta(seconds=1), now + timedelta(seconds=1))
+            if occurrences:
+                missed.append(occurrence_of(task, occurrences[-1]))
+        missed.sort(key=lambda task: task.reminder_time)
+        return missed
+    
+    def _send_missed_digest(self):
+        """将停机期间错过的提醒合并为一条通知发送"""
+        missed = self.get_missed_reminders()
+        if not missed:
+            return
+        
+        lines = [f"• {task.reminder_time.strftime('%m-%d %H:%M')} {task.content}"
+                 for task in missed[:NOTIFY_DIGEST_MAX_LINES]]
+        if len(missed) > NOTIFY_DIGEST_MAX_LINES:
+            lines.append(f"…另有 {len(missed) - NOTIFY_DIGEST_MAX_LINES} 条提醒")
         
-        return sorted(tasks, key=sort_key)
+        self.notification_helper.show_clickable_notification(
+            title=f"错过的提醒 ({len(missed)})",
+            message="\n".join(lines),
+            callback=self._open_task_detail_window,
+            timeout=15,
+            scheduled_at=missed[0].reminder_time.timestamp()
+        )
     
-    def _load_existing_reminders(self):
-        """加载现有任务的提醒"""
-        tasks = self.task_manager.get_all_tasks()
-        for task in tasks:
-            if task.status != "completed" and task.reminder_time:
-                self.add_reminder(task)
\ No newline at end of file
+    def _current_window_end(self) -> datetime:
+        if self._window_end is None:
+            return datetime.now() + timedelta(hours=REMINDER_WINDOW_HOURS)
+        return self._window_end
+    
+    def _setup_window_refill(self):
+        """设置定时补充调度窗口"""
+        self.scheduler.add_interval_job(
+            'reminder_window',
+            REMINDER_REFILL_MINUTES * 60,
+            self._refill_window
+        )
+    
+    def _refill_window(self):
+        """加载未来REMINDER_WINDOW_HOURS小时内的提醒
+
+        每次按索引查询整个窗口，重复注册会替换已有的同名任务，
+        因此其他进程新增的提醒也能在下次补充时被加载。
+        """
+        now = datetime.now()
+        self._window_end = now + timedelta(hours=REMINDER_WINDOW_HOURS)
+        for task in self.task_manager.get_pending_reminders_between(now, self._window_end):
+            self.add_reminder(task)
+        # 重复任务的提醒时间是规则起点，按规则计算下一次发生时间
+        for task in self.task_manager.get_recurring_tasks():
+            self.add_reminder(task)
\ No newline at end of file
@@ -0,0 +1,201 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Dict, Optional
+import config
+
+# 平台不支持Unix域套接字（如旧版Windows）时，客户端总是回退为直接访问数据库
+UNIX_SOCKETS_AVAILABLE = hasattr(socket, 'AF_UNIX')
+
+
+class DaemonUnavailable(Exception):
+    """守护进程未运行或无法连接"""
+
+
+class RPCError(Exception):
+    """守护进程执行请求时出错"""
+
+
+def _socket_path(path: Optional[str] = None) -> str:
+    return path or config.DAEMON_SOCKET_PATH
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """每行一个JSON请求 {"method", "params"}，每行一个JSON响应 {"result"} 或 {"error"}"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, methods: Dict[str, Callable[..., Any]],
+                 execute: Callable[[Callable[..., Any], dict], Any]):
+        self.methods = methods
+        self.execute = execute
+        super().__init__(path, _RequestHandler)
+
+    def dispatch(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            method = self.methods[request['method']]
+        except (ValueError, KeyError, TypeError):
+            return {'error': f"无效的请求: {line[:100]!r}"}
+        try:
+            return {'result': self.execute(method, request.get('params', {}))}
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}"}
+
+
+class _Call:
+    """交给工作线程执行的一次方法调用"""
+
+    def __init__(self, method: Callable[..., Any], params: dict):
+        self.method = method
+        self.params = params
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class RPCServer:
+    """本地Unix域套接字JSON-RPC服务端
+
+    每个连接由独立线程收发，方法统一在一个长期运行的工作线程中依次执行，
+    使所有请求复用同一个线程本地的数据库连接和任务缓存状态。
+    """
+
+    def __init__(self, methods: Dict[str, Callable[..., Any]], path: Optional[str] = None):
+        self.methods = methods
+        self.path = _socket_path(path)
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+        # 只有守护进程创建服务端，queue在此按需导入，不增加CLI命令的启动开销
+        import queue
+        self._calls: 'queue.Queue[Optional[_Call]]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    def bind(self):
+        """占用套接字地址但暂不处理请求，已有守护进程在运行时抛出RuntimeError
+
+        绑定后到来的连接在监听队列中等待，直到start()开始处理。
+        """
+        if self.running:
+            return
+        if not UNIX_SOCKETS_AVAILABLE:
+            raise RuntimeError("当前平台不支持Unix域套接字")
+        self._remove_stale_socket()
+        self._server = _UnixServer(self.path, self.methods, self._execute)
+        os.chmod(self.path, 0o600)
+
+    def start(self):
+        self.bind()
+        if self._thread is not None:
+            return
+        self._worker = threading.Thread(target=self._run_calls, name='echo-rpc-worker', daemon=True)
+        self._worker.start()
+        self._thread = threading.Thread(target=self._server.serve_forever, name='echo-rpc', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        # 只绑定未启动时没有serve_forever循环，shutdown()会一直等待
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._calls.put(None)
+            self._worker.join()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        self._worker = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _execute(self, method: Callable[..., Any], params: dict) -> Any:
+        """在工作线程中执行方法并等待结果，由连接处理线程调用"""
+        call = _Call(method, params)
+        self._calls.put(call)
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _run_calls(self):
+        while True:
+            call = self._calls.get()
+            if call is None:
+                return
+            try:
+                call.result = call.method(**call.params)
+            except Exception as e:
+                call.error = e
+            finally:
+                call.done.set()
+
+    def _remove_stale_socket(self):
+        """删除上次异常退出遗留的套接字文件，已有守护进程在运行时报错"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            RPCClient(self.path).call('ping')
+        except DaemonUnavailable:
+            os.unlink(self.path)
+            return
+        raise RuntimeError(f"守护进程已在运行: {self.path}")
+
+
+class RPCClient:
+    """守护进程RPC客户端，每次调用建立一个短连接"""
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        self.path = path
+        self.timeout = config.DAEMON_RPC_TIMEOUT if timeout is None else timeout
+
+    def call(self, method: str, **params) -> Any:
+        """调用守护进程方法，无法连接时抛出DaemonUnavailable，执行出错时抛出RPCError"""
+        path = _socket_path(self.path)
+        if not UNIX_SOCKETS_AVAILABLE or not os.path.exists(path):
+            raise DaemonUnavailable(path)
+
+        request = json.dumps({'method': method, 'params': params}, ensure_ascii=False).encode('utf-8')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(path)
+            except (OSError, socket.timeout) as e:
+                raise DaemonUnavailable(path) from e
+            # 请求发出后守护进程可能已经执行，此后的错误不能回退为直接访问数据库
+            try:
+                sock.sendall(request + b'\n')
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+            except (OSError, socket.timeout) as e:
+                raise RPCError(f"与守护进程通信失败: {e}") from e
+        if not line:
+            raise RPCError("守护进程未返回响应")
+
+        response = json.loads(line)
+        if 'error' in response:
+            raise RPCError(response['error'])
+        return response.get('result')
+
+    def is_running(self) -> bool:
+        try:
+            self.call('ping')
+            return True
+        except DaemonUnavailable:
+            return False
@@ -0,0 +1,248 @@
+import heapq
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+import config
+
+
+class SchedulerBackend(ABC):
+    """提醒调度后端接口
+
+    ReminderManager只需要三类任务：一次性定时任务、每日定时任务和固定间隔任务。
+    添加同名任务会替换已有任务。未实现全部方法的后端在构造时即报错。
+    """
+
+    @property
+    @abstractmethod
+    def running(self) -> bool:
+        ...
+
+    @abstractmethod
+    def start(self):
+        ...
+
+    @abstractmethod
+    def shutdown(self):
+        ...
+
+    @abstractmethod
+    def add_date_job(self, job_id: str, run_date: datetime, func: Callable, args: tuple = ()):
+        ...
+
+    @abstractmethod
+    def add_daily_job(self, job_id: str, hour: int, minute: int, func: Callable):
+        ...
+
+    @abstractmethod
+    def add_interval_job(self, job_id: str, seconds: float, func: Callable):
+        ...
+
+    @abstractmethod
+    def remove_job(self, job_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_job_ids(self) -> List[str]:
+        ...
+
+
+class APSchedulerBackend(SchedulerBackend):
+    """基于APScheduler BackgroundScheduler的后端"""
+
+    def __init__(self):
+        from apscheduler.schedulers.background import BackgroundScheduler
+        self.scheduler = BackgroundScheduler()
+
+    @property
+    def running(self) -> bool:
+        return self.scheduler.running
+
+    def start(self):
+        self.scheduler.start()
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+
+    def add_date_job(self, job_id: str, run_date: datetime, func: Callable, args: tuple = ()):
+        self.scheduler.add_job(func=func, trigger='date', run_date=run_date, args=list(args),
+                               id=job_id, replace_existing=True)
+
+    def add_daily_job(self, job_id: str, hour: int, minute: int, func: Callable):
+        self.scheduler.add_job(func=func, trigger='cron', hour=hour, minute=minute,
+                               id=job_id, replace_existing=True)
+
+    def add_interval_job(self, job_id: str, seconds: float, func: Callable):
+        self.scheduler.add_job(func=func, trigger='interval', seconds=seconds,
+                               id=job_id, replace_existing=True)
+
+    def remove_job(self, job_id: str) -> bool:
+        from apscheduler.jobstores.base import JobLookupError
+        try:
+            self.scheduler.remove_job(job_id)
+            return True
+        except JobLookupError:
+            return False
+
+    def get_job_ids(self) -> List[str]:
+        return [job.id for job in self.scheduler.get_jobs()]
+
+
+class _HeapJob:
+    __slots__ = ('job_id', 'run_at', 'func', 'args', 'daily', 'interval', 'cancelled')
+
+    def __init__(self, job_id, run_at, func, args=(), daily=None, interval=None):
+        self.job_id = job_id
+        self.run_at = run_at
+        self.func = func
+        self.args = args
+        self.daily = daily
+        self.interval = interval
+        self.cancelled = False
+
+
+class HeapSchedulerBackend(SchedulerBackend):
+    """内置的单线程堆调度器
+
+    所有任务按执行时间放入最小堆，由一个线程等待堆顶任务到期后执行。
+    添加为O(log n)；删除只标记取消（O(1)），出堆时丢弃，取消条目过多时
+    重建堆；重新调度即删除后添加。任务在调度线程中依次执行。
+    """
+
+    # 等待的最长时间（秒），以便系统时间调整或休眠唤醒后及时重新检查
+    MAX_WAIT = 60.0
+
+    def __init__(self):
+        self._heap: list = []
+        self._jobs: Dict[str, _HeapJob] = {}
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='echo-scheduler', daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def add_date_job(self, job_id: str, run_date: datetime, func: Callable, args: tuple = ()):
+        self._schedule(_HeapJob(job_id, run_date.timestamp(), func, tuple(args)))
+
+    def add_daily_job(self, job_id: str, hour: int, minute: int, func: Callable):
+        self._schedule(_HeapJob(job_id, self._next_daily(hour, minute), func, daily=(hour, minute)))
+
+    def add_interval_job(self, job_id: str, seconds: float, func: Callable):
+        self._schedule(_HeapJob(job_id, time.time() + seconds, func, interval=seconds))
+
+    def remove_job(self, job_id: str) -> bool:
+        with self._condition:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            self._cancel(job)
+            return True
+
+    def get_job_ids(self) -> List[str]:
+        with self._condition:
+            return list(self._jobs)
+
+    def _schedule(self, job: _HeapJob):
+        with self._condition:
+            existing = self._jobs.get(job.job_id)
+            if existing is not None:
+                self._cancel(existing)
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._heap, (job.run_at, next(self._counter), job))
+            # 新任务成为堆顶时唤醒调度线程重新计算等待时间
+            if self._heap[0][2] is job:
+                self._condition.notify()
+
+    def _cancel(self, job: _HeapJob):
+        """标记取消（调用方需持有锁），取消条目超过一半时重建堆"""
+        job.cancelled = True
+        self._cancelled += 1
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    @staticmethod
+    def _next_daily(hour: int, minute: int) -> float:
+        now = datetime.now()
+        run_date = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if run_date <= now:
+            run_date += timedelta(days=1)
+        return run_date.timestamp()
+
+    def _pop_due(self) -> Optional[_HeapJob]:
+        """等待并取出下一个到期任务（调用方需持有锁），停止时返回None"""
+        while self._running:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled -= 1
+            if not self._heap:
+                self._condition.wait(self.MAX_WAIT)
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                self._condition.wait(min(delay, self.MAX_WAIT))
+                continue
+
+            _, _, job = heapq.heappop(self._heap)
+            if job.daily is not None:
+                job.run_at = self._next_daily(*job.daily)
+            elif job.interval is not None:
+                job.run_at = time.time() + job.interval
+            else:
+                self._jobs.pop(job.job_id, None)
+                return job
+            heapq.heappush(self._heap, (job.run_at, next(self._counter), job))
+            return job
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                job = self._pop_due()
+            if job is None:
+                return
+            try:
+                job.func(*job.args)
+            except Exception as e:
+                print(f"调度任务 {job.job_id} 执行失败: {e}")
+
+
+SCHEDULER_BACKENDS = {
+    'heap': HeapSchedulerBackend,
+    'apscheduler': APSchedulerBackend,
+}
+
+
+def create_scheduler(name: Optional[str] = None) -> SchedulerBackend:
+    """按名称（默认读取config.SCHEDULER_BACKEND）创建调度后端"""
+    name = name or config.SCHEDULER_BACKEND
+    try:
+        backend_class = SCHEDULER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"未知的调度后端: {name}")
+    return backend_class()
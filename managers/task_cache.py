@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+from models.task import Task
+import config
+
+
+class TaskCache:
+    """进程内任务缓存（LRU）
+
+    按ID缓存任务对象，并缓存少量列表查询结果。本进程通过TaskManager
+    的写操作会直接失效相关条目；其他连接（其他线程或进程，如一次性的
+    CLI命令）的提交通过PRAGMA data_version的变化检测，检测到后清空缓存。
+    存入和取出时都复制任务对象，调用方修改返回的任务不会影响缓存。
+    """
+
+    def __init__(self, max_size: int = 1000, max_queries: int = 32):
+        self.max_size = max_size
+        self.max_queries = max_queries
+        self._tasks: 'OrderedDict[int, Task]' = OrderedDict()
+        self._queries: 'OrderedDict[Hashable, List[Task]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # 每个连接最后一次看到的data_version：id(连接) -> (连接, 版本)
+        self._versions: Dict[int, Tuple[sqlite3.Connection, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def sync(self, conn: sqlite3.Connection):
+        """检查其他连接是否提交过修改，有则清空缓存"""
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        with self._lock:
+            state = self._versions.get(id(conn))
+            if state is None or state[0] is not conn:
+                self._prune_closed()
+            self._versions[id(conn)] = (conn, version)
+        # 首次见到该连接时无法判断之前是否有修改，保守地清空
+        if state is None or state[0] is not conn or state[1] != version:
+            self.clear()
+
+    def _prune_closed(self):
+        """丢弃已关闭连接的记录（调用方需持有锁）"""
+        for key, (conn, _) in list(self._versions.items()):
+            try:
+                conn.in_transaction
+            except sqlite3.ProgrammingError:
+                del self._versions[key]
+
+    def get(self, task_id: int) -> Optional[Task]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                self.misses += 1
+                return None
+            self._tasks.move_to_end(task_id)
+            self.hits += 1
+            return task.copy()
+
+    def put(self, task: Task):
+        if task.id is None or self.max_size <= 0:
+            return
+        task = task.copy()
+        with self._lock:
+            self._tasks[task.id] = task
+            self._tasks.move_to_end(task.id)
+            while len(self._tasks) > self.max_size:
+                self._tasks.popitem(last=False)
+
+    def get_query(self, key: Hashable) -> Optional[List[Task]]:
+        with self._lock:
+            tasks = self._queries.get(key)
+            if tasks is None:
+                self.misses += 1
+                return None
+            self._queries.move_to_end(key)
+            self.hits += 1
+        return [task.copy() for task in tasks]
+
+    def put_query(self, key: Hashable, tasks: List[Task]):
+        if self.max_queries <= 0:
+            return
+        tasks = [task.copy() for task in tasks]
+        with self._lock:
+            self._queries[key] = tasks
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+
+    def invalidate(self, task_ids=()):
+        """本进程写入后失效指定任务和所有列表查询结果"""
+        with self._lock:
+            for task_id in task_ids:
+                self._tasks.pop(task_id, None)
+            self._queries.clear()
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            if self._tasks or self._queries:
+                self.invalidations += 1
+            self._tasks.clear()
+            self._queries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'invalidations': self.invalidations,
+                'size': len(self._tasks),
+                'queries': len(self._queries),
+                'max_size': self.max_size,
+            }
+
+
+_caches: Dict[str, TaskCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_task_cache(path: Optional[str] = None) -> TaskCache:
+    """获取数据库文件对应的进程内共享缓存"""
+    path = path or config.DATABASE_PATH
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = TaskCache(config.TASK_CACHE_SIZE, config.TASK_QUERY_CACHE_SIZE)
+        return cache
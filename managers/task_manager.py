@@ -1,108 +1,546 @@
 import sqlite3
-import os
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+from datetime import datetime, date, time, timedelta
 from models.task import Task
-from config import DATABASE_PATH
+from managers.database import get_connection
+from managers.task_cache import TaskCache, get_task_cache
+from managers.write_queue import get_active_writer
+from utils.timestamps import to_epoch
+from utils.recurrence import advance, occurrences_between, occurrence_of
+from utils.ranking import urgency_sql, urgency_sql_params
+
+T = TypeVar('T')
+
+# 任务查询的列顺序，与task_row_factory的解析顺序一致
+_TASK_COLUMN_NAMES = ('id', 'content', 'status', 'priority', 'due_date', 'reminder_time', 'created_at',
+                      'recurrence')
+TASK_COLUMNS = ', '.join(_TASK_COLUMN_NAMES)
+_TASK_COLUMNS_T = ', '.join(f't.{name}' for name in _TASK_COLUMN_NAMES)
+
+def task_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Task:
+    """由TASK_COLUMNS顺序的行元组直接构造Task，不经过中间字典
+
+    时间字段保留原始时间戳，由Task在首次访问时解码。
+    """
+    return Task(*row)
+
+# 批量操作时单条IN查询的最大参数个数
+_ID_CHUNK_SIZE = 500
+
+# apply_batch中update操作允许修改的字段（字段名会拼入SQL，必须限定）
+BATCH_UPDATE_FIELDS = ('content', 'priority', 'status', 'due_date', 'reminder_time', 'recurrence')
+
+class BatchResult(NamedTuple):
+    """apply_batch中单个操作的结果"""
+    ok: bool
+    value: Any = None  # add为新建的Task，其余为涉及的任务ID列表
+    error: Optional[str] = None
+
+class _BatchAborted(Exception):
+    """批量操作出错且不允许跳过，用于回滚整个事务"""
+
+# 流式遍历时每页读取的行数
+DEFAULT_PAGE_SIZE = 200
+
+# trigram全文索引可匹配的最短词长
+_FTS_MIN_TERM_LENGTH = 3
+
+def _like_conditions(terms: List[str]) -> Tuple[str, list]:
+    """为每个词生成转义后的LIKE子串匹配条件"""
+    params = []
+    for term in terms:
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(f"%{escaped}%")
+    clause = ' AND '.join(["t.content LIKE ? ESCAPE '\\'"] * len(terms))
+    return clause, params
 
 class TaskManager:
     def __init__(self):
-        self._init_database()
-    
-    def _init_database(self):
-        os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-        
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    priority TEXT,
-                    due_date DATETIME,
-                    reminder_time DATETIME,
-                    created_at DATETIME
-                )
-            ''')
-            
-            # 添加reminder_time列（如果不存在）
-            try:
-                conn.execute('ALTER TABLE tasks ADD COLUMN reminder_time DATETIME')
-            except sqlite3.OperationalError:
-                pass  # 列已存在
-            conn.commit()
-    
-    def add_task(self, content: str, priority: Optional[str] = None, 
-                 due_date: Optional[datetime] = None, reminder_time: Optional[datetime] = None) -> Task:
-        task = Task(content=content, priority=priority, due_date=due_date, reminder_time=reminder_time)
-        
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            cursor = conn.execute('''
-                INSERT INTO tasks (content, status, priority, due_date, reminder_time, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (task.content, task.status, task.priority,
-                  task.due_date.isoformat() if task.due_date else None,
-                  task.reminder_time.isoformat() if task.reminder_time else None,
-                  task.created_at.isoformat()))
-            
-            task.id = cursor.lastrowid
-            conn.commit()
-        
-        return task
-    
+        # 首次获取连接时完成建表，之后复用同一线程的连接
+        get_connection()
+        self._fts_available: Optional[bool] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_connection()
+
+    def _write(self, op: Callable[[sqlite3.Connection], T]) -> T:
+        """执行写操作：守护进程中经由共享写队列组提交，否则在本线程连接上单独提交"""
+        writer = get_active_writer()
+        if writer is not None:
+            return writer.run(op)
+
+        conn = self._connect()
+        with conn:
+            return op(conn)
+
+    def _cache(self) -> TaskCache:
+        return get_task_cache()
+
+    def cache_stats(self) -> dict:
+        """返回缓存命中/未命中计数，用于调优缓存大小"""
+        return self._cache().stats()
+
+    def add_task(self, content: str, priority: Optional[str] = None,
+                 due_date: Optional[datetime] = None, reminder_time: Optional[datetime] = None,
+                 recurrence: Optional[str] = None) -> Task:
+        return self.add_many([{'content': content, 'priority': priority, 'due_date': due_date,
+                               'reminder_time': reminder_time, 'recurrence': recurrence}])[0]
+
+    def add_many(self, items: Iterable[dict]) -> List[Task]:
+        """在同一事务中批量添加任务，items为add_task参数组成的字典"""
+        tasks = [Task(content=item['content'], priority=item.get('priority'),
+                      due_date=item.get('due_date'), reminder_time=item.get('reminder_time'),
+                      recurrence=item.get('recurrence'))
+                 for item in items]
+
+        def op(conn: sqlite3.Connection):
+            for task in tasks:
+                self._insert_task(conn, task)
+
+        self._write(op)
+        self._cache().invalidate()
+        return tasks
+
+    def _insert_task(self, conn: sqlite3.Connection, task: Task):
+        cursor = conn.execute('''
+            INSERT INTO tasks (content, status, priority, due_date, reminder_time, created_at,
+                               recurrence)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (task.content, task.status, task.priority,
+              to_epoch(task.due_date), to_epoch(task.reminder_time),
+              to_epoch(task.created_at), task.recurrence))
+        task.id = cursor.lastrowid
+
+    def apply_batch(self, operations: List[dict],
+                    continue_on_error: bool = False) -> Tuple[bool, List[BatchResult]]:
+        """在单个事务中依次执行一批操作，返回(是否已提交, 每个操作的结果)
+
+        操作为字典，op取值及参数：
+          add     content, priority, due_date, reminder_time, recurrence
+          done    task_ids
+          delete  task_ids
+          update  task_ids, fields（字段名限于BATCH_UPDATE_FIELDS）
+        每个操作在独立的SAVEPOINT中执行。某个操作出错（如任务不存在）时默认回滚
+        整个事务，返回的结果只到出错的操作为止；continue_on_error为True时只回滚
+        该操作并继续执行其余操作。
+        """
+        results: List[BatchResult] = []
+
+        def op(conn: sqlite3.Connection):
+            results.clear()
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            for operation in operations:
+                conn.execute('SAVEPOINT batch_op')
+                try:
+                    value = self._apply_operation(conn, operation)
+                except (ValueError, KeyError, TypeError, sqlite3.Error) as e:
+                    conn.execute('ROLLBACK TO batch_op')
+                    conn.execute('RELEASE batch_op')
+                    results.append(BatchResult(False, error=str(e) or type(e).__name__))
+                    if not continue_on_error:
+                        raise _BatchAborted()
+                    continue
+                conn.execute('RELEASE batch_op')
+                results.append(BatchResult(True, value))
+
+        try:
+            self._write(op)
+            committed = True
+        except _BatchAborted:
+            committed = False
+        self._cache().invalidate()
+        return committed, list(results)
+
+    def _apply_operation(self, conn: sqlite3.Connection, operation: dict):
+        kind = operation['op']
+        if kind == 'add':
+            task = Task(content=operation['content'], priority=operation.get('priority'),
+                        due_date=operation.get('due_date'), reminder_time=operation.get('reminder_time'),
+                        recurrence=operation.get('recurrence'))
+            if not task.content:
+                raise ValueError("任务内容不能为空")
+            self._insert_task(conn, task)
+            return task
+        if kind not in ('done', 'delete', 'update'):
+            raise ValueError(f"未知的操作: {kind}")
+
+        task_ids = list(dict.fromkeys(operation['task_ids']))
+        existing = self._existing_ids(conn, task_ids)
+        missing = [task_id for task_id in task_ids if task_id not in existing]
+        if missing:
+            raise ValueError(f"任务不存在: {', '.join(map(str, missing))}")
+        if kind == 'delete':
+            conn.executemany('DELETE FROM tasks WHERE id = ?', [(task_id,) for task_id in task_ids])
+            return task_ids
+
+        if kind == 'done':
+            self._complete(conn, task_ids, datetime.now())
+            return task_ids
+
+        fields = dict(operation['fields'])
+        unknown = set(fields) - set(BATCH_UPDATE_FIELDS)
+        if unknown or not fields:
+            raise ValueError(f"无效的更新字段: {', '.join(sorted(unknown)) or '(空)'}")
+        fields = self._with_completion_time(fields)
+        set_clause = ', '.join(f"{key} = ?" for key in fields)
+        values = self._encode_values(fields)
+        conn.executemany(f'UPDATE tasks SET {set_clause} WHERE id = ?',
+                         [values + [task_id] for task_id in task_ids])
+        return task_ids
+
+    def _task_cursor(self, conn: sqlite3.Connection, sql: str, params=()) -> sqlite3.Cursor:
+        """执行任务查询，结果行直接构造为Task"""
+        cursor = conn.cursor()
+        cursor.row_factory = task_row_factory
+        return cursor.execute(sql, params)
+
+    def _query_tasks(self, where: str = '', params: tuple = ()) -> List[Task]:
+        conn = self._connect()
+        cache = self._cache()
+        cache.sync(conn)
+        key = (where, tuple(params))
+        tasks = cache.get_query(key)
+        if tasks is not None:
+            return tasks
+
+        sql = f'SELECT {TASK_COLUMNS} FROM tasks'
+        if where:
+            sql += f' WHERE {where}'
+        sql += ' ORDER BY created_at DESC, id DESC'
+        tasks = self._task_cursor(conn, sql, params).fetchall()
+        cache.put_query(key, tasks)
+        return tasks
+
+    def iter_tasks(self, status: Optional[str] = None, descending: bool = True,
+                   page_size: int = DEFAULT_PAGE_SIZE, offset: int = 0,
+                   limit: Optional[int] = None, archived: bool = False) -> Iterator[Task]:
+        """按创建时间流式遍历任务，archived为True时遍历归档表
+
+        使用(created_at, id)作为游标进行键集分页，每页单独查询，
+        内存占用与首行返回时间不随历史任务数量增长。
+        """
+        table = 'tasks_archive' if archived else 'tasks'
+        if limit is not None and limit <= 0:
+            return
+
+        direction = 'DESC' if descending else 'ASC'
+        comparison = '<' if descending else '>'
+        conditions = []
+        params: list = []
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+
+        cursor_key = None
+        remaining = limit
+        while True:
+            where = list(conditions)
+            page_params = list(params)
+            if cursor_key is not None:
+                where.append(f'(created_at, id) {comparison} (?, ?)')
+                page_params.extend(cursor_key)
+
+            size = page_size if remaining is None else min(page_size, remaining)
+            sql = f'SELECT {TASK_COLUMNS} FROM {table}'
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            sql += f' ORDER BY created_at {direction}, id {direction} LIMIT ?'
+            page_params.append(size)
+            # OFFSET只作用于第一页，之后依靠游标定位
+            if cursor_key is None and offset:
+                sql += ' OFFSET ?'
+                page_params.append(offset)
+
+            tasks = self._task_cursor(self._connect(), sql, page_params).fetchall()
+            yield from tasks
+
+            if remaining is not None:
+                remaining -= len(tasks)
+                if remaining <= 0:
+                    return
+            if len(tasks) < size:
+                return
+            last = tasks[-1]
+            cursor_key = (to_epoch(last.created_at), last.id)
+
     def get_all_tasks(self) -> List[Task]:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('SELECT * FROM tasks ORDER BY created_at DESC')
-            rows = cursor.fetchall()
-        
-        tasks = []
-        for row in rows:
-            task_data = dict(row)
-            if task_data['due_date']:
-                task_data['due_date'] = datetime.fromisoformat(task_data['due_date'])
-            if task_data['reminder_time']:
-                task_data['reminder_time'] = datetime.fromisoformat(task_data['reminder_time'])
-            if task_data['created_at']:
-                task_data['created_at'] = datetime.fromisoformat(task_data['created_at'])
-            tasks.append(Task(**task_data))
-        
+        return list(self.iter_tasks())
+
+    def get_pending_tasks(self) -> List[Task]:
+        """获取所有未完成任务"""
+        return self._query_tasks("status = 'pending'")
+
+    def count_tasks(self, status: Optional[str] = None) -> int:
+        """统计任务数，按状态统计时使用status开头的索引"""
+        if status is None:
+            return self._connect().execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+        return self._connect().execute('SELECT COUNT(*) FROM tasks WHERE status = ?',
+                                       (status,)).fetchone()[0]
+
+    def get_ranked_pending(self, limit: int, offset: int = 0,
+                           now: Optional[datetime] = None) -> List[Task]:
+        """按紧急度在SQL中排序分页的未完成普通任务（不含重复任务）
+
+        ORDER BY ... LIMIT只保留前offset+limit行，不需要在Python中对全部任务排序；
+        紧急度相同的按创建时间倒序，与rank_tasks(get_pending_tasks())的顺序一致。
+        """
+        sql = (f"SELECT {TASK_COLUMNS} FROM tasks WHERE status = 'pending' AND recurrence IS NULL "
+               f"ORDER BY {urgency_sql()} DESC, created_at DESC, id DESC LIMIT ? OFFSET ?")
+        params = urgency_sql_params(now) + (limit, offset)
+        return self._task_cursor(self._connect(), sql, params).fetchall()
+
+    def get_tasks_due_between(self, start: Optional[datetime], end: datetime) -> List[Task]:
+        """获取截止时间在[start, end)内的未完成任务，start为None表示不设下限"""
+        if start is None:
+            return self._query_tasks("status = 'pending' AND due_date < ?", (to_epoch(end),))
+        return self._query_tasks("status = 'pending' AND due_date >= ? AND due_date < ?",
+                                 (to_epoch(start), to_epoch(end)))
+
+    def get_pending_reminders_after(self, ts: datetime) -> List[Task]:
+        """获取提醒时间晚于ts的未完成任务"""
+        return self._query_tasks("status = 'pending' AND reminder_time > ?", (to_epoch(ts),))
+
+    def get_pending_reminders_between(self, start: datetime, end: datetime) -> List[Task]:
+        """获取提醒时间在(start, end]内的未完成任务"""
+        return self._query_tasks("status = 'pending' AND reminder_time > ? AND reminder_time <= ?",
+                                 (to_epoch(start), to_epoch(end)))
+
+    def get_recurring_tasks(self) -> List[Task]:
+        """获取所有未完成的重复任务"""
+        return self._query_tasks("status = 'pending' AND recurrence IS NOT NULL")
+
+    def get_today_tasks(self, day: Optional[date] = None) -> List[Task]:
+        """获取今日相关的未完成任务：今天截止、今天提醒或已过期
+
+        重复任务按规则计算当天的发生时间，每次发生返回一个只在内存中的实例。
+        """
+        day = day or date.today()
+        start = datetime.combine(day, time.min)
+        end = datetime.combine(day + timedelta(days=1), time.min)
+        tasks = self._query_tasks(
+            "status = 'pending' AND recurrence IS NULL "
+            "AND (due_date < ? OR (reminder_time >= ? AND reminder_time < ?))",
+            (to_epoch(end), to_epoch(start), to_epoch(end)))
+        for task in self.get_recurring_tasks():
+            tasks.extend(occurrence_of(task, at) for at in occurrences_between(task, start, end))
         return tasks
-    
+
+    def search(self, query: str, limit: int = 20) -> List[Task]:
+        """全文搜索任务内容，按相关度排序
+
+        trigram索引只能匹配不少于3个字符的词，较短的词作为LIKE条件附加过滤；
+        全部为短词或没有全文索引时退化为LIKE查询。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        long_terms = [term for term in terms if len(term) >= _FTS_MIN_TERM_LENGTH]
+        conn = self._connect()
+        if long_terms and self._has_fts(conn):
+            short_terms = [term for term in terms if len(term) < _FTS_MIN_TERM_LENGTH]
+            like_clause, like_params = _like_conditions(short_terms)
+            match = ' AND '.join('"' + term.replace('"', '""') + '"' for term in long_terms)
+            sql = (f'SELECT {_TASK_COLUMNS_T} FROM tasks_fts f JOIN tasks t ON t.id = f.rowid '
+                   'WHERE tasks_fts MATCH ?')
+            if like_clause:
+                sql += f' AND {like_clause}'
+            sql += ' ORDER BY f.rank LIMIT ?'
+            tasks = self._task_cursor(conn, sql, [match] + like_params + [limit]).fetchall()
+        else:
+            like_clause, like_params = _like_conditions(terms)
+            sql = (f"SELECT {_TASK_COLUMNS_T} FROM tasks t WHERE {like_clause} "
+                   "ORDER BY t.status = 'completed', t.created_at DESC, t.id DESC LIMIT ?")
+            tasks = self._task_cursor(conn, sql, like_params + [limit]).fetchall()
+
+        return tasks
+
+    def _has_fts(self, conn: sqlite3.Connection) -> bool:
+        if self._fts_available is None:
+            row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone()
+            self._fts_available = row is not None
+        return self._fts_available
+
+    def archive_completed(self, older_than_days: int) -> int:
+        """将完成超过指定天数的任务移入归档表，返回归档的任务数"""
+        cutoff = to_epoch(datetime.now() - timedelta(days=older_than_days))
+
+        def op(conn: sqlite3.Connection) -> int:
+            conn.execute(f'''
+                INSERT INTO tasks_archive ({TASK_COLUMNS}, completed_at, archived_at)
+                SELECT {TASK_COLUMNS}, completed_at, ? FROM tasks
+                WHERE status = 'completed' AND completed_at < ?
+            ''', (to_epoch(datetime.now()), cutoff))
+            cursor = conn.execute("DELETE FROM tasks WHERE status = 'completed' AND completed_at < ?",
+                                  (cutoff,))
+            return cursor.rowcount
+
+        count = self._write(op)
+        if count:
+            self._cache().clear()
+        return count
+
+    def restore_archived(self, task_ids: Iterable[int]) -> Dict[int, bool]:
+        """将归档任务移回任务表，返回每个ID是否恢复成功"""
+        task_ids = list(dict.fromkeys(task_ids))
+        restored = set()
+
+        def op(conn: sqlite3.Connection):
+            for i in range(0, len(task_ids), _ID_CHUNK_SIZE):
+                chunk = task_ids[i:i + _ID_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor = conn.execute(f'SELECT id FROM tasks_archive WHERE id IN ({placeholders})', chunk)
+                chunk_ids = [row[0] for row in cursor]
+                if not chunk_ids:
+                    continue
+                placeholders = ', '.join('?' * len(chunk_ids))
+                conn.execute(f'''
+                    INSERT INTO tasks ({TASK_COLUMNS}, completed_at)
+                    SELECT {TASK_COLUMNS}, completed_at FROM tasks_archive WHERE id IN ({placeholders})
+                ''', chunk_ids)
+                conn.execute(f'DELETE FROM tasks_archive WHERE id IN ({placeholders})', chunk_ids)
+                restored.update(chunk_ids)
+
+        self._write(op)
+        self._cache().invalidate(restored)
+        return {task_id: task_id in restored for task_id in task_ids}
+
+    def _with_completion_time(self, fields: dict) -> dict:
+        """状态变更时同步维护completed_at"""
+        if 'status' in fields and 'completed_at' not in fields:
+            fields = dict(fields)
+            fields['completed_at'] = datetime.now() if fields['status'] == 'completed' else None
+        return fields
+
+    def _encode_values(self, fields: dict) -> list:
+        """将datetime字段值编码为整数时间戳"""
+        return [to_epoch(value) if isinstance(value, datetime) else value
+                for value in fields.values()]
+
     def update_task(self, task_id: int, **kwargs) -> bool:
         if not kwargs:
             return False
-            
+
+        kwargs = self._with_completion_time(kwargs)
         set_clause = ', '.join([f"{key} = ?" for key in kwargs.keys()])
-        values = list(kwargs.values())
+        values = self._encode_values(kwargs)
         values.append(task_id)
-        
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            cursor = conn.execute(f'UPDATE tasks SET {set_clause} WHERE id = ?', values)
-            conn.commit()
-            return cursor.rowcount > 0
-    
+
+        updated = self._write(
+            lambda conn: conn.execute(f'UPDATE tasks SET {set_clause} WHERE id = ?', values).rowcount > 0)
+        self._cache().invalidate([task_id])
+        return updated
+
+    def _existing_ids(self, conn: sqlite3.Connection, task_ids: List[int]) -> set:
+        """查询task_ids中实际存在的ID（分块避免超出SQL参数上限）"""
+        existing = set()
+        for i in range(0, len(task_ids), _ID_CHUNK_SIZE):
+            chunk = task_ids[i:i + _ID_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = conn.execute(f'SELECT id FROM tasks WHERE id IN ({placeholders})', chunk)
+            existing.update(row[0] for row in cursor)
+        return existing
+
+    def update_many(self, task_ids: Iterable[int], **kwargs) -> Dict[int, bool]:
+        """在同一事务中批量更新任务，返回每个ID是否更新成功"""
+        task_ids = list(dict.fromkeys(task_ids))
+        if not kwargs or not task_ids:
+            return {task_id: False for task_id in task_ids}
+
+        kwargs = self._with_completion_time(kwargs)
+        set_clause = ', '.join([f"{key} = ?" for key in kwargs.keys()])
+        values = self._encode_values(kwargs)
+
+        def op(conn: sqlite3.Connection) -> set:
+            existing = self._existing_ids(conn, task_ids)
+            conn.executemany(f'UPDATE tasks SET {set_clause} WHERE id = ?',
+                             [values + [task_id] for task_id in task_ids if task_id in existing])
+            return existing
+
+        existing = self._write(op)
+        self._cache().invalidate(existing)
+
+        return {task_id: task_id in existing for task_id in task_ids}
+
+    def complete_many(self, task_ids: Iterable[int], now: Optional[datetime] = None) -> Dict[int, bool]:
+        """在同一事务中批量完成任务，返回每个ID是否存在
+
+        重复任务不标记为完成，而是把起点移到下一次发生时间；规则已结束时才标记完成。
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids:
+            return {}
+        now = now or datetime.now()
+
+        def op(conn: sqlite3.Connection) -> set:
+            existing = self._existing_ids(conn, task_ids)
+            self._complete(conn, [task_id for task_id in task_ids if task_id in existing], now)
+            return existing
+
+        existing = self._write(op)
+        self._cache().invalidate(existing)
+
+        return {task_id: task_id in existing for task_id in task_ids}
+
+    def _complete(self, conn: sqlite3.Connection, task_ids: List[int], now: datetime):
+        """完成已确认存在的任务，重复任务顺延到下一次发生"""
+        advanced_ids = set()
+        for i in range(0, len(task_ids), _ID_CHUNK_SIZE):
+            chunk = task_ids[i:i + _ID_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            recurring = self._task_cursor(
+                conn, f"SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders}) "
+                      "AND status = 'pending' AND recurrence IS NOT NULL", chunk).fetchall()
+            for task in recurring:
+                advanced = advance(task, now)
+                if advanced is None:
+                    continue
+                conn.execute('UPDATE tasks SET due_date = ?, reminder_time = ?, recurrence = ? WHERE id = ?',
+                             (to_epoch(advanced.due_date), to_epoch(advanced.reminder_time),
+                              advanced.recurrence, task.id))
+                advanced_ids.add(task.id)
+
+        fields = self._with_completion_time({'status': 'completed'})
+        values = self._encode_values(fields)
+        conn.executemany('UPDATE tasks SET status = ?, completed_at = ? WHERE id = ?',
+                         [values + [task_id] for task_id in task_ids if task_id not in advanced_ids])
+
+    def delete_many(self, task_ids: Iterable[int]) -> Dict[int, bool]:
+        """在同一事务中批量删除任务，返回每个ID是否删除成功"""
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids:
+            return {}
+
+        def op(conn: sqlite3.Connection) -> set:
+            existing = self._existing_ids(conn, task_ids)
+            conn.executemany('DELETE FROM tasks WHERE id = ?',
+                             [(task_id,) for task_id in task_ids if task_id in existing])
+            return existing
+
+        existing = self._write(op)
+        self._cache().invalidate(existing)
+
+        return {task_id: task_id in existing for task_id in task_ids}
+
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return None
-                
-            task_data = dict(row)
-            if task_data['due_date']:
-                task_data['due_date'] = datetime.fromisoformat(task_data['due_date'])
-            if task_data['reminder_time']:
-                task_data['reminder_time'] = datetime.fromisoformat(task_data['reminder_time'])
-            if task_data['created_at']:
-                task_data['created_at'] = datetime.fromisoformat(task_data['created_at'])
-            
-            return Task(**task_data)
-    
+        conn = self._connect()
+        cache = self._cache()
+        cache.sync(conn)
+        task = cache.get(task_id)
+        if task is not None:
+            return task
+
+        task = self._task_cursor(conn, f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?',
+                                 (task_id,)).fetchone()
+        if not task:
+            return None
+
+        cache.put(task)
+        return task
+
     def delete_task(self, task_id: int) -> bool:
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            cursor = conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            conn.commit()
-            return cursor.rowcount > 0
\ No newline at end of file
+        deleted = self._write(
+            lambda conn: conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,)).rowcount > 0)
+        self._cache().invalidate([task_id])
+        return deleted
@@ -0,0 +1,198 @@
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Tuple, TypeVar
+from managers.database import get_connection
+import config
+
+T = TypeVar('T')
+
+_STOP = object()
+
+# 收集批次时队列空闲超过该时长（秒）即提交
+_IDLE_GAP = 0.0005
+
+
+class WriteQueue:
+    """单写线程队列（组提交）
+
+    各线程把写操作提交到队列，由唯一的写线程执行。短时间窗口内到达的
+    多个写操作合并到同一个事务中提交，每个操作在独立的SAVEPOINT中执行，
+    单个操作失败只回滚自身。每个调用方通过Future获得自己的结果或异常。
+    """
+
+    def __init__(self, batch_window: float = None, max_batch: int = None,
+                 path: Optional[str] = None):
+        self.batch_window = config.WRITE_BATCH_WINDOW if batch_window is None else batch_window
+        self.max_batch = config.WRITE_MAX_BATCH if max_batch is None else max_batch
+        self.path = path
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # 停止标志与入队在同一把锁下检查，保证_STOP之后不会再有写操作入队
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.batches = 0
+        self.operations = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动写线程"""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='echo-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """处理完队列中已有的写操作后停止写线程，之后提交的写操作直接失败"""
+        with self._lock:
+            if not self.running or self._stopping:
+                return
+            self._stopping = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, func: Callable[[sqlite3.Connection], T]) -> 'Future[T]':
+        """提交写操作，func在写线程的事务中以连接为参数执行"""
+        # concurrent.futures会连带导入logging，只在守护进程真正提交写操作时加载
+        from concurrent.futures import Future
+        future: 'Future[T]' = Future()
+        if threading.current_thread() is self._thread:
+            # 写操作内部再次提交时直接在当前事务中执行，避免自我等待
+            try:
+                future.set_result(func(self._connect()))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            if not self.running:
+                future.set_exception(RuntimeError("写线程未启动"))
+            elif self._stopping:
+                future.set_exception(RuntimeError("写线程正在停止"))
+            else:
+                self._queue.put((func, future))
+        return future
+
+    def run(self, func: Callable[[sqlite3.Connection], T], timeout: Optional[float] = None) -> T:
+        """提交写操作并等待提交完成"""
+        return self.submit(func).result(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'batches': self.batches,
+            'operations': self.operations,
+            'avg_batch_size': self.operations / self.batches if self.batches else 0.0,
+            'pending': self._queue.qsize(),
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_connection(self.path)
+
+    def _run(self):
+        try:
+            self._process()
+        finally:
+            # 写线程退出后队列中剩余的写操作不会再执行，通知调用方而不是让其一直等待
+            self._fail_pending(RuntimeError("写线程已停止"))
+
+    def _fail_pending(self, error: Exception):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(error)
+
+    def _process(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+
+            # 在时间窗口内继续收集写操作，合并为一次提交；
+            # 队列短暂空闲即提前结束，避免调用方无谓等待整个窗口
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=min(remaining, _IDLE_GAP))
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: List[Tuple[Callable, 'Future']]):
+        conn = None
+        results = []
+        try:
+            conn = self._connect()
+            self._begin(conn)
+            for index, (func, future) in enumerate(batch):
+                savepoint = f'op_{index}'
+                conn.execute(f'SAVEPOINT {savepoint}')
+                try:
+                    results.append((future, func(conn), None))
+                    conn.execute(f'RELEASE {savepoint}')
+                except Exception as e:
+                    conn.execute(f'ROLLBACK TO {savepoint}')
+                    conn.execute(f'RELEASE {savepoint}')
+                    results.append((future, None, e))
+            conn.commit()
+        except Exception as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _begin(self, conn: sqlite3.Connection):
+        """开启写事务，数据库被其他进程锁定时有限次重试"""
+        for attempt in range(config.WRITE_LOCK_RETRIES + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                return
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == config.WRITE_LOCK_RETRIES:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+
+
+_active_writer: Optional[WriteQueue] = None
+
+
+def install_writer(writer: Optional[WriteQueue]):
+    """设置进程内的共享写队列，TaskManager的写操作将经由它执行"""
+    global _active_writer
+    _active_writer = writer
+
+
+def get_active_writer() -> Optional[WriteQueue]:
+    writer = _active_writer
+    if writer is not None and writer.running:
+        return writer
+    return None
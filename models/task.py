@@ -1,18 +1,48 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
+
+# 延迟解码的时间字段 -> 保存原始时间戳的slot
+_RAW_FIELDS = {'due_date': '_raw_due_date', 'reminder_time': '_raw_reminder_time',
+               'created_at': '_raw_created_at'}
 
 class Task:
+    # 使用__slots__避免每个实例的__dict__，降低大量任务时的内存占用
+    __slots__ = ('id', 'content', 'status', 'priority', 'due_date', 'reminder_time', 'created_at',
+                 'recurrence', '_raw_due_date', '_raw_reminder_time', '_raw_created_at')
+    
     def __init__(self, id: Optional[int] = None, content: str = "", 
                  status: str = "pending", priority: Optional[str] = None,
-                 due_date: Optional[datetime] = None, reminder_time: Optional[datetime] = None,
-                 created_at: Optional[datetime] = None):
+                 due_date: Union[datetime, int, None] = None, reminder_time: Union[datetime, int, None] = None,
+                 created_at: Union[datetime, int, None] = None, recurrence: Optional[str] = None):
         self.id = id
         self.content = content
         self.status = status
         self.priority = priority
-        self.due_date = due_date
-        self.reminder_time = reminder_time
-        self.created_at = created_at or datetime.now()
+        # 时间字段可直接传入数据库中的整数时间戳：先存入原始值slot，
+        # 公开的slot保持未赋值，首次访问时由__getattr__解码
+        if type(due_date) is int:
+            self._raw_due_date = due_date
+        else:
+            self.due_date = due_date
+        if type(reminder_time) is int:
+            self._raw_reminder_time = reminder_time
+        else:
+            self.reminder_time = reminder_time
+        if type(created_at) is int:
+            self._raw_created_at = created_at
+        else:
+            self.created_at = created_at or datetime.now()
+        # RRULE重复规则（如 FREQ=DAILY），以提醒时间或截止日期为起点
+        self.recurrence = recurrence
+    
+    def __getattr__(self, name: str):
+        # 只在slot未赋值时调用：解码原始时间戳并写回slot，之后的访问不再经过这里
+        raw_name = _RAW_FIELDS.get(name)
+        if raw_name is None:
+            raise AttributeError(name)
+        value = datetime.fromtimestamp(getattr(self, raw_name))
+        setattr(self, name, value)
+        return value
     
     def to_dict(self) -> dict:
         return {
@@ -22,7 +52,8 @@ class Task:
             'priority': self.priority,
             'due_date': self.due_date.isoformat() if self.due_date else None,
             'reminder_time': self.reminder_time.isoformat() if self.reminder_time else None,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at.isoformat(),
+            'recurrence': self.recurrence
         }
     
     @classmethod
@@ -31,7 +62,8 @@ class Task:
             id=data.get('id'),
             content=data.get('content', ''),
             status=data.get('status', 'pending'),
-            priority=data.get('priority')
+            priority=data.get('priority'),
+            recurrence=data.get('recurrence')
         )
         
         if data.get('due_date'):
@@ -41,4 +73,20 @@ class Task:
         if data.get('created_at'):
             task.created_at = datetime.fromisoformat(data['created_at'])
             
-        return task
\ No newline at end of file
+        return task
+    
+    def copy(self) -> 'Task':
+        """浅拷贝（字段值均为不可变对象），尚未解码的时间字段在副本中仍保持未解码"""
+        clone = Task.__new__(Task)
+        clone.id = self.id
+        clone.content = self.content
+        clone.status = self.status
+        clone.priority = self.priority
+        clone.recurrence = self.recurrence
+        for name, raw_name in _RAW_FIELDS.items():
+            # 绕过__getattr__读取slot，未解码的字段只复制原始时间戳
+            try:
+                object.__setattr__(clone, name, object.__getattribute__(self, name))
+            except AttributeError:
+                object.__setattr__(clone, raw_name, object.__getattribute__(self, raw_name))
+        return clone
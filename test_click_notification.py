@@ -26,6 +26,8 @@ def test_click_notification():
         callback=open_task_window,
         timeout=30
     )
+    # 通知在后台线程中异步显示，退出前等待队列投递完毕
+    notification_helper.close()
     
     print("通知已发送，请观察：")
     print("1. 是否弹出桌面通知")
@@ -0,0 +1,120 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from managers import database
+from managers.task_manager import TaskManager
+from ui.batch_parser import parse_batch
+from ui.cli_handler import CLIHandler
+
+NOW = datetime(2024, 6, 5, 10, 0)
+
+class TestBatchParser(unittest.TestCase):
+    
+    def test_commands_and_json(self):
+        """命令写法与JSON写法解析为相同的操作，跳过空行和注释"""
+        lines = parse_batch([
+            '# 注释', '',
+            'add "写周报" -p 高 -r "明天 9点"',
+            '{"op": "add", "content": "写周报", "priority": "高", "remind": "明天 9点"}',
+            'done 3 5-6',
+            '{"op": "delete", "ids": [7, "8-9"]}',
+            'update 2 -p 低 -s completed',
+            '{"op": "update", "ids": 2, "due": null, "content": "新内容"}',
+        ], now=NOW)
+        self.assertEqual([line.line_no for line in lines], [3, 4, 5, 6, 7, 8])
+        self.assertTrue(all(line.error is None for line in lines))
+        self.assertEqual(lines[0].operation, lines[1].operation)
+        self.assertEqual(lines[0].operation['reminder_time'], datetime(2024, 6, 6, 9, 0))
+        self.assertEqual(lines[2].operation, {'op': 'done', 'task_ids': [3, 5, 6]})
+        self.assertEqual(lines[3].operation, {'op': 'delete', 'task_ids': [7, 8, 9]})
+        self.assertEqual(lines[4].operation['fields'], {'priority': "低", 'status': "completed"})
+        self.assertEqual(lines[5].operation['fields'], {'due_date': None, 'content': "新内容"})
+    
+    def test_invalid_lines(self):
+        """无效的行记录原因，不影响其他行的解析"""
+        cases = [
+            ('frobnicate 3', "未知的操作"),
+            ('add', "content"),
+            ('add "未闭合', "无法解析命令"),
+            ('add 任务 -r 某个时候', "无效的提醒时间格式"),
+            ('add 任务 -R daily', "重复任务需要指定"),
+            ('done abc', "无效的任务ID"),
+            ('update 3', "没有要修改的字段"),
+            ('{"op": "add"', "无效的JSON"),
+            ('{"op": "update", "ids": 1, "status": "x"}', "无效的状态"),
+            ('{"op": "delete", "ids": 1, "content": "x"}', "只支持ids"),
+            ('{"op": "add", "content": "x", "sql": 1}', "未知的字段"),
+        ]
+        lines = parse_batch([text for text, _ in cases] + ['done 1'], now=NOW)
+        for line, (text, message) in zip(lines, cases):
+            with self.subTest(text=text):
+                self.assertIsNone(line.operation)
+                self.assertIn(message, line.error)
+        self.assertEqual(lines[-1].operation, {'op': 'done', 'task_ids': [1]})
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        
+        import config
+        self.original_db_path = config.DATABASE_PATH
+        config.DATABASE_PATH = self.temp_db.name
+        
+        self.task_manager = TaskManager()
+        self.cli = CLIHandler()
+    
+    def tearDown(self):
+        import config
+        config.DATABASE_PATH = self.original_db_path
+        
+        database.close_all()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.temp_db.name + suffix):
+                os.unlink(self.temp_db.name + suffix)
+    
+    def _run(self, lines, continue_on_error=False):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            committed = self.cli.run_batch(lines, continue_on_error)
+        return committed, output.getvalue()
+    
+    def test_applies_all_lines(self):
+        existing = self.task_manager.add_task("已有任务")
+        committed, output = self._run(['add 任务A -p 高', f'done {existing.id}', 'add 任务B'])
+        
+        self.assertTrue(committed)
+        self.assertIn("第2行 ✓ 已标记为完成", output)
+        self.assertIn("成功 3 条，失败 0 条", output)
+        self.assertEqual(sorted(t.content for t in self.task_manager.get_pending_tasks()), ["任务A", "任务B"])
+    
+    def test_rolls_back_on_error(self):
+        """任何一行出错时回滚全部操作"""
+        committed, output = self._run(['add 任务A', 'delete 999', 'add 任务B'])
+        
+        self.assertFalse(committed)
+        self.assertIn("第1行 ↺ 已回滚", output)
+        self.assertIn("第2行 ✗ 任务不存在: 999", output)
+        self.assertIn("第3行 - 未执行", output)
+        self.assertEqual(self.task_manager.get_all_tasks(), [])
+    
+    def test_invalid_line_runs_nothing(self):
+        committed, output = self._run(['add 任务A', 'done abc'])
+        self.assertFalse(committed)
+        self.assertIn("未执行任何操作", output)
+        self.assertEqual(self.task_manager.get_all_tasks(), [])
+    
+    def test_continue_on_error(self):
+        """跳过无效或出错的行，其余照常提交"""
+        committed, output = self._run(['add 任务A', 'done abc', 'delete 999', 'add 任务B'],
+                                      continue_on_error=True)
+        
+        self.assertTrue(committed)
+        self.assertIn("成功 2 条，失败 2 条", output)
+        self.assertEqual(sorted(t.content for t in self.task_manager.get_all_tasks()), ["任务A", "任务B"])
+
+if __name__ == '__main__':
+    unittest.main()
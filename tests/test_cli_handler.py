@@ -0,0 +1,55 @@
+import argparse
+import unittest
+from main import non_negative_int, positive_int
+from ui.cli_handler import MAX_ID_RANGE, parse_id_ranges, format_id_ranges
+
+class TestIdRanges(unittest.TestCase):
+    
+    def test_parse_single_ids(self):
+        """测试多个单独ID"""
+        self.assertEqual(parse_id_ranges(["3", "5"]), [3, 5])
+    
+    def test_parse_ranges(self):
+        """测试ID区间"""
+        self.assertEqual(parse_id_ranges(["3", "10-12"]), [3, 10, 11, 12])
+    
+    def test_parse_comma_and_duplicates(self):
+        """测试逗号分隔和重复ID去重"""
+        self.assertEqual(parse_id_ranges(["1,2", "2-3"]), [1, 2, 3])
+    
+    def test_parse_invalid(self):
+        """测试无效输入"""
+        with self.assertRaises(ValueError):
+            parse_id_ranges(["abc"])
+        with self.assertRaises(ValueError):
+            parse_id_ranges(["5-3"])
+    
+    def test_parse_range_too_large(self):
+        """测试超大区间被拒绝而不是展开"""
+        self.assertEqual(len(parse_id_ranges([f"1-{MAX_ID_RANGE}"])), MAX_ID_RANGE)
+        with self.assertRaises(ValueError):
+            parse_id_ranges(["1-3000000000"])
+    
+    def test_format_ranges(self):
+        """测试ID压缩显示"""
+        self.assertEqual(format_id_ranges([5, 1, 2, 3, 7, 8]), "1-3, 5, 7-8")
+
+class TestArgumentTypes(unittest.TestCase):
+    
+    def test_non_negative_int(self):
+        """测试--limit/--offset拒绝负数"""
+        self.assertEqual(non_negative_int("0"), 0)
+        self.assertEqual(non_negative_int("20"), 20)
+        for value in ("-2", "abc"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                non_negative_int(value)
+    
+    def test_positive_int(self):
+        """测试--limit拒绝0，避免在有任务时显示暂无任务"""
+        self.assertEqual(positive_int("1"), 1)
+        for value in ("0", "-2", "abc"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                positive_int(value)
+
+if __name__ == '__main__':
+    unittest.main()
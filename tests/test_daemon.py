@@ -0,0 +1,146 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from managers import database
+from managers.daemon import EchoDaemon
+from managers.rpc import RPCClient, RPCError, RPCServer, DaemonUnavailable, UNIX_SOCKETS_AVAILABLE
+from managers.task_manager import TaskManager
+from ui.cli_handler import CLIHandler
+
+@unittest.skipUnless(UNIX_SOCKETS_AVAILABLE, "平台不支持Unix域套接字")
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        
+        import config
+        self.original_db_path = config.DATABASE_PATH
+        self.original_socket_path = config.DAEMON_SOCKET_PATH
+        config.DATABASE_PATH = os.path.join(self.temp_dir, 'tasks.db')
+        config.DAEMON_SOCKET_PATH = os.path.join(self.temp_dir, 'echo.sock')
+        
+        self.daemon = EchoDaemon()
+        self.daemon.start()
+        self.cli = CLIHandler(daemon=RPCClient())
+        self.task_manager = TaskManager()
+    
+    def tearDown(self):
+        self.daemon.stop()
+        
+        import config
+        config.DATABASE_PATH = self.original_db_path
+        config.DAEMON_SOCKET_PATH = self.original_socket_path
+        
+        database.close_all()
+        shutil.rmtree(self.temp_dir)
+    
+    def _job_ids(self):
+        return set(self.daemon.reminder_manager.scheduler.get_job_ids())
+    
+    def test_add_schedules_reminder_in_daemon(self):
+        """通过守护进程添加任务时同步调度提醒"""
+        remind = (datetime.now() + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M')
+        task = self.cli.add_task("开会", "高", None, remind)
+        
+        self.assertEqual(task.priority, "高")
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).content, "开会")
+        self.assertIn(f"task_{task.id}", self._job_ids())
+    
+    def test_done_and_delete_remove_reminders(self):
+        """完成或删除任务时移除守护进程中的提醒"""
+        remind = (datetime.now() + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M')
+        first = self.cli.add_task("任务1", None, None, remind)
+        second = self.cli.add_task("任务2", None, None, remind)
+        
+        results = self.cli.mark_done([first.id, 999])
+        self.assertEqual(results, {first.id: True, 999: False})
+        self.cli.delete_task(second.id)
+        
+        self.assertEqual(self.task_manager.get_task_by_id(first.id).status, "completed")
+        self.assertIsNone(self.task_manager.get_task_by_id(second.id))
+        self.assertFalse({f"task_{first.id}", f"task_{second.id}"} & self._job_ids())
+    
+    def test_done_reschedules_recurring_reminder(self):
+        """完成重复任务时顺延到下一次发生并重新调度提醒，而不是结束整个系列"""
+        anchor = datetime.now().replace(second=0, microsecond=0) + timedelta(hours=1)
+        task = self.task_manager.add_task("喝水", reminder_time=anchor, recurrence="FREQ=HOURLY;INTERVAL=2")
+        self.daemon.reminder_manager.add_reminder(task)
+        
+        self.assertEqual(self.cli.mark_done(task.id), {task.id: True})
+        task = self.task_manager.get_task_by_id(task.id)
+        self.assertEqual(task.status, "pending")
+        self.assertEqual(task.reminder_time, anchor + timedelta(hours=2))
+        self.assertIn(f"task_{task.id}", self._job_ids())
+    
+    def test_batch_syncs_reminders(self):
+        """批量操作经由守护进程执行并同步提醒调度"""
+        first = self.cli.add_task("任务1", None, None, "1小时后")
+        committed = self.cli.run_batch(['add 新任务 -r "2小时后"', f'done {first.id}'])
+        
+        self.assertTrue(committed)
+        added = [t for t in self.task_manager.get_pending_tasks() if t.content == "新任务"]
+        self.assertEqual(len(added), 1)
+        self.assertIn(f"task_{added[0].id}", self._job_ids())
+        self.assertNotIn(f"task_{first.id}", self._job_ids())
+    
+    def test_fallback_without_daemon(self):
+        """守护进程未运行时直接访问数据库"""
+        self.daemon.stop()
+        self.assertFalse(os.path.exists(self.daemon.rpc_server.path))
+        
+        task = self.cli.add_task("离线添加")
+        self.assertEqual(self.cli.mark_done(task.id), {task.id: True})
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).status, "completed")
+    
+    def test_rpc_errors(self):
+        """未知方法返回错误，不回退为直接访问数据库"""
+        client = RPCClient()
+        self.assertEqual(client.call('ping')['pid'], os.getpid())
+        with self.assertRaises(RPCError):
+            client.call('no_such_method')
+        with self.assertRaises(DaemonUnavailable):
+            RPCClient(os.path.join(self.temp_dir, 'missing.sock')).call('ping')
+    
+    def test_rpc_methods_run_on_one_thread(self):
+        """每个请求由新线程收发，但方法都在同一个工作线程中执行，复用数据库连接"""
+        threads = set()
+        server = RPCServer({'who': lambda: threads.add(threading.get_ident())},
+                           os.path.join(self.temp_dir, 'other.sock'))
+        server.start()
+        try:
+            for _ in range(3):
+                RPCClient(server.path).call('who')
+        finally:
+            server.stop()
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.get_ident(), threads)
+    
+    def test_second_daemon_refused_before_scheduling(self):
+        """已有守护进程运行时，第二个实例在启动调度器和写线程之前就被拒绝"""
+        second = EchoDaemon()
+        with self.assertRaises(RuntimeError):
+            second.start()
+        self.assertFalse(second.reminder_manager.scheduler.running)
+        self.assertFalse(second.writer.running)
+        second.stop()
+        self.assertTrue(RPCClient().is_running())
+    
+    def test_stale_socket_replaced(self):
+        """遗留的套接字文件在启动时被清理，已有守护进程运行时拒绝启动"""
+        with self.assertRaises(RuntimeError):
+            EchoDaemon().rpc_server.start()
+        
+        self.daemon.stop()
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.daemon.rpc_server.path)
+        stale.close()
+        
+        self.daemon = EchoDaemon()
+        self.daemon.start()
+        self.assertTrue(RPCClient().is_running())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from datetime import datetime, date
-from utils.datetime_parser import parse_datetime
+from dateutil import parser
+from utils import datetime_parser
+from utils.datetime_parser import parse_datetime, parse_many
 
 class TestDateTimeParser(unittest.TestCase):
     
@@ -45,5 +47,39 @@ class TestDateTimeParser(unittest.TestCase):
         result = parse_datetime(None)
         self.assertIsNone(result)
 
+    def test_fast_path_matches_dateutil(self):
+        """常用格式的快速路径与dateutil结果一致"""
+        default = datetime.combine(date.today(), datetime.min.time())
+        for text in ["2024-12-25 18:00", "2024-1-5 9:05", "2024-12-25", "2024-2-29",
+                     "12-25 14:30", "1-5 9:05", "18:00", "7:30", "  18:00  "]:
+            with self.subTest(text=text):
+                self.assertEqual(parse_datetime(text), parser.parse(text, default=default))
+    
+    def test_out_of_range_falls_back(self):
+        """格式匹配但数值越界时按dateutil的规则处理"""
+        self.assertIsNone(parse_datetime("2024-13-45 10:00"))
+        self.assertIsNone(parse_datetime("25:00"))
+    
+    def test_other_formats_use_dateutil(self):
+        """其他格式仍由dateutil解析"""
+        self.assertEqual(parse_datetime("2024/12/25 18:00:30"), datetime(2024, 12, 25, 18, 0, 30))
+    
+    def test_cached_per_day(self):
+        """结果按(输入, 当天日期)缓存"""
+        datetime_parser._parse_cached.cache_clear()
+        parse_datetime("08:15")
+        parse_datetime("08:15")
+        self.assertEqual(datetime_parser._parse_cached.cache_info().hits, 1)
+        tomorrow = datetime_parser._parse_cached("08:15", date(2030, 1, 2))
+        self.assertEqual(tomorrow, datetime(2030, 1, 2, 8, 15))
+    
+    def test_parse_many(self):
+        """批量解析保持输入顺序，无效项为None"""
+        today = date.today()
+        self.assertEqual(parse_many(["2024-12-25", "", None, "bad", "09:00"]), [
+            datetime(2024, 12, 25), None, None, None,
+            datetime(today.year, today.month, today.day, 9, 0),
+        ])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
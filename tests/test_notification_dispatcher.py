@@ -0,0 +1,149 @@
+import threading
+import time
+import unittest
+from utils.notification_dispatcher import (NotificationDispatcher, NotificationBackend, FakeNotificationBackend,
+                                           OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK)
+from utils.notification_helper import NotificationHelper
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeNotificationBackend()
+    
+    def _dispatcher(self, **kwargs):
+        options = dict(workers=2, max_queue=10, overflow=OVERFLOW_DROP_OLDEST, block_timeout=0.1)
+        options.update(kwargs)
+        dispatcher = NotificationDispatcher(self.backend, **options)
+        self.addCleanup(self._stop, dispatcher)
+        return dispatcher
+    
+    def _stop(self, dispatcher):
+        self.backend.gate.set()
+        dispatcher.stop(2)
+    
+    def _titles(self):
+        return sorted(title for title, _, _, _ in self.backend.shown)
+    
+    def test_delivers_with_fixed_worker_pool(self):
+        """通知由固定数量的工作线程异步显示"""
+        dispatcher = self._dispatcher(max_queue=100)
+        before = threading.active_count()
+        for i in range(50):
+            self.assertTrue(dispatcher.submit(f"通知{i:02d}", "内容"))
+        self.assertLessEqual(threading.active_count() - before, 2)
+        dispatcher.stop(2)
+        
+        self.assertEqual(self._titles(), [f"通知{i:02d}" for i in range(50)])
+        self.assertEqual(dispatcher.stats()['delivered'], 50)
+    
+    def test_drop_oldest(self):
+        """队列满时丢弃最早等待的通知"""
+        self.backend.gate.clear()
+        dispatcher = self._dispatcher(workers=1, max_queue=3)
+        dispatcher.submit("占用工作线程", "")
+        time.sleep(0.05)
+        for i in range(5):
+            self.assertTrue(dispatcher.submit(f"通知{i}", ""))
+        self.assertEqual(dispatcher.stats()['dropped'], 2)
+        
+        self.backend.gate.set()
+        dispatcher.stop(2)
+        self.assertEqual(self._titles(), ["占用工作线程", "通知2", "通知3", "通知4"])
+    
+    def test_drop_newest(self):
+        """队列满时拒绝新通知"""
+        self.backend.gate.clear()
+        dispatcher = self._dispatcher(workers=1, max_queue=2, overflow=OVERFLOW_DROP_NEWEST)
+        dispatcher.submit("占用工作线程", "")
+        time.sleep(0.05)
+        results = [dispatcher.submit(f"通知{i}", "") for i in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        
+        self.backend.gate.set()
+        dispatcher.stop(2)
+        self.assertEqual(self._titles(), ["占用工作线程", "通知0", "通知1"])
+    
+    def test_block_applies_backpressure(self):
+        """'block'策略下提交方等待空位，超时后拒绝"""
+        self.backend.gate.clear()
+        dispatcher = self._dispatcher(workers=1, max_queue=1, overflow=OVERFLOW_BLOCK, block_timeout=0.1)
+        dispatcher.submit("占用工作线程", "")
+        time.sleep(0.05)
+        self.assertTrue(dispatcher.submit("排队", ""))
+        
+        start = time.monotonic()
+        self.assertFalse(dispatcher.submit("超时", ""))
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        
+        threading.Timer(0.05, self.backend.gate.set).start()
+        self.assertTrue(dispatcher.submit("等待后接受", "", ))
+    
+    def test_latency_metrics(self):
+        """记录计划时间、开始投递和显示完成的时间"""
+        self.backend.delay = 0.05
+        dispatcher = self._dispatcher()
+        scheduled_at = time.time() - 1
+        dispatcher.submit("迟到的提醒", "", scheduled_at=scheduled_at)
+        dispatcher.stop(2)
+        
+        record = dispatcher.records[0]
+        self.assertEqual(record.scheduled_at, scheduled_at)
+        self.assertGreaterEqual(record.queue_delay, 1)
+        self.assertGreaterEqual(record.show_duration, 0.05)
+        stats = dispatcher.stats()
+        self.assertGreaterEqual(stats['queue_delay_p50'], 1)
+        self.assertGreaterEqual(stats['show_p95'], 0.05)
+    
+    def test_backend_failure_counted(self):
+        """后端异常计为失败，不影响工作线程"""
+        self.backend.fail = True
+        dispatcher = self._dispatcher()
+        dispatcher.submit("失败", "")
+        time.sleep(0.05)
+        self.backend.fail = False
+        dispatcher.submit("成功", "")
+        dispatcher.stop(2)
+        
+        stats = dispatcher.stats()
+        self.assertEqual((stats['failed'], stats['delivered']), (1, 1))
+        self.assertIsNone(dispatcher.records[0].shown_at)
+    
+    def test_submit_after_stop_rejected(self):
+        """显式停止后不再自动重启工作线程，提交被拒绝"""
+        dispatcher = self._dispatcher()
+        dispatcher.submit("停止前", "")
+        dispatcher.stop(2)
+        
+        self.assertFalse(dispatcher.submit("停止后", ""))
+        self.assertFalse(dispatcher.running)
+        self.assertEqual(self._titles(), ["停止前"])
+        
+        dispatcher.start()
+        self.assertTrue(dispatcher.submit("重新启动后", ""))
+    
+    def test_invalid_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            NotificationDispatcher(self.backend, overflow='unknown')
+    
+    def test_incomplete_backend_rejected(self):
+        """未实现show()的后端在构造时报错"""
+        class SilentBackend(NotificationBackend):
+            pass
+        
+        with self.assertRaises(TypeError):
+            SilentBackend()
+
+class TestNotificationHelperDispatch(unittest.TestCase):
+    def test_reminders_go_through_queue(self):
+        """提醒经合并后放入分发队列，由后端显示"""
+        backend = FakeNotificationBackend()
+        helper = NotificationHelper(backend=backend)
+        for i in range(3):
+            helper.show_reminder("任务提醒", f"任务{i}", scheduled_at=time.time())
+        helper.close()
+        
+        self.assertEqual(len(backend.shown), 1)
+        self.assertEqual(backend.shown[0][0], "任务提醒 (3)")
+        self.assertEqual(helper.dispatcher.stats()['delivered'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
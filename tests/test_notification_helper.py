@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from utils.notification_helper import NotificationCoalescer
+from utils.windows_notification import run_callback_async
+
+class TestNotificationCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.sent = []
+        self.delivered = threading.Event()
+    
+    def _send(self, title, message, callback, timeout, scheduled_at=None):
+        self.sent.append((title, message, callback, timeout))
+        self.delivered.set()
+    
+    def _coalescer(self, **kwargs):
+        options = dict(window=0.05, max_rate=100, rate_period=60, max_lines=10, max_pending=1000)
+        options.update(kwargs)
+        coalescer = NotificationCoalescer(self._send, **options)
+        self.addCleanup(coalescer.close)
+        return coalescer
+    
+    def test_single_notification_sent_unchanged(self):
+        """窗口内只有一条通知时原样发送"""
+        coalescer = self._coalescer()
+        coalescer.add("任务提醒", "开会\n截止时间: 18:00", None, 10)
+        self.assertTrue(self.delivered.wait(2))
+        self.assertEqual(self.sent, [("任务提醒", "开会\n截止时间: 18:00", None, 10)])
+    
+    def test_burst_coalesced_into_digest(self):
+        """同一窗口内的200条提醒合并为一条摘要"""
+        callback = lambda: None
+        coalescer = self._coalescer(max_lines=3)
+        for i in range(200):
+            coalescer.add("任务提醒", f"任务{i}\n截止时间: 18:00", callback, 10)
+        self.assertTrue(self.delivered.wait(2))
+        time.sleep(0.1)
+        
+        self.assertEqual(len(self.sent), 1)
+        title, message, sent_callback, _ = self.sent[0]
+        self.assertEqual(title, "任务提醒 (200)")
+        self.assertEqual(message.splitlines(), ["• 任务0", "• 任务1", "• 任务2", "…另有 197 条提醒"])
+        self.assertIs(sent_callback, callback)
+        self.assertEqual(coalescer.stats()['sent'], 1)
+    
+    def test_rate_limit_merges_excess(self):
+        """超出速率限制的通知推迟并合并到下一条摘要"""
+        coalescer = self._coalescer(window=0.01, max_rate=1, rate_period=0.3)
+        coalescer.add("任务提醒", "第一批")
+        self.assertTrue(self.delivered.wait(2))
+        
+        for i in range(3):
+            coalescer.add("任务提醒", f"第二批{i}")
+            time.sleep(0.03)
+        self.assertEqual(len(self.sent), 1)
+        
+        time.sleep(0.5)
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(self.sent[1][0], "任务提醒 (3)")
+    
+    def test_pending_overflow_drops_oldest(self):
+        """等待队列满时丢弃最早的通知并在摘要中计数"""
+        coalescer = self._coalescer(window=60, max_pending=5, max_lines=5)
+        for i in range(8):
+            coalescer.add("任务提醒", f"任务{i}")
+        coalescer.flush()
+        
+        title, message, _, _ = self.sent[0]
+        self.assertEqual(title, "任务提醒 (8)")
+        self.assertEqual(message.splitlines()[0], "• 任务3")
+        self.assertEqual(message.splitlines()[-1], "…另有 3 条提醒")
+        self.assertEqual(coalescer.stats()['dropped'], 3)
+
+class TestClickCallback(unittest.TestCase):
+    def test_callback_does_not_block_caller(self):
+        """点击回调（如阻塞在主循环中的任务窗口）在独立线程执行，不阻塞调用方"""
+        release = threading.Event()
+        threads = []
+        
+        def callback():
+            threads.append(threading.current_thread())
+            release.wait(5)
+        
+        run_callback_async(callback)
+        run_callback_async(callback)
+        deadline = time.monotonic() + 2
+        while len(threads) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertIsNot(threads[0], threads[1])
+
+if __name__ == '__main__':
+    unittest.main()
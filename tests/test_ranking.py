@@ -0,0 +1,134 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from managers import database
+from managers.task_manager import TaskManager
+from models.task import Task
+from utils import ranking
+from utils.ranking import rank_tasks, top_tasks, urgency_key
+
+def legacy_sort(tasks, now):
+    """重构前各处重复的排序实现，用于对照"""
+    priority_order = {"高": 3, "中": 2, "低": 1, None: 0}
+    
+    def sort_key(task):
+        priority_weight = priority_order.get(task.priority, 0)
+        time_weight = 0
+        if task.due_date:
+            time_diff = (task.due_date - now).total_seconds()
+            if time_diff < 0:
+                time_weight = 1000
+            elif time_diff < 86400:
+                time_weight = 100
+            else:
+                time_weight = max(0, 50 - time_diff / 86400)
+        return -(priority_weight * 10 + time_weight)
+    
+    return sorted(tasks, key=sort_key)
+
+def random_tasks(count, now, seed=1):
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        due = None
+        if rng.random() < 0.8:
+            due = now + timedelta(minutes=rng.randint(-3 * 1440, 90 * 1440))
+        tasks.append(Task(i + 1, f"任务{i}", priority=rng.choice(["高", "中", "低", None, "其他"]),
+                          due_date=due, created_at=now - timedelta(minutes=i)))
+    return tasks
+
+class TestRanking(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2024, 6, 1, 12, 0, 0)
+        self.tasks = random_tasks(500, self.now)
+    
+    def test_matches_legacy_order(self):
+        self.assertEqual([t.id for t in rank_tasks(self.tasks, self.now)],
+                         [t.id for t in legacy_sort(self.tasks, self.now)])
+    
+    def test_top_tasks_equals_ranked_prefix(self):
+        ranked = rank_tasks(self.tasks, self.now)
+        for k in (0, 1, 10, 499, 600):
+            self.assertEqual([t.id for t in top_tasks(self.tasks, k, self.now)],
+                             [t.id for t in ranked[:k]])
+    
+    def test_now_captured_once(self):
+        """排序键使用传入的固定时间"""
+        key = urgency_key(self.now)
+        overdue = Task(1, "过期", due_date=self.now - timedelta(seconds=1))
+        soon = Task(2, "即将到期", due_date=self.now + timedelta(hours=1), priority="高")
+        self.assertEqual(key(overdue), -1000)
+        self.assertEqual(key(soon), -130)
+
+@unittest.skipIf(ranking._numpy() is None, "未安装numpy")
+class TestVectorizedRanking(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2024, 6, 1, 12, 0, 0, 123456)
+        self.tasks = random_tasks(3000, self.now, seed=3)
+        self.expected = [t.id for t in legacy_sort(self.tasks, self.now)]
+    
+    def test_same_order_as_python(self):
+        self.assertEqual([t.id for t in rank_tasks(self.tasks, self.now, vectorize=True)], self.expected)
+    
+    def test_top_tasks_with_ties(self):
+        """top-K在并列边界上与稳定排序结果一致"""
+        for k in (1, 7, 100, 2999, 3000, 5000):
+            self.assertEqual([t.id for t in top_tasks(self.tasks, k, self.now, vectorize=True)],
+                             self.expected[:k])
+    
+    def test_scores_match_python(self):
+        key = urgency_key(self.now)
+        scores = ranking.urgency_scores(self.tasks, self.now)
+        self.assertEqual(scores.tolist(), [-key(t) for t in self.tasks])
+
+class TestRankingFallback(unittest.TestCase):
+    def test_falls_back_without_numpy(self):
+        """未安装NumPy时即使要求向量化也使用纯Python实现"""
+        original = ranking._np_module
+        ranking._np_module = False
+        try:
+            now = datetime(2024, 6, 1, 12, 0)
+            tasks = random_tasks(200, now)
+            self.assertEqual([t.id for t in rank_tasks(tasks, now, vectorize=True)],
+                             [t.id for t in legacy_sort(tasks, now)])
+            with self.assertRaises(RuntimeError):
+                ranking.urgency_scores(tasks, now)
+        finally:
+            ranking._np_module = original
+
+class TestRankingSQLPushdown(unittest.TestCase):
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        
+        import config
+        self.original_db_path = config.DATABASE_PATH
+        config.DATABASE_PATH = self.temp_db.name
+        self.task_manager = TaskManager()
+    
+    def tearDown(self):
+        import config
+        config.DATABASE_PATH = self.original_db_path
+        
+        database.close_all()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.temp_db.name + suffix):
+                os.unlink(self.temp_db.name + suffix)
+    
+    def test_sql_order_matches_python(self):
+        """ORDER BY紧急度LIMIT的结果与Python排序一致"""
+        now = datetime.now().replace(microsecond=0)
+        self.task_manager.add_many({'content': t.content, 'priority': t.priority, 'due_date': t.due_date}
+                                   for t in random_tasks(300, now, seed=2))
+        self.task_manager.add_task("重复任务", due_date=now - timedelta(days=1), recurrence="FREQ=DAILY")
+        
+        pending = [t for t in self.task_manager.get_pending_tasks() if not t.recurrence]
+        expected = [t.id for t in rank_tasks(pending, now)]
+        self.assertEqual([t.id for t in self.task_manager.get_ranked_pending(20, now=now)], expected[:20])
+        self.assertEqual([t.id for t in self.task_manager.get_ranked_pending(20, 280, now=now)], expected[280:])
+        self.assertEqual(self.task_manager.count_tasks("pending"), 301)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from datetime import datetime, timedelta
+from models.task import Task
+from utils.recurrence import (normalize_rule, next_occurrence, occurrences_between,
+                              occurrence_of, upcoming, describe_rule)
+
+class TestRecurrence(unittest.TestCase):
+    def setUp(self):
+        self.anchor = datetime(2024, 1, 1, 9, 0)  # 周一
+        self.task = Task(1, "晨会", reminder_time=self.anchor,
+                         due_date=self.anchor + timedelta(minutes=30), recurrence="FREQ=DAILY")
+    
+    def test_normalize_rule(self):
+        self.assertEqual(normalize_rule("daily"), "FREQ=DAILY")
+        self.assertEqual(normalize_rule("工作日"), "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR")
+        self.assertEqual(normalize_rule("RRULE:freq=weekly;byday=mo"), "FREQ=WEEKLY;BYDAY=MO")
+        with self.assertRaises(ValueError):
+            normalize_rule("每隔一阵子")
+    
+    def test_next_occurrence(self):
+        self.assertEqual(next_occurrence(self.task, datetime(2024, 1, 5, 9, 0)), datetime(2024, 1, 6, 9, 0))
+        self.assertEqual(next_occurrence(self.task, datetime(2023, 12, 1)), self.anchor)
+        
+        self.task.recurrence = "FREQ=DAILY;COUNT=3"
+        self.assertIsNone(next_occurrence(self.task, datetime(2024, 1, 3, 9, 0)))
+    
+    def test_occurrences_between(self):
+        self.task.recurrence = "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"
+        occurrences = occurrences_between(self.task, datetime(2024, 1, 5), datetime(2024, 1, 9))
+        self.assertEqual(occurrences, [datetime(2024, 1, 5, 9, 0), datetime(2024, 1, 8, 9, 0)])
+        # 区间右端不包含
+        self.assertEqual(occurrences_between(self.task, datetime(2024, 1, 2), datetime(2024, 1, 2, 9, 0)), [])
+    
+    def test_occurrence_shifts_times(self):
+        """实例的提醒时间和截止日期一起平移"""
+        instance = occurrence_of(self.task, datetime(2024, 1, 10, 9, 0))
+        self.assertEqual(instance.reminder_time, datetime(2024, 1, 10, 9, 0))
+        self.assertEqual(instance.due_date, datetime(2024, 1, 10, 9, 30))
+        self.assertEqual((instance.id, instance.recurrence), (1, "FREQ=DAILY"))
+        self.assertEqual(self.task.reminder_time, self.anchor)
+    
+    def test_upcoming(self):
+        self.assertEqual(upcoming(self.task, datetime(2024, 1, 3, 12, 0)).reminder_time,
+                         datetime(2024, 1, 4, 9, 0))
+        plain = Task(2, "普通任务")
+        self.assertIs(upcoming(plain), plain)
+    
+    def test_describe_rule(self):
+        self.assertEqual(describe_rule("FREQ=DAILY"), "每天")
+        self.assertEqual(describe_rule("FREQ=WEEKLY;INTERVAL=2"), "每2周")
+        self.assertEqual(describe_rule("FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"), "工作日")
+        self.assertEqual(describe_rule("FREQ=MONTHLY;BYMONTHDAY=1"), "FREQ=MONTHLY;BYMONTHDAY=1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from managers import database
+from managers.task_manager import TaskManager
+from managers.reminder_manager import ReminderManager, heartbeat_path
+
+class TestReminderManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        
+        import config
+        self.original_db_path = config.DATABASE_PATH
+        config.DATABASE_PATH = self.temp_db.name
+        
+        self.task_manager = TaskManager()
+        self.reminder_manager = ReminderManager()
+    
+    def tearDown(self):
+        self.reminder_manager.stop()
+        
+        import config
+        config.DATABASE_PATH = self.original_db_path
+        
+        database.close_all()
+        for suffix in ('', '-wal', '-shm', '-alive'):
+            if os.path.exists(self.temp_db.name + suffix):
+                os.unlink(self.temp_db.name + suffix)
+    
+    def _job_ids(self):
+        return set(self.reminder_manager.scheduler.get_job_ids())
+    
+    def test_only_reminders_in_window_scheduled(self):
+        """启动时只调度窗口内的提醒"""
+        now = datetime.now()
+        soon = self.task_manager.add_task("一小时后", reminder_time=now + timedelta(hours=1))
+        later = self.task_manager.add_task("三天后", reminder_time=now + timedelta(days=3))
+        
+        self.reminder_manager.start()
+        job_ids = self._job_ids()
+        self.assertIn(f"task_{soon.id}", job_ids)
+        self.assertNotIn(f"task_{later.id}", job_ids)
+    
+    def test_add_reminder_outside_window_deferred(self):
+        """窗口外的新提醒等待定时补充"""
+        self.reminder_manager.start()
+        task = self.task_manager.add_task("下个月", reminder_time=datetime.now() + timedelta(days=30))
+        self.reminder_manager.add_reminder(task)
+        self.assertNotIn(f"task_{task.id}", self._job_ids())
+    
+    def test_refill_picks_up_new_reminders(self):
+        """补充窗口时加载其他进程新增的提醒"""
+        self.reminder_manager.start()
+        task = self.task_manager.add_task("新增提醒", reminder_time=datetime.now() + timedelta(hours=2))
+        self.reminder_manager._refill_window()
+        self.assertIn(f"task_{task.id}", self._job_ids())
+
+    def _spy_date_jobs(self):
+        scheduled = {}
+        add_date_job = self.reminder_manager.scheduler.add_date_job
+        def spy(job_id, run_date, func, args=()):
+            scheduled[job_id] = run_date
+            add_date_job(job_id, run_date, func, args)
+        self.reminder_manager.scheduler.add_date_job = spy
+        return scheduled
+    
+    def test_recurring_task_schedules_next_occurrence(self):
+        """重复任务只调度下一次发生，提醒后调度再下一次"""
+        scheduled = self._spy_date_jobs()
+        next_time = (datetime.now() + timedelta(hours=1)).replace(second=0, microsecond=0)
+        task = self.task_manager.add_task("每日站会", reminder_time=next_time - timedelta(days=5),
+                                          recurrence="FREQ=DAILY")
+        
+        self.reminder_manager.start()
+        self.assertEqual(scheduled[f"task_{task.id}"], next_time)
+        self.assertEqual(self._job_ids() & {f"task_{task.id}"}, {f"task_{task.id}"})
+        
+        sent = []
+        self.reminder_manager.notification_helper.show_reminder = lambda **kwargs: sent.append(kwargs)
+        self.reminder_manager._current_window_end = lambda: datetime.now() + timedelta(days=2)
+        self.reminder_manager._send_notification(task.id, next_time.timestamp())
+        
+        self.assertEqual(sent[0]['scheduled_at'], next_time.timestamp())
+        self.assertEqual(scheduled[f"task_{task.id}"], next_time + timedelta(days=1))
+
+    def test_stale_reminder_job_skipped(self):
+        """提醒时间被其他进程修改后，按旧时间触发的调度任务不发送通知"""
+        old_time = (datetime.now() + timedelta(hours=1)).replace(second=0, microsecond=0)
+        task = self.task_manager.add_task("改期的会议", reminder_time=old_time)
+        sent = []
+        self.reminder_manager.notification_helper.show_reminder = lambda **kwargs: sent.append(kwargs)
+        
+        self.task_manager.update_task(task.id, reminder_time=old_time + timedelta(days=3))
+        self.reminder_manager._send_notification(task.id, old_time.timestamp())
+        self.assertEqual(sent, [])
+        
+        self.reminder_manager._send_notification(task.id, (old_time + timedelta(days=3)).timestamp())
+        self.assertEqual(len(sent), 1)
+    
+    def _capture_notifications(self):
+        sent = []
+        self.reminder_manager.notification_helper.show_clickable_notification = \
+            lambda **kwargs: sent.append(kwargs)
+        return sent
+    
+    def test_missed_reminders_sent_as_single_digest(self):
+        """停机期间错过的提醒在启动时合并为一条通知"""
+        now = datetime.now()
+        self.reminder_manager._record_alive(now - timedelta(hours=2))
+        missed = self.task_manager.add_task("错过的提醒", reminder_time=now - timedelta(hours=1))
+        self.task_manager.add_task("停机前的提醒", reminder_time=now - timedelta(hours=3))
+        done = self.task_manager.add_task("已完成", reminder_time=now - timedelta(minutes=30))
+        self.task_manager.update_task(done.id, status="completed")
+        self.task_manager.add_task("每小时", reminder_time=now - timedelta(days=3, minutes=10),
+                                   recurrence="FREQ=HOURLY")
+        
+        sent = self._capture_notifications()
+        self.reminder_manager.start()
+        
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0]['title'], "错过的提醒 (2)")
+        lines = sent[0]['message'].splitlines()
+        self.assertIn("错过的提醒", lines[0])
+        self.assertIn("每小时", lines[1])
+        # 错过的提醒不逐个调度为立即执行的任务
+        self.assertNotIn(f"task_{missed.id}", self._job_ids())
+    
+    def test_first_start_records_last_alive(self):
+        """首次启动没有存活记录时不补发，并开始记录存活时间"""
+        self.task_manager.add_task("很久以前", reminder_time=datetime.now() - timedelta(hours=1))
+        sent = self._capture_notifications()
+        self.reminder_manager.start()
+        
+        self.assertEqual(sent, [])
+        self.assertTrue(os.path.exists(heartbeat_path()))
+        self.assertIn('heartbeat', self._job_ids())
+    
+    def test_heartbeat_keeps_task_cache(self):
+        """存活时间不写入数据库，心跳不会使任务缓存失效"""
+        task = self.task_manager.add_task("缓存任务")
+        self.task_manager.get_task_by_id(task.id)
+        self.reminder_manager._record_alive()
+        hits = self.task_manager.cache_stats()['hits']
+        self.task_manager.get_task_by_id(task.id)
+        self.assertEqual(self.task_manager.cache_stats()['hits'], hits + 1)
+    
+    def test_last_alive_read_from_heartbeat_file(self):
+        """存活时间取存活文件的修改时间，从未记录时返回None"""
+        self.assertIsNone(self.reminder_manager.get_last_alive())
+        
+        last_alive = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+        self.reminder_manager._record_alive(last_alive)
+        self.assertEqual(self.reminder_manager.get_last_alive(), last_alive)
+
+if __name__ == '__main__':
+    unittest.main()
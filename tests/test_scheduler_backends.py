@@ -0,0 +1,106 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from managers.scheduler_backends import HeapSchedulerBackend, SchedulerBackend, create_scheduler
+
+try:
+    import apscheduler
+except ImportError:
+    apscheduler = None
+
+class SchedulerBackendTests:
+    """各调度后端共用的行为测试"""
+    
+    def create_backend(self):
+        raise NotImplementedError
+    
+    def setUp(self):
+        self.scheduler = self.create_backend()
+        self.scheduler.start()
+    
+    def tearDown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+    
+    def test_date_job_runs(self):
+        """一次性任务到期执行后移除"""
+        fired = threading.Event()
+        self.scheduler.add_date_job("job", datetime.now() + timedelta(milliseconds=50),
+                                    lambda value: fired.set() if value == 42 else None, args=(42,))
+        self.assertTrue(fired.wait(3))
+        time.sleep(0.05)
+        self.assertNotIn("job", self.scheduler.get_job_ids())
+    
+    def test_remove_job(self):
+        """移除的任务不再执行"""
+        fired = threading.Event()
+        self.scheduler.add_date_job("job", datetime.now() + timedelta(milliseconds=100), fired.set)
+        self.assertTrue(self.scheduler.remove_job("job"))
+        self.assertFalse(self.scheduler.remove_job("job"))
+        self.assertFalse(fired.wait(0.3))
+    
+    def test_replace_job(self):
+        """同名任务替换原有任务"""
+        calls = []
+        self.scheduler.add_date_job("job", datetime.now() + timedelta(hours=1), lambda: calls.append("old"))
+        self.scheduler.add_date_job("job", datetime.now() + timedelta(milliseconds=50), lambda: calls.append("new"))
+        self.assertEqual(self.scheduler.get_job_ids(), ["job"])
+        time.sleep(0.5)
+        self.assertEqual(calls, ["new"])
+    
+    def test_daily_and_interval_jobs_registered(self):
+        """每日任务和间隔任务持续保留"""
+        self.scheduler.add_daily_job("daily", 8, 0, lambda: None)
+        self.scheduler.add_interval_job("tick", 3600, lambda: None)
+        self.assertEqual(set(self.scheduler.get_job_ids()), {"daily", "tick"})
+
+class TestHeapSchedulerBackend(SchedulerBackendTests, unittest.TestCase):
+    def create_backend(self):
+        return HeapSchedulerBackend()
+    
+    def test_interval_job_repeats(self):
+        """间隔任务重复执行"""
+        calls = []
+        self.scheduler.add_interval_job("tick", 0.05, lambda: calls.append(1))
+        time.sleep(0.4)
+        self.assertGreaterEqual(len(calls), 3)
+    
+    def test_failing_job_does_not_stop_scheduler(self):
+        """任务异常不影响后续任务"""
+        fired = threading.Event()
+        self.scheduler.add_date_job("bad", datetime.now(), lambda: 1 / 0)
+        self.scheduler.add_date_job("good", datetime.now() + timedelta(milliseconds=50), fired.set)
+        self.assertTrue(fired.wait(3))
+    
+    def test_cancelled_entries_compacted(self):
+        """大量移除后堆被重建"""
+        future = datetime.now() + timedelta(days=1)
+        for i in range(100):
+            self.scheduler.add_date_job(f"job_{i}", future, lambda: None)
+        for i in range(90):
+            self.scheduler.remove_job(f"job_{i}")
+        self.assertLessEqual(len(self.scheduler._heap), 60)
+        self.assertEqual(len(self.scheduler.get_job_ids()), 10)
+
+@unittest.skipIf(apscheduler is None, "未安装apscheduler")
+class TestAPSchedulerBackend(SchedulerBackendTests, unittest.TestCase):
+    def create_backend(self):
+        return create_scheduler('apscheduler')
+
+class TestCreateScheduler(unittest.TestCase):
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_scheduler('unknown')
+    
+    def test_incomplete_backend_rejected(self):
+        """未实现全部接口方法的后端在构造时报错"""
+        class PartialBackend(SchedulerBackend):
+            def start(self):
+                pass
+        
+        with self.assertRaises(TypeError):
+            PartialBackend()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 轻量命令导入main及其用到的模块的总耗时上限（毫秒，不含解释器自身启动）
+STARTUP_IMPORT_BUDGET_MS = 60
+
+# 轻量命令不应加载的模块：GUI、快捷键、调度器和通知
+HEAVY_MODULES = ('tkinter', 'keyboard', 'apscheduler', 'dateutil', 'concurrent.futures',
+                 'ui.quick_input', 'ui.task_detail_window', 'managers.reminder_manager',
+                 'managers.scheduler_backends', 'managers.daemon', 'utils.notification_helper',
+                 'utils.time_grammar')
+
+# 在子进程中把数据库和套接字指向临时目录后运行main.py的命令
+_RUNNER = '''
+import sys
+sys.path.insert(0, {root!r})
+import config
+config.DATABASE_PATH = {db!r}
+config.DAEMON_SOCKET_PATH = {sock!r}
+sys.argv = ['main.py'] + {args!r}
+import main
+main.main()
+'''
+
+
+class TestStartupImports(unittest.TestCase):
+    """用 -X importtime 检查轻量命令的导入开销"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _import_times(self, args):
+        """运行命令，返回 {模块名: (自身耗时, 累计耗时, 嵌套层级)}（微秒）"""
+        code = _RUNNER.format(root=PROJECT_ROOT, db=os.path.join(self.temp_dir, 'tasks.db'),
+                              sock=os.path.join(self.temp_dir, 'echo.sock'), args=args)
+        # 允许写入字节码缓存，避免把编译时间计入导入耗时
+        env = {key: value for key, value in os.environ.items() if key != 'PYTHONDONTWRITEBYTECODE'}
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                capture_output=True, text=True, env=env, cwd=self.temp_dir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        modules = {}
+        started = False
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip())) // 2
+            name = name.strip()
+            # 只统计解释器启动（site）之后由程序触发的导入
+            if name == 'site' and depth == 0:
+                started = True
+                continue
+            if started:
+                modules[name] = (int(self_us), int(cumulative_us), depth)
+        return modules
+
+    def _total_ms(self, args) -> float:
+        """多次运行取最小值，降低机器负载带来的波动"""
+        best = float('inf')
+        for _ in range(3):
+            modules = self._import_times(args)
+            best = min(best, sum(cumulative for _, cumulative, depth in modules.values() if depth == 0))
+        return best / 1000
+
+    def test_lightweight_commands_skip_heavy_modules(self):
+        for args in (['list'], ['today'], ['search', '报告'], ['done', '1'], ['list', '--help']):
+            with self.subTest(args=args):
+                loaded = self._import_times(args)
+                heavy = [name for name in loaded
+                         if any(name == module or name.startswith(module + '.') for module in HEAVY_MODULES)]
+                self.assertEqual(heavy, [])
+
+    def test_list_within_budget(self):
+        self.assertLess(self._total_ms(['list']), STARTUP_IMPORT_BUDGET_MS)
+
+if __name__ == '__main__':
+    unittest.main()
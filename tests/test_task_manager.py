@@ -1,9 +1,11 @@
 import unittest
 import os
 import tempfile
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from managers.task_manager import TaskManager
+from managers import database
 from models.task import Task
+from utils.recurrence import upcoming
 
 class TestTaskManager(unittest.TestCase):
     def setUp(self):
@@ -23,8 +25,11 @@ class TestTaskManager(unittest.TestCase):
         import config
         config.DATABASE_PATH = self.original_db_path
         
-        # 删除临时数据库
-        os.unlink(self.temp_db.name)
+        # 关闭共享连接后删除临时数据库（包括WAL文件）
+        database.close_all()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.temp_db.name + suffix):
+                os.unlink(self.temp_db.name + suffix)
     
     def test_add_task(self):
         task = self.task_manager.add_task("测试任务", "高")
@@ -53,5 +58,351 @@ class TestTaskManager(unittest.TestCase):
         tasks = self.task_manager.get_all_tasks()
         self.assertEqual(len(tasks), 0)
 
+    def test_iter_tasks_pages(self):
+        tasks = self.task_manager.add_many([{'content': f"任务{i}"} for i in range(7)])
+        ids = [t.id for t in tasks]
+        
+        result = [t.id for t in self.task_manager.iter_tasks(page_size=3)]
+        self.assertEqual(result, list(reversed(ids)))
+        result = [t.id for t in self.task_manager.iter_tasks(descending=False, page_size=2)]
+        self.assertEqual(result, ids)
+    
+    def test_iter_tasks_filter_offset_limit(self):
+        tasks = self.task_manager.add_many([{'content': f"任务{i}"} for i in range(6)])
+        self.task_manager.update_many([t.id for t in tasks[:4]], status="completed")
+        
+        completed = self.task_manager.iter_tasks(status="completed", page_size=2, offset=1, limit=2)
+        self.assertEqual([t.id for t in completed], [tasks[2].id, tasks[1].id])
+        self.assertEqual(list(self.task_manager.iter_tasks(limit=0)), [])
+    
+    def test_search(self):
+        task = self.task_manager.add_task("准备季度汇报材料")
+        self.task_manager.add_task("买菜做饭")
+        
+        self.assertEqual([t.id for t in self.task_manager.search("汇报材料")], [task.id])
+        self.assertEqual([t.id for t in self.task_manager.search("汇报")], [task.id])
+        self.assertEqual([t.id for t in self.task_manager.search("季度汇报 材料")], [task.id])
+        self.assertEqual(self.task_manager.search("不存在的内容"), [])
+        self.assertEqual(self.task_manager.search("100%"), [])
+    
+    def test_search_index_follows_updates(self):
+        task = self.task_manager.add_task("整理旧文件")
+        self.task_manager.update_task(task.id, content="整理新文档")
+        self.assertEqual(self.task_manager.search("旧文件"), [])
+        self.assertEqual([t.id for t in self.task_manager.search("新文档")], [task.id])
+        
+        self.task_manager.delete_task(task.id)
+        self.assertEqual(self.task_manager.search("新文档"), [])
+    
+    def test_search_without_trigram(self):
+        """SQLite不支持trigram分词时不建全文索引，中文搜索使用LIKE查询"""
+        from unittest import mock
+        database.close_all()
+        os.unlink(self.temp_db.name)
+        with mock.patch('managers.migrations._create_fts_table', return_value=False):
+            task_manager = TaskManager()
+        task = task_manager.add_task("准备季度汇报材料")
+        
+        conn = database.get_connection()
+        self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone())
+        self.assertEqual([t.id for t in task_manager.search("汇报")], [task.id])
+        self.assertEqual([t.id for t in task_manager.search("季度汇报材料")], [task.id])
+    
+    def test_archive_and_restore(self):
+        old, recent, pending = self.task_manager.add_many(
+            [{'content': "旧的已完成"}, {'content': "新的已完成"}, {'content': "待办"}])
+        self.task_manager.update_many([old.id, recent.id], status="completed")
+        self.task_manager.update_task(old.id, completed_at=datetime.now() - timedelta(days=40))
+        
+        self.assertEqual(self.task_manager.archive_completed(30), 1)
+        self.assertIsNone(self.task_manager.get_task_by_id(old.id))
+        self.assertEqual([t.id for t in self.task_manager.iter_tasks(archived=True)], [old.id])
+        self.assertEqual({t.id for t in self.task_manager.get_all_tasks()}, {recent.id, pending.id})
+        
+        results = self.task_manager.restore_archived([old.id, 9999])
+        self.assertEqual(results, {old.id: True, 9999: False})
+        self.assertEqual(self.task_manager.get_task_by_id(old.id).content, "旧的已完成")
+        self.assertEqual(list(self.task_manager.iter_tasks(archived=True)), [])
+    
+    def test_add_many(self):
+        tasks = self.task_manager.add_many([{'content': f"任务{i}"} for i in range(5)])
+        self.assertEqual(len(tasks), 5)
+        self.assertTrue(all(t.id for t in tasks))
+        self.assertEqual(len(self.task_manager.get_all_tasks()), 5)
+    
+    def test_update_many(self):
+        tasks = self.task_manager.add_many([{'content': "任务1"}, {'content': "任务2"}])
+        results = self.task_manager.update_many([tasks[0].id, tasks[1].id, 9999], status="completed")
+        self.assertEqual(results, {tasks[0].id: True, tasks[1].id: True, 9999: False})
+        self.assertEqual(self.task_manager.get_pending_tasks(), [])
+    
+    def test_delete_many(self):
+        tasks = self.task_manager.add_many([{'content': "任务1"}, {'content': "任务2"}, {'content': "任务3"}])
+        results = self.task_manager.delete_many([tasks[0].id, tasks[2].id, 9999])
+        self.assertEqual(results, {tasks[0].id: True, tasks[2].id: True, 9999: False})
+        self.assertEqual([t.id for t in self.task_manager.get_all_tasks()], [tasks[1].id])
+    
+    def test_apply_batch(self):
+        first, second = self.task_manager.add_many([{'content': "任务1"}, {'content': "任务2"}])
+        due = datetime(2030, 1, 2, 3, 4)
+        committed, results = self.task_manager.apply_batch([
+            {'op': 'add', 'content': "新任务", 'due_date': due},
+            {'op': 'done', 'task_ids': [first.id]},
+            {'op': 'update', 'task_ids': [second.id], 'fields': {'priority': "高", 'due_date': due}},
+        ])
+        self.assertTrue(committed)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(self.task_manager.get_task_by_id(results[0].value.id).due_date, due)
+        self.assertEqual(self.task_manager.get_task_by_id(first.id).status, "completed")
+        self.assertEqual(self.task_manager.get_task_by_id(second.id).priority, "高")
+    
+    def test_apply_batch_rolls_back(self):
+        """出错时回滚整个事务；continue_on_error时只跳过出错的操作"""
+        task = self.task_manager.add_task("任务")
+        operations = [{'op': 'delete', 'task_ids': [task.id]},
+                      {'op': 'update', 'task_ids': [task.id], 'fields': {'id = 0; --': 1}},
+                      {'op': 'add', 'content': "新任务"}]
+        committed, results = self.task_manager.apply_batch(operations)
+        self.assertFalse(committed)
+        self.assertEqual([result.ok for result in results], [True, False])
+        self.assertEqual([t.id for t in self.task_manager.get_all_tasks()], [task.id])
+        
+        committed, results = self.task_manager.apply_batch(operations, continue_on_error=True)
+        self.assertTrue(committed)
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual([t.content for t in self.task_manager.get_all_tasks()], ["新任务"])
+    
+    def test_get_today_tasks(self):
+        now = datetime.now()
+        overdue = self.task_manager.add_task("过期任务", due_date=now - timedelta(days=2))
+        remind_today = self.task_manager.add_task("今日提醒", reminder_time=now.replace(hour=23, minute=59))
+        self.task_manager.add_task("未来任务", due_date=now + timedelta(days=3))
+        done = self.task_manager.add_task("已完成", due_date=now - timedelta(days=1))
+        self.task_manager.update_task(done.id, status="completed")
+        
+        ids = {t.id for t in self.task_manager.get_today_tasks()}
+        self.assertEqual(ids, {overdue.id, remind_today.id})
+    
+    def test_recurring_task_today_occurrences(self):
+        """重复任务按需计算当天的发生实例，不写入额外的行"""
+        today = date.today()
+        anchor = datetime.combine(today - timedelta(days=10), datetime.min.time()).replace(hour=9)
+        task = self.task_manager.add_task("喝水", reminder_time=anchor, recurrence="FREQ=HOURLY;INTERVAL=6")
+        weekday = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU'][today.weekday()]
+        self.task_manager.add_task("周报", due_date=anchor, recurrence=f"FREQ=WEEKLY;BYDAY={weekday}")
+        self.task_manager.add_task("昨天的重复任务", reminder_time=anchor, recurrence="FREQ=DAILY;COUNT=1")
+        
+        today_tasks = self.task_manager.get_today_tasks(today)
+        self.assertEqual(sorted(t.content for t in today_tasks), ["周报", "喝水", "喝水", "喝水", "喝水"])
+        self.assertEqual(sorted(t.reminder_time.hour for t in today_tasks if t.content == "喝水"), [3, 9, 15, 21])
+        self.assertTrue(all(t.id == task.id for t in today_tasks if t.content == "喝水"))
+        self.assertEqual(len(self.task_manager.get_all_tasks()), 3)
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).recurrence, "FREQ=HOURLY;INTERVAL=6")
+    
+    def test_complete_recurring_task_advances(self):
+        """完成重复任务时完成列表中显示的那一次并顺延到下一次，规则结束后才标记完成"""
+        now = datetime.now().replace(second=0, microsecond=0)
+        anchor = now - timedelta(days=3, hours=1)
+        daily = self.task_manager.add_task("站会", reminder_time=anchor, due_date=anchor + timedelta(minutes=30),
+                                           recurrence="FREQ=DAILY")
+        counted = self.task_manager.add_task("吃药", reminder_time=anchor, recurrence="FREQ=DAILY;COUNT=6")
+        plain = self.task_manager.add_task("普通任务")
+        
+        # 起点已过期：列表显示的是明天的一次，完成的也是这一次
+        self.assertEqual(upcoming(daily, now).reminder_time, anchor + timedelta(days=4))
+        results = self.task_manager.complete_many([daily.id, counted.id, plain.id], now=now)
+        self.assertEqual(results, {daily.id: True, counted.id: True, plain.id: True})
+        task = self.task_manager.get_task_by_id(daily.id)
+        self.assertEqual(task.status, "pending")
+        self.assertEqual(task.reminder_time, anchor + timedelta(days=5))
+        self.assertEqual(task.due_date, anchor + timedelta(days=5, minutes=30))
+        self.assertEqual(upcoming(task, now).reminder_time, task.reminder_time)
+        tomorrow = self.task_manager.get_today_tasks(task.reminder_time.date())
+        self.assertEqual([t.reminder_time for t in tomorrow if t.id == daily.id], [task.reminder_time])
+        self.assertEqual(self.task_manager.get_task_by_id(counted.id).recurrence, "FREQ=DAILY;COUNT=1")
+        self.assertEqual(self.task_manager.get_task_by_id(plain.id).status, "completed")
+        
+        # 起点已在将来时再次完成，完成的就是起点这一次；COUNT用完后标记完成
+        self.task_manager.complete_many([daily.id, counted.id], now=now)
+        self.assertEqual(self.task_manager.get_task_by_id(daily.id).reminder_time, anchor + timedelta(days=6))
+        self.assertEqual(self.task_manager.get_task_by_id(counted.id).status, "completed")
+        
+        # 批量操作中的done与complete_many一致
+        committed, _ = self.task_manager.apply_batch([{'op': 'done', 'task_ids': [daily.id]}])
+        self.assertTrue(committed)
+        self.assertEqual(self.task_manager.get_task_by_id(daily.id).status, "pending")
+    
+    def test_complete_recurring_task_anchor_not_in_rule(self):
+        """起点本身不符合规则时（周日添加的工作日任务），完成的是列表中显示的周一那次"""
+        now = datetime(2026, 10, 18, 8, 0)
+        task = self.task_manager.add_task("打卡", reminder_time=now.replace(hour=9, minute=30),
+                                          recurrence="FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR")
+        self.assertEqual(upcoming(task, now).reminder_time, datetime(2026, 10, 19, 9, 30))
+        
+        self.task_manager.complete_many([task.id], now=now)
+        task = self.task_manager.get_task_by_id(task.id)
+        self.assertEqual(task.reminder_time, datetime(2026, 10, 20, 9, 30))
+        self.assertEqual(upcoming(task, now).reminder_time, task.reminder_time)
+    
+    def test_get_pending_reminders_after(self):
+        now = datetime.now()
+        future = self.task_manager.add_task("未来提醒", reminder_time=now + timedelta(hours=1))
+        self.task_manager.add_task("过去提醒", reminder_time=now - timedelta(hours=1))
+        done = self.task_manager.add_task("已完成", reminder_time=now + timedelta(hours=2))
+        self.task_manager.update_task(done.id, status="completed")
+        
+        tasks = self.task_manager.get_pending_reminders_after(now)
+        self.assertEqual([t.id for t in tasks], [future.id])
+    
+    def test_get_tasks_due_between(self):
+        now = datetime.now()
+        inside = self.task_manager.add_task("区间内", due_date=now + timedelta(hours=1))
+        self.task_manager.add_task("区间外", due_date=now + timedelta(days=5))
+        
+        tasks = self.task_manager.get_tasks_due_between(now, now + timedelta(days=1))
+        self.assertEqual([t.id for t in tasks], [inside.id])
+        self.assertEqual(len(self.task_manager.get_pending_tasks()), 2)
+    
+    def test_timestamps_stored_as_epoch(self):
+        due = datetime(2030, 1, 2, 3, 4)
+        task = self.task_manager.add_task("测试任务", due_date=due)
+        row = database.get_connection().execute(
+            'SELECT typeof(due_date), typeof(created_at) FROM tasks WHERE id = ?', (task.id,)).fetchone()
+        self.assertEqual(tuple(row), ('integer', 'integer'))
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).due_date, due)
+        
+        new_due = datetime(2031, 5, 6, 7, 8)
+        self.task_manager.update_task(task.id, due_date=new_due)
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).due_date, new_due)
+    
+    def test_timestamps_decoded_on_first_access(self):
+        due = datetime(2030, 1, 2, 3, 4)
+        task_id = self.task_manager.add_task("测试任务", due_date=due).id
+        self.task_manager._cache().clear()
+        task = self.task_manager.get_task_by_id(task_id)
+        # 读取后时间字段仍为原始时间戳，访问时才解码并缓存
+        self.assertEqual(task._raw_due_date, due.timestamp())
+        self.assertIsNone(task.reminder_time)
+        self.assertEqual(task.due_date, due)
+        self.assertIs(task.due_date, task.due_date)
+        self.assertEqual(Task.from_dict(task.to_dict()).created_at, task.created_at)
+    
+        task.due_date = None
+        self.assertIsNone(task.due_date)
+    
+    def test_migrate_legacy_text_timestamps(self):
+        import sqlite3
+        database.close_all()
+        with sqlite3.connect(self.temp_db.name) as conn:
+            conn.execute('DROP TABLE IF EXISTS tasks')
+            conn.execute('PRAGMA user_version = 0')
+            conn.execute('''
+                CREATE TABLE tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    content TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    priority TEXT,
+                    due_date DATETIME,
+                    created_at DATETIME
+                )
+            ''')
+            conn.execute("INSERT INTO tasks (content, status, due_date, created_at) "
+                         "VALUES ('旧任务', 'pending', '2024-12-25T18:00:00', '2024-12-01T08:30:15.123456')")
+            conn.execute("INSERT INTO tasks (content, status, created_at) VALUES ('已删除', 'pending', NULL)")
+            conn.execute("DELETE FROM tasks WHERE content = '已删除'")
+        
+        task_manager = TaskManager()
+        tasks = task_manager.get_all_tasks()
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].due_date, datetime(2024, 12, 25, 18, 0))
+        self.assertEqual(tasks[0].created_at, datetime(2024, 12, 1, 8, 30, 15))
+        self.assertIsNone(tasks[0].reminder_time)
+        
+        # 已删除的ID不会被重新使用
+        self.assertEqual(task_manager.add_task("新任务").id, 3)
+    
+    def test_migrations_recorded_in_user_version(self):
+        from managers import migrations
+        conn = database.get_connection()
+        self.assertEqual(migrations.get_version(conn), migrations.latest_version())
+    
+    def test_warm_start_runs_no_ddl(self):
+        import sqlite3
+        from managers import migrations
+        statements = []
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.set_trace_callback(statements.append)
+        try:
+            self.assertEqual(migrations.migrate(conn), 0)
+        finally:
+            conn.close()
+        self.assertEqual(statements, ['PRAGMA user_version'])
+    
+    def test_cache_hits_and_local_invalidation(self):
+        task = self.task_manager.add_task("缓存任务")
+        self.task_manager.get_task_by_id(task.id)
+        stats_before = self.task_manager.cache_stats()
+        self.task_manager.get_task_by_id(task.id)
+        self.assertEqual(self.task_manager.cache_stats()['hits'], stats_before['hits'] + 1)
+        
+        self.task_manager.update_task(task.id, status="completed")
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).status, "completed")
+    
+    def test_cache_returns_copies(self):
+        """修改取到的任务对象不影响缓存中的任务"""
+        task = self.task_manager.add_task("缓存副本", due_date=datetime(2030, 1, 2, 3, 4))
+        first = self.task_manager.get_task_by_id(task.id)
+        first.status = "completed"
+        first.due_date = None
+        cached = self.task_manager.get_task_by_id(task.id)
+        self.assertEqual((cached.status, cached.due_date), ("pending", datetime(2030, 1, 2, 3, 4)))
+        
+        self.task_manager.get_pending_tasks()[0].content = "已修改"
+        self.assertEqual(self.task_manager.get_pending_tasks()[0].content, "缓存副本")
+    
+    def test_cache_version_tracked_per_connection(self):
+        """同一连接在其他线程上同步时不清空缓存"""
+        import threading
+        task = self.task_manager.add_task("跨线程")
+        conn = database.get_connection()
+        self.task_manager.get_task_by_id(task.id)
+        cache = self.task_manager._cache()
+        thread = threading.Thread(target=cache.sync, args=(conn,))
+        thread.start()
+        thread.join()
+        
+        stats_before = self.task_manager.cache_stats()
+        self.task_manager.get_task_by_id(task.id)
+        self.assertEqual(self.task_manager.cache_stats()['hits'], stats_before['hits'] + 1)
+    
+    def test_cache_sees_writes_from_other_connections(self):
+        import sqlite3
+        task = self.task_manager.add_task("外部修改")
+        self.assertEqual(len(self.task_manager.get_pending_tasks()), 1)
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).status, "pending")
+        
+        # 模拟另一个进程（如一次性CLI命令）直接修改数据库
+        with sqlite3.connect(self.temp_db.name) as other:
+            other.execute("UPDATE tasks SET status = 'completed' WHERE id = ?", (task.id,))
+        other.close()
+        
+        self.assertEqual(self.task_manager.get_task_by_id(task.id).status, "completed")
+        self.assertEqual(self.task_manager.get_pending_tasks(), [])
+    
+    def test_connection_reused_with_wal(self):
+        conn = database.get_connection()
+        self.assertIs(conn, database.get_connection())
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertGreater(conn.execute('PRAGMA busy_timeout').fetchone()[0], 0)
+    
+    def test_connection_per_thread(self):
+        import threading
+        main_conn = database.get_connection()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(database.get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(main_conn, other[0])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
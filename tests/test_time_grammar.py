@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime
+from utils.datetime_parser import parse_datetime
+from utils.time_grammar import parse_expression, tokenize
+
+# 2024-06-05 是星期三
+NOW = datetime(2024, 6, 5, 10, 17, 42)
+
+# (输入, 期望结果)；None表示不接受
+CASES = [
+    # 相对时长
+    ("3小时后", datetime(2024, 6, 5, 13, 17, 42)),
+    ("三小时以后", datetime(2024, 6, 5, 13, 17, 42)),
+    ("半小时后", datetime(2024, 6, 5, 10, 47, 42)),
+    ("1个半小时后", datetime(2024, 6, 5, 11, 47, 42)),
+    ("10分钟后", datetime(2024, 6, 5, 10, 27, 42)),
+    ("两天后", datetime(2024, 6, 7, 10, 17, 42)),
+    ("3天后上午9点", datetime(2024, 6, 8, 9, 0)),
+    ("in 3 hours", datetime(2024, 6, 5, 13, 17, 42)),
+    ("in an hour", datetime(2024, 6, 5, 11, 17, 42)),
+    ("20 min later", datetime(2024, 6, 5, 10, 37, 42)),
+    # 日期词与时刻
+    ("明天", datetime(2024, 6, 6, 9, 0)),
+    ("明天 9点", datetime(2024, 6, 6, 9, 0)),
+    ("明天下午3点半", datetime(2024, 6, 6, 15, 30)),
+    ("后天上午10点30分", datetime(2024, 6, 7, 10, 30)),
+    ("大后天", datetime(2024, 6, 8, 9, 0)),
+    ("今晚8点", datetime(2024, 6, 5, 20, 0)),
+    ("明早", datetime(2024, 6, 6, 9, 0)),
+    ("晚上12点", datetime(2024, 6, 6, 0, 0)),
+    ("中午1点", datetime(2024, 6, 5, 13, 0)),
+    ("下午", datetime(2024, 6, 5, 15, 0)),
+    ("九点一刻", datetime(2024, 6, 5, 9, 15)),
+    ("二十三点", datetime(2024, 6, 5, 23, 0)),
+    ("明天 18:00", datetime(2024, 6, 6, 18, 0)),
+    ("tomorrow 9am", datetime(2024, 6, 6, 9, 0)),
+    ("9:30pm tomorrow", datetime(2024, 6, 6, 21, 30)),
+    ("12am", datetime(2024, 6, 5, 0, 0)),
+    ("tonight", datetime(2024, 6, 5, 20, 0)),
+    # 周几
+    ("周三", datetime(2024, 6, 5, 9, 0)),
+    ("周一", datetime(2024, 6, 10, 9, 0)),
+    ("这周一", datetime(2024, 6, 3, 9, 0)),
+    ("下周一", datetime(2024, 6, 10, 9, 0)),
+    ("下周三下午2点", datetime(2024, 6, 12, 14, 0)),
+    ("星期天", datetime(2024, 6, 9, 9, 0)),
+    ("monday at 9pm", datetime(2024, 6, 10, 21, 0)),
+    ("next wed 10:30", datetime(2024, 6, 12, 10, 30)),
+    # 月日
+    ("3月5日", datetime(2024, 3, 5, 9, 0)),
+    ("12月25号 晚上8点", datetime(2024, 12, 25, 20, 0)),
+    ("15号 14:00", datetime(2024, 6, 15, 14, 0)),
+    # 拒绝的输入
+    ("明天后天", None),
+    ("3小时", None),
+    ("25点", None),
+    ("2月30日", None),
+    ("凌晨", None),
+    ("下周", None),
+    ("someday", None),
+    ("in 3 hours 5pm", None),
+]
+
+
+class TestTimeGrammar(unittest.TestCase):
+    def test_cases(self):
+        for text, expected in CASES:
+            with self.subTest(text=text):
+                self.assertEqual(parse_datetime(text, now=NOW), expected)
+    
+    def test_plain_formats_not_handled(self):
+        """纯数字格式交给常用格式解析"""
+        for text in ["18:00", "2024-12-25", "12-25 14:30", "2024-12-25 18:00"]:
+            with self.subTest(text=text):
+                self.assertIsNone(parse_expression(text))
+    
+    def test_longest_keyword_wins(self):
+        """关键字按最长匹配切分，不回溯"""
+        self.assertEqual(tokenize("大后天"), [('day', 3)])
+        self.assertEqual(tokenize("下周一"), [('weekday', 1, 0)])
+    
+    def test_expression_cached_independent_of_now(self):
+        """缓存的表达式按不同的当前时间求值"""
+        later = datetime(2024, 6, 9, 8, 0)
+        self.assertEqual(parse_datetime("明天 9点", now=NOW), datetime(2024, 6, 6, 9, 0))
+        self.assertEqual(parse_datetime("明天 9点", now=later), datetime(2024, 6, 10, 9, 0))
+    
+    def test_linear_on_long_input(self):
+        """超长的无效输入也能快速拒绝"""
+        self.assertIsNone(parse_expression("明天" * 5000 + "x"))
+        self.assertIsNone(parse_expression("1" * 10000 + "点"))
+
+if __name__ == '__main__':
+    unittest.main()
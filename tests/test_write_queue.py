@@ -0,0 +1,117 @@
+import os
+import tempfile
+import sqlite3
+import threading
+import time
+import unittest
+from managers import database
+from managers.task_manager import TaskManager
+from managers.write_queue import WriteQueue, install_writer, _STOP
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        
+        import config
+        self.original_db_path = config.DATABASE_PATH
+        config.DATABASE_PATH = self.temp_db.name
+        
+        self.task_manager = TaskManager()
+        self.writer = WriteQueue(batch_window=0.02)
+        self.writer.start()
+        install_writer(self.writer)
+    
+    def tearDown(self):
+        install_writer(None)
+        self.writer.stop()
+        
+        import config
+        config.DATABASE_PATH = self.original_db_path
+        
+        database.close_all()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.temp_db.name + suffix):
+                os.unlink(self.temp_db.name + suffix)
+    
+    def test_concurrent_writes_group_committed(self):
+        """并发写入合并为少量事务提交"""
+        def produce(n):
+            manager = TaskManager()
+            for i in range(10):
+                manager.add_task(f"线程{n}-任务{i}")
+        
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(self.task_manager.get_all_tasks()), 80)
+        stats = self.writer.stats()
+        self.assertEqual(stats['operations'], 80)
+        self.assertLess(stats['batches'], 80)
+    
+    def test_failed_operation_isolated(self):
+        """单个写操作失败只回滚自身"""
+        def bad_op(conn):
+            conn.execute("INSERT INTO tasks (content, status) VALUES ('半途失败', 'pending')")
+            raise ValueError("失败")
+        
+        good = self.writer.submit(lambda conn: conn.execute(
+            "INSERT INTO tasks (content, status, created_at) VALUES ('成功', 'pending', 0)").lastrowid)
+        bad = self.writer.submit(bad_op)
+        
+        self.assertIsNotNone(good.result(timeout=5))
+        with self.assertRaises(ValueError):
+            bad.result(timeout=5)
+        self.assertEqual([t.content for t in self.task_manager.get_all_tasks()], ["成功"])
+    
+    def test_task_manager_results_through_writer(self):
+        """经写队列执行时TaskManager返回值不变"""
+        task = self.task_manager.add_task("写队列任务")
+        self.assertIsNotNone(task.id)
+        self.assertEqual(self.task_manager.update_many([task.id, 9999], status="completed"),
+                         {task.id: True, 9999: False})
+        self.assertTrue(self.task_manager.delete_task(task.id))
+    
+    def test_submit_after_stop_rejected(self):
+        """停止开始后提交的写操作直接失败，队列中剩余的写操作也不会一直等待"""
+        release = threading.Event()
+        blocking = self.writer.submit(lambda conn: release.wait(5))
+        stopper = threading.Thread(target=self.writer.stop)
+        stopper.start()
+        while not self.writer._stopping:
+            time.sleep(0.001)
+        
+        late = self.writer.submit(lambda conn: None)
+        with self.assertRaises(RuntimeError):
+            late.result(timeout=1)
+        release.set()
+        stopper.join(5)
+        self.assertTrue(blocking.result(timeout=1))
+    
+    def test_leftover_operations_failed_on_exit(self):
+        """写线程退出时队列中排在停止标记之后的写操作得到异常"""
+        from concurrent.futures import Future
+        thread = self.writer._thread
+        leftover = Future()
+        self.writer._queue.put(_STOP)
+        self.writer._queue.put((lambda conn: None, leftover))
+        thread.join(5)
+        
+        with self.assertRaises(RuntimeError):
+            leftover.result(timeout=1)
+    
+    def test_connect_error_fails_batch(self):
+        """打开数据库失败时该批写操作得到异常，写线程继续运行"""
+        writer = WriteQueue(batch_window=0.02, path=tempfile.gettempdir())
+        writer.start()
+        self.addCleanup(writer.stop)
+        
+        with self.assertRaises(sqlite3.OperationalError):
+            writer.run(lambda conn: None, timeout=5)
+        self.assertTrue(writer.running)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import shlex
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional
+from ui.cli_handler import parse_id_ranges
+from utils.datetime_parser import parse_datetime
+from utils.recurrence import normalize_rule
+
+# JSON操作中允许的键
+_JSON_KEYS = {'op', 'content', 'priority', 'due', 'remind', 'repeat', 'ids', 'status'}
+
+_OPERATIONS = ('add', 'done', 'delete', 'update')
+
+_STATUSES = ('pending', 'completed')
+
+
+class BatchLine(NamedTuple):
+    """批量输入中的一行：解析成功时operation为TaskManager.apply_batch的操作，否则error为原因"""
+    line_no: int
+    text: str
+    operation: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class _LineParser(argparse.ArgumentParser):
+    """解析出错时抛出ValueError，而不是打印用法并退出进程"""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def _build_line_parser() -> _LineParser:
+    parser = _LineParser(prog='batch', add_help=False)
+    subparsers = parser.add_subparsers(dest='op', required=True)
+
+    add_parser = subparsers.add_parser('add', add_help=False)
+    add_parser.add_argument('content')
+    add_parser.add_argument('-p', '--priority')
+    add_parser.add_argument('-d', '--due-date', dest='due')
+    add_parser.add_argument('-r', '--remind')
+    add_parser.add_argument('-R', '--repeat')
+
+    for name in ('done', 'delete'):
+        subparsers.add_parser(name, add_help=False).add_argument('ids', nargs='+')
+
+    update_parser = subparsers.add_parser('update', add_help=False)
+    update_parser.add_argument('ids', nargs='+')
+    update_parser.add_argument('-c', '--content')
+    update_parser.add_argument('-p', '--priority')
+    update_parser.add_argument('-s', '--status', choices=_STATUSES)
+    update_parser.add_argument('-d', '--due-date', dest='due')
+    update_parser.add_argument('-r', '--remind')
+    update_parser.add_argument('-R', '--repeat')
+    return parser
+
+
+_line_parser: Optional[_LineParser] = None
+
+
+def parse_batch(lines: Iterable[str], now: Optional[datetime] = None) -> List[BatchLine]:
+    """解析批量输入，每行为一条命令（与命令行相同的写法）或一个JSON对象
+
+    空行和以#开头的注释行跳过。相对时间（如"明天 9点"）统一以now为基准解析。
+    """
+    now = now or datetime.now()
+    parsed = []
+    for line_no, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+        try:
+            op, values = _parse_json(text) if text.startswith('{') else _parse_command(text)
+            parsed.append(BatchLine(line_no, text, operation=_build_operation(op, values, now)))
+        except ValueError as e:
+            parsed.append(BatchLine(line_no, text, error=str(e)))
+    return parsed
+
+
+def _parse_command(text: str):
+    global _line_parser
+    if _line_parser is None:
+        _line_parser = _build_line_parser()
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(f"无法解析命令: {e}") from e
+    if tokens[0] not in _OPERATIONS:
+        raise ValueError(f"未知的操作: {tokens[0]}")
+    args = vars(_line_parser.parse_args(tokens))
+    op = args.pop('op')
+    # 命令行写法中未给出的选项不参与更新
+    return op, {key: value for key, value in args.items() if value is not None}
+
+
+def _parse_json(text: str):
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"无效的JSON: {e.msg}") from e
+    if not isinstance(data, dict) or not isinstance(data.get('op'), str):
+        raise ValueError("JSON操作必须是包含op字段的对象")
+    unknown = set(data) - _JSON_KEYS
+    if unknown:
+        raise ValueError(f"未知的字段: {', '.join(sorted(unknown))}")
+    data = dict(data)
+    return data.pop('op'), data
+
+
+def _parse_ids(value) -> List[int]:
+    values = value if isinstance(value, list) else [value]
+    try:
+        task_ids = parse_id_ranges(str(item) for item in values)
+    except ValueError as e:
+        raise ValueError(f"无效的任务ID: {e}") from e
+    if not task_ids:
+        raise ValueError("缺少任务ID")
+    return task_ids
+
+
+def _parse_time(value, label: str, now: datetime) -> Optional[datetime]:
+    if value is None:
+        return None
+    parsed = parse_datetime(value, now=now) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f"无效的{label}格式: {value}")
+    return parsed
+
+
+def _parse_rule(value) -> Optional[str]:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"无效的重复规则: {value}")
+    return normalize_rule(value)
+
+
+def _parse_priority(value) -> Optional[str]:
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"无效的优先级: {value}")
+    return value
+
+
+def _build_operation(op: str, values: dict, now: datetime) -> dict:
+    """校验参数并转换为TaskManager.apply_batch的操作字典"""
+    if op == 'add':
+        content = values.get('content')
+        if not isinstance(content, str) or not content.strip():
+            raise ValueError("缺少任务内容")
+        if 'ids' in values or 'status' in values:
+            raise ValueError("add操作不支持ids/status字段")
+        operation = {'op': 'add', 'content': content, 'priority': _parse_priority(values.get('priority')),
+                     'due_date': _parse_time(values.get('due'), '截止日期', now),
+                     'reminder_time': _parse_time(values.get('remind'), '提醒时间', now),
+                     'recurrence': None}
+        if values.get('repeat'):
+            if not operation['due_date'] and not operation['reminder_time']:
+                raise ValueError("重复任务需要指定提醒时间或截止日期作为起点")
+            operation['recurrence'] = _parse_rule(values['repeat'])
+        return operation
+
+    if op not in _OPERATIONS:
+        raise ValueError(f"未知的操作: {op}")
+    if 'ids' not in values:
+        raise ValueError("缺少任务ID")
+    task_ids = _parse_ids(values['ids'])
+    if op != 'update':
+        if set(values) - {'ids'}:
+            raise ValueError(f"{op}操作只支持ids字段")
+        return {'op': op, 'task_ids': task_ids}
+
+    # JSON中显式给出null表示清除该字段
+    fields = {}
+    if 'content' in values:
+        if not isinstance(values['content'], str) or not values['content'].strip():
+            raise ValueError("任务内容不能为空")
+        fields['content'] = values['content']
+    if 'priority' in values:
+        fields['priority'] = _parse_priority(values['priority'])
+    if 'status' in values:
+        if values['status'] not in _STATUSES:
+            raise ValueError(f"无效的状态: {values['status']}")
+        fields['status'] = values['status']
+    if 'due' in values:
+        fields['due_date'] = _parse_time(values['due'], '截止日期', now)
+    if 'remind' in values:
+        fields['reminder_time'] = _parse_time(values['remind'], '提醒时间', now)
+    if 'repeat' in values:
+        fields['recurrence'] = _parse_rule(values['repeat'] or None)
+    if not fields:
+        raise ValueError("update操作没有要修改的字段")
+    return {'op': 'update', 'task_ids': task_ids, 'fields': fields}
@@ -1,17 +1,74 @@
 from datetime import datetime, date
-from typing import Optional, List
-from managers.task_manager import TaskManager
-from utils.datetime_parser import parse_datetime
+from itertools import chain
+from typing import Iterable, Optional, List
+from managers.task_manager import BatchResult, TaskManager
+from managers.rpc import RPCClient, DaemonUnavailable, RPCError
+from utils.recurrence import normalize_rule, describe_rule, upcoming
+from utils.ranking import rank_tasks
 from models.task import Task
 
+# 单个ID区间最多包含的任务数，防止误输入的超大区间（如1-3000000000）耗尽内存
+MAX_ID_RANGE = 10000
+
+def parse_id_ranges(values: Iterable[str]) -> List[int]:
+    """解析任务ID参数，支持单个ID和区间，如 ["3", "5", "10-40"]"""
+    task_ids = []
+    for value in values:
+        for part in str(value).split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '-' in part:
+                start, end = part.split('-', 1)
+                start, end = int(start), int(end)
+                if start > end:
+                    raise ValueError(f"无效的ID区间: {part}")
+                if end - start >= MAX_ID_RANGE:
+                    raise ValueError(f"ID区间过大: {part}（最多{MAX_ID_RANGE}个）")
+                task_ids.extend(range(start, end + 1))
+            else:
+                task_ids.append(int(part))
+    return list(dict.fromkeys(task_ids))
+
+def format_id_ranges(task_ids: Iterable[int]) -> str:
+    """将ID列表压缩为区间表示，如 [1, 2, 3, 5] -> 1-3, 5"""
+    parts = []
+    for task_id in sorted(task_ids):
+        if parts and task_id == parts[-1][1] + 1:
+            parts[-1][1] = task_id
+        else:
+            parts.append([task_id, task_id])
+    return ', '.join(str(a) if a == b else f"{a}-{b}" for a, b in parts)
+
 class CLIHandler:
-    def __init__(self):
+    def __init__(self, daemon: Optional[RPCClient] = None):
         self.task_manager = TaskManager()
+        # 增删改请求优先交给守护进程执行，以便其同步更新提醒调度
+        self.daemon = daemon
+    
+    def _call_daemon(self, method: str, **params):
+        """调用守护进程，未配置或守护进程未运行时抛出DaemonUnavailable"""
+        if self.daemon is None:
+            raise DaemonUnavailable()
+        return self.daemon.call(method, **params)
+    
+    def _call_daemon_batch(self, method: str, task_ids: List[int]) -> Optional[dict]:
+        """调用守护进程的批量方法，返回 {ID: 是否成功}；守护进程未运行时返回None"""
+        try:
+            results = self._call_daemon(method, task_ids=task_ids)
+        except DaemonUnavailable:
+            return None
+        # JSON对象的键为字符串，转换回整数ID
+        return {int(task_id): ok for task_id, ok in results.items()}
     
     def add_task(self, content: str, priority: Optional[str] = None, 
-                 due_date: Optional[str] = None, reminder_time: Optional[str] = None):
+                 due_date: Optional[str] = None, reminder_time: Optional[str] = None,
+                 recurrence: Optional[str] = None):
+        # 时间解析（含自然语言语法）只在add命令中用到，按需导入以加快其他命令的启动
+        from utils.datetime_parser import parse_datetime
         due_datetime = None
         reminder_datetime = None
+        rule = None
         
         if due_date:
             due_datetime = parse_datetime(due_date)
@@ -25,41 +82,121 @@ class CLIHandler:
                 print(f"无效的提醒时间格式: {reminder_time}")
                 return
         
-        task = self.task_manager.add_task(content, priority, due_datetime, reminder_datetime)
+        if recurrence:
+            if not due_datetime and not reminder_datetime:
+                print("重复任务需要指定提醒时间或截止日期作为起点")
+                return
+            try:
+                rule = normalize_rule(recurrence)
+            except ValueError as e:
+                print(e)
+                return
+        
+        try:
+            task = Task.from_dict(self._call_daemon(
+                'add_task', content=content, priority=priority,
+                due_date=due_datetime.isoformat() if due_datetime else None,
+                reminder_time=reminder_datetime.isoformat() if reminder_datetime else None,
+                recurrence=rule))
+        except DaemonUnavailable:
+            task = self.task_manager.add_task(content, priority, due_datetime, reminder_datetime, rule)
+        except RPCError as e:
+            print(f"添加任务失败: {e}")
+            return
         print(f"任务已添加: [{task.id}] {task.content}")
         
         return task
     
-    def list_tasks(self):
-        tasks = self.task_manager.get_all_tasks()
-        if not tasks:
-            print("暂无任务")
+    def list_tasks(self, limit: Optional[int] = None, offset: int = 0, archived: bool = False):
+        """列出任务
+
+        默认显示全部待办任务和最近5个已完成任务；指定limit/offset时
+        按显示顺序（待办在前，已完成在后）分页。已完成任务流式读取。
+        """
+        if archived:
+            self._list_archived_tasks(limit, offset)
             return
         
-        # 按状态分组
-        pending_tasks = [t for t in tasks if t.status != "completed"]
-        completed_tasks = [t for t in tasks if t.status == "completed"]
+        # 重复任务按下一次发生时间显示和排序
+        now = datetime.now()
+        if limit is None:
+            sorted_pending = rank_tasks(
+                [upcoming(task, now) for task in self.task_manager.get_pending_tasks()], now)
+            shown_pending = sorted_pending[offset:]
+            if not offset:
+                completed_offset, completed_limit = 0, 5  # 只显示最近5个已完成任务
+            else:
+                completed_offset, completed_limit = max(0, offset - len(sorted_pending)), None
+        else:
+            # 普通任务在SQL中按紧急度排序只取前offset+limit个，再与少量重复任务合并排序
+            candidates = self.task_manager.get_ranked_pending(offset + limit, now=now)
+            candidates.extend(upcoming(task, now) for task in self.task_manager.get_recurring_tasks())
+            shown_pending = rank_tasks(candidates, now)[offset:offset + limit]
+            completed_offset = max(0, offset - self.task_manager.count_tasks("pending"))
+            completed_limit = limit - len(shown_pending)
         
-        # 对待办任务排序
-        sorted_pending = self._sort_tasks_by_priority_and_deadline(pending_tasks)
+        completed_tasks = self.task_manager.iter_tasks(status="completed", offset=completed_offset,
+                                                       limit=completed_limit)
+        first_completed = next(completed_tasks, None)
+        
+        if not shown_pending and first_completed is None:
+            print("暂无任务")
+            return
         
         print("\n任务列表:")
         print("=" * 80)
         
-        if sorted_pending:
+        if shown_pending:
             print("○ 待办任务:")
             print("-" * 80)
-            for task in sorted_pending:
+            for task in shown_pending:
                 self._print_task(task)
         
-        if completed_tasks:
+        if first_completed is not None:
             print("\n✓ 已完成任务:")
             print("-" * 80)
-            for task in completed_tasks[-5:]:  # 只显示最近5个已完成任务
+            for task in chain([first_completed], completed_tasks):
                 self._print_task(task)
         
         print("=" * 80)
     
+    def _list_archived_tasks(self, limit: Optional[int], offset: int):
+        """列出归档任务（按创建时间倒序）"""
+        tasks = self.task_manager.iter_tasks(archived=True, offset=offset, limit=limit)
+        first = next(tasks, None)
+        if first is None:
+            print("暂无归档任务")
+            return
+        
+        print("\n归档任务:")
+        print("=" * 80)
+        for task in chain([first], tasks):
+            self._print_task(task)
+        print("=" * 80)
+    
+    def archive_tasks(self, older_than_days: int):
+        """归档完成超过指定天数的任务"""
+        count = self.task_manager.archive_completed(older_than_days)
+        print(f"已归档 {count} 个完成超过 {older_than_days} 天的任务")
+        return count
+    
+    def restore_tasks(self, task_ids: List[int]):
+        """从归档中恢复任务"""
+        try:
+            results = self._call_daemon_batch('restore_tasks', task_ids)
+        except RPCError as e:
+            print(f"恢复任务失败: {e}")
+            return
+        if results is None:
+            results = self.task_manager.restore_archived(task_ids)
+        succeeded = [task_id for task_id, ok in results.items() if ok]
+        missing = [task_id for task_id, ok in results.items() if not ok]
+        if succeeded:
+            print(f"已恢复 {len(succeeded)} 个任务: [{format_id_ranges(succeeded)}]")
+        if missing:
+            print(f"归档中未找到任务: [{format_id_ranges(missing)}]")
+        return results
+    
     def _print_task(self, task: Task):
         """打印单个任务信息"""
         status_icon = "✓" if task.status == "completed" else "○"
@@ -88,43 +225,147 @@ class CLIHandler:
         
         print(f"{status_icon} [{task.id}] {task.content} {priority_str}")
         
-        info_parts = [part for part in [due_str, remind_str] if part]
+        repeat_str = f"重复: {describe_rule(task.recurrence)}" if task.recurrence else ""
+        
+        info_parts = [part for part in [due_str, remind_str, repeat_str] if part]
         if info_parts:
             print(f"    {' | '.join(info_parts)}")
     
-    def _sort_tasks_by_priority_and_deadline(self, tasks: List[Task]) -> List[Task]:
-        """按优先级和截止时间排序"""
-        priority_order = {"高": 3, "中": 2, "低": 1, None: 0}
+    def mark_done(self, task_ids):
+        if isinstance(task_ids, int):
+            task_ids = [task_ids]
+        try:
+            results = self._call_daemon_batch('mark_done', task_ids)
+        except RPCError as e:
+            print(f"标记任务失败: {e}")
+            return
+        if results is None:
+            results = self.task_manager.complete_many(task_ids)
+        self._report_results(results, "已标记为完成")
+        return results
+    
+    def delete_task(self, task_ids):
+        if isinstance(task_ids, int):
+            task_ids = [task_ids]
+        try:
+            results = self._call_daemon_batch('delete_tasks', task_ids)
+        except RPCError as e:
+            print(f"删除任务失败: {e}")
+            return
+        if results is None:
+            results = self.task_manager.delete_many(task_ids)
+        self._report_results(results, "已删除")
+        return results
+    
+    def _report_results(self, results: dict, action: str):
+        """输出批量操作结果"""
+        succeeded = [task_id for task_id, ok in results.items() if ok]
+        missing = [task_id for task_id, ok in results.items() if not ok]
         
-        def sort_key(task):
-            priority_weight = priority_order.get(task.priority, 0)
-            
-            time_weight = 0
-            if task.due_date:
-                now = datetime.now()
-                time_diff = (task.due_date - now).total_seconds()
-                if time_diff < 0:  # 过期
-                    time_weight = 1000
-                elif time_diff < 86400:  # 24小时内
-                    time_weight = 100
-                else:
-                    time_weight = max(0, 50 - time_diff / 86400)
-            
-            return -(priority_weight * 10 + time_weight)
+        if len(results) == 1:
+            task_id = next(iter(results))
+            if succeeded:
+                print(f"任务 [{task_id}] {action}")
+            else:
+                print(f"未找到任务 [{task_id}]")
+            return
         
-        return sorted(tasks, key=sort_key)
+        if succeeded:
+            print(f"{len(succeeded)} 个任务{action}: [{format_id_ranges(succeeded)}]")
+        if missing:
+            print(f"未找到任务: [{format_id_ranges(missing)}]")
     
-    def mark_done(self, task_id: int):
-        if self.task_manager.update_task(task_id, status="completed"):
-            print(f"任务 [{task_id}] 已标记为完成")
+    def run_batch(self, lines: Iterable[str], continue_on_error: bool = False) -> bool:
+        """执行批量操作并逐行输出结果，返回是否已提交
+
+        所有行先全部校验，再在同一事务中执行。默认任何一行无效或执行出错都不做
+        任何修改；continue_on_error为True时跳过出错的行，其余照常提交。
+        """
+        # batch_parser依赖本模块的parse_id_ranges，在此按需导入
+        from ui.batch_parser import parse_batch
+        batch = parse_batch(lines)
+        if not batch:
+            print("没有可执行的操作")
+            return False
+        
+        valid = [line for line in batch if line.operation is not None]
+        if len(valid) < len(batch) and not continue_on_error:
+            self._report_batch(batch, {}, committed=False)
+            print("存在无效的行，未执行任何操作（可使用 --continue-on-error 跳过无效的行）")
+            return False
+        
+        try:
+            committed, results = self._apply_batch([line.operation for line in valid], continue_on_error)
+        except RPCError as e:
+            print(f"批量操作失败: {e}")
+            return False
+        self._report_batch(batch, dict(zip((line.line_no for line in valid), results)), committed)
+        
+        failed = sum(1 for line in batch if line.error) + sum(1 for result in results if not result.ok)
+        if committed:
+            print(f"批量操作完成: 成功 {len(batch) - failed} 条，失败 {failed} 条")
         else:
-            print(f"未找到任务 [{task_id}]")
+            print("操作出错，已回滚全部操作（可使用 --continue-on-error 跳过出错的行）")
+        return committed
     
-    def delete_task(self, task_id: int):
-        if self.task_manager.delete_task(task_id):
-            print(f"任务 [{task_id}] 已删除")
-        else:
-            print(f"未找到任务 [{task_id}]")
+    def _apply_batch(self, operations: List[dict], continue_on_error: bool):
+        """优先交给守护进程执行以同步提醒调度，守护进程未运行时直接写数据库"""
+        encoded = [self._encode_operation(operation) for operation in operations]
+        try:
+            response = self._call_daemon('apply_batch', operations=encoded,
+                                         continue_on_error=continue_on_error)
+        except DaemonUnavailable:
+            return self.task_manager.apply_batch(operations, continue_on_error)
+        results = []
+        for operation, item in zip(operations, response['results']):
+            value = item['value']
+            if item['ok'] and operation['op'] == 'add':
+                value = Task.from_dict(value)
+            results.append(BatchResult(item['ok'], value, item['error']))
+        return response['committed'], results
+    
+    @staticmethod
+    def _encode_operation(operation: dict) -> dict:
+        """datetime转换为ISO文本以便通过RPC传输"""
+        def encode(values: dict) -> dict:
+            return {key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in values.items()}
+        encoded = encode(operation)
+        if 'fields' in operation:
+            encoded['fields'] = encode(operation['fields'])
+        return encoded
+    
+    def _report_batch(self, batch: list, results: dict, committed: bool):
+        """逐行输出批量操作结果，results为 {行号: BatchResult}"""
+        actions = {'done': "已标记为完成", 'delete': "已删除", 'update': "已更新"}
+        for line in batch:
+            result = results.get(line.line_no)
+            if line.error is not None:
+                status = f"✗ {line.error}"
+            elif result is None:
+                status = "- 未执行"
+            elif not result.ok:
+                status = f"✗ {result.error}"
+            elif not committed:
+                status = "↺ 已回滚"
+            elif line.operation['op'] == 'add':
+                status = f"✓ 已添加: [{result.value.id}] {result.value.content}"
+            else:
+                status = f"✓ {actions[line.operation['op']]}: [{format_id_ranges(result.value)}]"
+            print(f"第{line.line_no}行 {status}")
+    
+    def search_tasks(self, query: str, limit: int = 20):
+        """全文搜索任务并按相关度输出"""
+        tasks = self.task_manager.search(query, limit)
+        if not tasks:
+            print(f"未找到匹配的任务: {query}")
+            return
+        
+        print(f"\n搜索结果 ({len(tasks)}):")
+        print("=" * 80)
+        for task in tasks:
+            self._print_task(task)
+        print("=" * 80)
     
     def show_today_summary(self):
         """显示今日任务摘要"""
@@ -133,7 +374,7 @@ class CLIHandler:
             print("今天没有待办任务")
             return
         
-        sorted_tasks = self._sort_tasks_by_priority_and_deadline(today_tasks)
+        sorted_tasks = rank_tasks(today_tasks)
         
         print("\n⚠️ 今日任务摘要:")
         print("=" * 60)
@@ -157,22 +398,7 @@ class CLIHandler:
     
     def _get_today_tasks(self) -> List[Task]:
         """获取今日相关任务"""
-        all_tasks = self.task_manager.get_all_tasks()
-        today = date.today()
-        today_tasks = []
-        
-        for task in all_tasks:
-            if task.status == "completed":
-                continue
-            
-            if task.due_date and task.due_date.date() == today:
-                today_tasks.append(task)
-            elif task.reminder_time and task.reminder_time.date() == today:
-                today_tasks.append(task)
-            elif task.due_date and task.due_date.date() < today:
-                today_tasks.append(task)
-        
-        return today_tasks
+        return self.task_manager.get_today_tasks()
     
     def quick_add_task(self, content: str, priority: Optional[str] = None):
         """用于快速输入窗口的任务添加"""
@@ -1,13 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
+from typing import Optional
 from ui.cli_handler import CLIHandler
 from managers.reminder_manager import ReminderManager
 
 class QuickInputWindow:
-    def __init__(self):
+    def __init__(self, reminder_manager: Optional[ReminderManager] = None):
         self.cli_handler = CLIHandler()
-        self.reminder_manager = ReminderManager()
-        self.reminder_manager.start()
+        # 由守护进程传入其调度器，窗口本身不再启动调度器
+        self.reminder_manager = reminder_manager
         self.window = None
     
     def show(self):
@@ -72,7 +73,7 @@ class QuickInputWindow:
         
         task = self.cli_handler.add_task(content, priority, None, reminder_time)
         if task:  # 只有成功添加才关闭窗口
-            if task.reminder_time:
+            if task.reminder_time and self.reminder_manager:
                 self.reminder_manager.add_reminder(task)
             self.close()
     
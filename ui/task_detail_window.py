@@ -5,6 +5,7 @@ from typing import List
 from models.task import Task
 from managers.task_manager import TaskManager
 from managers.reminder_manager import ReminderManager
+from utils.ranking import rank_tasks
 
 class TaskDetailWindow:
     def __init__(self):
@@ -84,10 +85,9 @@ class TaskDetailWindow:
             widget.destroy()
         self.task_vars.clear()
         
-        # 获取任务并排序
-        all_tasks = self.task_manager.get_all_tasks()
-        pending_tasks = [t for t in all_tasks if t.status != "completed"]
-        completed_tasks = [t for t in all_tasks if t.status == "completed"]
+        # 获取任务并排序，已完成任务只读取最近10个
+        pending_tasks = self.task_manager.get_pending_tasks()
+        completed_tasks = list(self.task_manager.iter_tasks(status="completed", limit=10))
         
         sorted_pending = self._sort_tasks(pending_tasks)
         
@@ -100,10 +100,10 @@ class TaskDetailWindow:
         # 显示已完成任务
         if completed_tasks:
             self._create_section_header("✅ 已完成任务", "#27ae60")
-            for task in completed_tasks[-10:]:  # 只显示最近10个已完成任务
+            for task in completed_tasks:
                 self._create_task_item(task, True)
         
-        if not all_tasks:
+        if not pending_tasks and not completed_tasks:
             no_task_label = tk.Label(self.scrollable_frame, text="暂无任务", 
                                    font=('Arial', 14), fg='#7f8c8d', bg='#f0f0f0')
             no_task_label.pack(pady=50)
@@ -202,25 +202,7 @@ class TaskDetailWindow:
     
     def _sort_tasks(self, tasks: List[Task]) -> List[Task]:
         """按优先级和截止时间排序任务"""
-        priority_order = {"高": 3, "中": 2, "低": 1, None: 0}
-        
-        def sort_key(task):
-            priority_weight = priority_order.get(task.priority, 0)
-            
-            time_weight = 0
-            if task.due_date:
-                now = datetime.now()
-                time_diff = (task.due_date - now).total_seconds()
-                if time_diff < 0:  # 过期
-                    time_weight = 1000
-                elif time_diff < 86400:  # 24小时内
-                    time_weight = 100
-                else:
-                    time_weight = max(0, 50 - time_diff / 86400)
-            
-            return -(priority_weight * 10 + time_weight)
-        
-        return sorted(tasks, key=sort_key)
+        return rank_tasks(tasks)
     
     def _mark_completed(self):
         """标记选中任务为完成"""
@@ -229,11 +211,16 @@ class TaskDetailWindow:
             messagebox.showwarning("提示", "请选择要标记完成的任务")
             return
         
+        # 重复任务顺延到下一次发生，按新的起点重新调度提醒
+        results = self.task_manager.complete_many(selected_ids)
         for task_id in selected_ids:
-            self.task_manager.update_task(task_id, status="completed")
             self.reminder_manager.remove_reminder(task_id)
+            task = self.task_manager.get_task_by_id(task_id)
+            if task and task.status != "completed":
+                self.reminder_manager.add_reminder(task)
         
-        messagebox.showinfo("成功", f"已标记 {len(selected_ids)} 个任务为完成")
+        updated = sum(1 for ok in results.values() if ok)
+        messagebox.showinfo("成功", f"已标记 {updated} 个任务为完成")
         self._load_tasks()
     
     def _delete_selected(self):
@@ -244,11 +231,12 @@ class TaskDetailWindow:
             return
         
         if messagebox.askyesno("确认", f"确定要删除 {len(selected_ids)} 个任务吗？"):
+            results = self.task_manager.delete_many(selected_ids)
             for task_id in selected_ids:
-                self.task_manager.delete_task(task_id)
                 self.reminder_manager.remove_reminder(task_id)
             
-            messagebox.showinfo("成功", f"已删除 {len(selected_ids)} 个任务")
+            deleted = sum(1 for ok in results.values() if ok)
+            messagebox.showinfo("成功", f"已删除 {deleted} 个任务")
             self._load_tasks()
     
     def _close(self):
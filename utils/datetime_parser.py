@@ -1,35 +1,80 @@
-from datetime import datetime
-from dateutil import parser
-from typing import Optional
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from utils.time_grammar import parse_expression
 
-def parse_datetime(date_str: str) -> Optional[datetime]:
-    """解析日期时间字符串"""
-    if not date_str:
+# 解析结果缓存的条目数
+PARSE_CACHE_SIZE = 1024
+
+# 项目常用格式，按顺序尝试；未匹配时才交给dateutil
+_FULL_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{2})')
+_MONTH_DAY_TIME_RE = re.compile(r'(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{2})')
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})')
+_DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+
+
+def parse_datetime(date_str: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """解析日期时间字符串
+
+    只有时间时取今天，只有月日时取今年；也支持"明天 9点"、"3小时后"、
+    "下周一"、"tomorrow 9am"等相对表达式（相对于now）。无法解析时返回None。
+    """
+    if not date_str or not isinstance(date_str, str):
         return None
-    
+    return _parse(date_str.strip(), now or datetime.now())
+
+
+def parse_many(values: Iterable[str], now: Optional[datetime] = None) -> List[Optional[datetime]]:
+    """批量解析（用于导入），当前时间只取一次，重复的输入只解析一次"""
+    now = now or datetime.now()
+    return [_parse(value.strip(), now) if value and isinstance(value, str) else None
+            for value in values]
+
+
+def _parse(text: str, now: datetime) -> Optional[datetime]:
+    # 相对表达式的语法树与当前时间无关，按输入缓存后再以now求值
+    expression = parse_expression(text)
+    if expression is not None:
+        return expression.resolve(now)
+    return _parse_cached(text, now.date())
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(text: str, today: date) -> Optional[datetime]:
+    # 缓存键包含当天日期，跨天后"18:00"之类的输入会重新解析
+    try:
+        parsed = _parse_fast(text, today)
+    except ValueError:
+        # 格式匹配但数值越界（如13-25 10:00），交给dateutil按原有规则处理
+        parsed = None
+    return parsed if parsed is not None else _parse_fallback(text, today)
+
+
+def _parse_fast(text: str, today: date) -> Optional[datetime]:
+    match = _FULL_RE.fullmatch(text)
+    if match:
+        year, month, day, hour, minute = map(int, match.groups())
+        return datetime(year, month, day, hour, minute)
+    match = _MONTH_DAY_TIME_RE.fullmatch(text)
+    if match:
+        month, day, hour, minute = map(int, match.groups())
+        return datetime(today.year, month, day, hour, minute)
+    match = _TIME_RE.fullmatch(text)
+    if match:
+        hour, minute = map(int, match.groups())
+        return datetime(today.year, today.month, today.day, hour, minute)
+    match = _DATE_RE.fullmatch(text)
+    if match:
+        year, month, day = map(int, match.groups())
+        return datetime(year, month, day)
+    return None
+
+
+def _parse_fallback(text: str, today: date) -> Optional[datetime]:
+    # dateutil较慢，仅在常用格式都不匹配时按需导入
+    from dateutil import parser
     try:
-        return parser.parse(date_str)
-    except (ValueError, TypeError):
-        # 尝试常见格式
-        formats = [
-            '%Y-%m-%d %H:%M',
-            '%Y-%m-%d',
-            '%m-%d %H:%M',
-            '%H:%M'
-        ]
-        
-        for fmt in formats:
-            try:
-                parsed = datetime.strptime(date_str, fmt)
-                # 如果只有时间，设置为今天
-                if fmt == '%H:%M':
-                    now = datetime.now()
-                    parsed = parsed.replace(year=now.year, month=now.month, day=now.day)
-                # 如果只有月日，设置为今年
-                elif fmt == '%m-%d %H:%M':
-                    parsed = parsed.replace(year=datetime.now().year)
-                return parsed
-            except ValueError:
-                continue
-        
-        return None
\ No newline at end of file
+        return parser.parse(text, default=datetime(today.year, today.month, today.day))
+    except (ValueError, TypeError, OverflowError):
+        return None
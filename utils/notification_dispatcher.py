@@ -0,0 +1,208 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional
+import config
+
+# 队列满时的处理策略
+OVERFLOW_DROP_OLDEST = 'drop_oldest'  # 丢弃最早等待的通知
+OVERFLOW_DROP_NEWEST = 'drop_newest'  # 拒绝新通知
+OVERFLOW_BLOCK = 'block'  # 阻塞提交方直到有空位，超时后拒绝
+
+_STOP = object()
+
+
+class NotificationBackend(ABC):
+    """通知后端接口，show()在工作线程中同步执行，返回即视为通知已显示"""
+
+    @abstractmethod
+    def show(self, title: str, message: str, callback: Optional[Callable] = None, timeout: int = 10):
+        ...
+
+
+class FakeNotificationBackend(NotificationBackend):
+    """进程内的假后端，记录收到的通知，用于测试"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.shown: List[tuple] = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self._lock = threading.Lock()
+
+    def show(self, title: str, message: str, callback: Optional[Callable] = None, timeout: int = 10):
+        # 测试可清除gate来模拟卡住的后端
+        self.gate.wait()
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("通知后端故障")
+        with self._lock:
+            self.shown.append((title, message, callback, timeout))
+
+
+class _Notification(NamedTuple):
+    title: str
+    message: str
+    callback: Optional[Callable]
+    timeout: int
+    scheduled_at: float
+    enqueued_at: float
+
+
+class DeliveryRecord(NamedTuple):
+    """一条通知的投递时间线（时间戳，秒）"""
+    scheduled_at: float
+    enqueued_at: float
+    dispatched_at: float
+    shown_at: Optional[float]  # 后端失败时为None
+
+    @property
+    def queue_delay(self) -> float:
+        """计划时间到开始投递"""
+        return self.dispatched_at - self.scheduled_at
+
+    @property
+    def show_duration(self) -> Optional[float]:
+        """开始投递到显示完成"""
+        return None if self.shown_at is None else self.shown_at - self.dispatched_at
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class NotificationDispatcher:
+    """有界异步通知分发队列
+
+    通知先进入容量为max_queue的队列，由固定数量的工作线程调用后端显示，
+    慢后端不会阻塞调度线程，突发通知也不会无限制地创建线程。队列满时按
+    overflow策略处理。每条通知记录计划、入队、开始投递和显示完成的时间。
+    工作线程在第一次提交时启动；stop()之后提交的通知被拒绝，除非再次显式调用start()。
+    """
+
+    def __init__(self, backend: NotificationBackend, workers: int = None, max_queue: int = None,
+                 overflow: str = None, block_timeout: float = None, history: int = None):
+        self.backend = backend
+        self.workers = config.NOTIFY_WORKERS if workers is None else workers
+        self.max_queue = config.NOTIFY_QUEUE_SIZE if max_queue is None else max_queue
+        self.overflow = config.NOTIFY_QUEUE_OVERFLOW if overflow is None else overflow
+        self.block_timeout = config.NOTIFY_BLOCK_TIMEOUT if block_timeout is None else block_timeout
+        if self.overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK):
+            raise ValueError(f"未知的溢出策略: {self.overflow}")
+        self._queue: Deque = deque()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self.records: Deque[DeliveryRecord] = deque(
+            maxlen=config.NOTIFY_METRICS_HISTORY if history is None else history)
+        self.submitted = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def start(self):
+        with self._condition:
+            if self._threads:
+                return
+            self._stopping = False
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'echo-notify-{index}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """投递完队列中已有的通知后停止工作线程"""
+        with self._condition:
+            threads, self._threads = self._threads, []
+            self._stopping = True
+            if not threads:
+                return
+            for _ in threads:
+                self._queue.append(_STOP)
+            self._condition.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def submit(self, title: str, message: str, callback: Optional[Callable] = None,
+               timeout: int = 10, scheduled_at: Optional[float] = None) -> bool:
+        """提交通知，返回是否被接受；scheduled_at为计划显示时间，默认为当前时间"""
+        now = time.time()
+        item = _Notification(title, message, callback, timeout,
+                             now if scheduled_at is None else scheduled_at, now)
+        with self._condition:
+            self.submitted += 1
+            if self._stopping:
+                self.dropped += 1
+                return False
+            if not self._threads:
+                self.start()
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.overflow == OVERFLOW_DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif (not self._condition.wait_for(lambda: len(self._queue) < self.max_queue,
+                                                   self.block_timeout)
+                      or self._stopping):
+                    self.dropped += 1
+                    return False
+            self._queue.append(item)
+            self._condition.notify_all()
+            return True
+
+    def stats(self) -> dict:
+        """投递计数和延迟分位数（秒）"""
+        with self._condition:
+            records = list(self.records)
+            pending = sum(1 for item in self._queue if item is not _STOP)
+        queue_delays = [record.queue_delay for record in records]
+        show_durations = [record.show_duration for record in records if record.shown_at is not None]
+        return {
+            'submitted': self.submitted,
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'pending': pending,
+            'queue_delay_p50': _percentile(queue_delays, 0.5),
+            'queue_delay_p95': _percentile(queue_delays, 0.95),
+            'show_p50': _percentile(show_durations, 0.5),
+            'show_p95': _percentile(show_durations, 0.95),
+        }
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue)
+                item = self._queue.popleft()
+                # 唤醒因队列满而阻塞的提交方
+                self._condition.notify_all()
+            if item is _STOP:
+                return
+
+            dispatched_at = time.time()
+            shown_at = None
+            try:
+                self.backend.show(item.title, item.message, item.callback, item.timeout)
+                shown_at = time.time()
+            except Exception as e:
+                print(f"通知显示失败: {e}")
+            with self._condition:
+                if shown_at is None:
+                    self.failed += 1
+                else:
+                    self.delivered += 1
+                self.records.append(DeliveryRecord(item.scheduled_at, item.enqueued_at,
+                                                   dispatched_at, shown_at))
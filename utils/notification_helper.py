@@ -2,13 +2,162 @@ import os
 import sys
 import subprocess
 import threading
-from typing import Callable, Optional
-from utils.windows_notification import WindowsNotification
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+from utils.windows_notification import WindowsNotification, run_callback_async
+from utils.notification_dispatcher import NotificationBackend, NotificationDispatcher
+import config
 
-class NotificationHelper:
-    def __init__(self):
+class PendingNotification(NamedTuple):
+    title: str
+    message: str
+    callback: Optional[Callable]
+    timeout: int
+    scheduled_at: Optional[float] = None
+
+class NotificationCoalescer:
+    """通知合并与限流
+
+    收到第一条通知后等待window秒，期间到达的通知合并为一条摘要通知发送；
+    每rate_period秒最多发送max_rate条，超出时继续等待并合并到下一条摘要中。
+    等待中的通知超过max_pending条时丢弃最早的，在摘要中注明丢弃数量。
+    """
+    
+    def __init__(self, send: Callable[..., None],
+                 window: float = None, max_rate: int = None, rate_period: float = None,
+                 max_lines: int = None, max_pending: int = None):
+        self.send = send
+        self.window = config.NOTIFY_COALESCE_WINDOW if window is None else window
+        self.max_rate = config.NOTIFY_MAX_RATE if max_rate is None else max_rate
+        self.rate_period = config.NOTIFY_RATE_PERIOD if rate_period is None else rate_period
+        self.max_lines = config.NOTIFY_DIGEST_MAX_LINES if max_lines is None else max_lines
+        self.max_pending = config.NOTIFY_MAX_PENDING if max_pending is None else max_pending
+        self._pending: 'deque[PendingNotification]' = deque()
+        self._dropped = 0
+        self._sent_at: 'deque[float]' = deque()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+    
+    def add(self, title: str, message: str, callback: Optional[Callable] = None, timeout: int = 10,
+            scheduled_at: Optional[float] = None):
+        """加入一条通知，在合并窗口结束后发送"""
+        with self._lock:
+            self.received += 1
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self._dropped += 1
+                self.dropped += 1
+            self._pending.append(PendingNotification(title, message, callback, timeout, scheduled_at))
+            if self._timer is None:
+                self._arm(self.window)
+    
+    def flush(self):
+        """立即发送等待中的通知（不等待合并窗口和限流），用于停止前"""
+        with self._lock:
+            self._cancel_timer()
+            batch, dropped = self._take()
+        if batch:
+            self._deliver(batch, dropped)
+    
+    def close(self):
+        """停止计时器，丢弃等待中的通知"""
+        with self._lock:
+            self._cancel_timer()
+            self._pending.clear()
+            self._dropped = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'received': self.received,
+                'sent': self.sent,
+                'dropped': self.dropped,
+                'pending': len(self._pending),
+            }
+    
+    def _arm(self, delay: float):
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _on_timer(self):
+        with self._lock:
+            if self._timer is None or not self._pending:
+                self._timer = None
+                return
+            # 超出速率限制时推迟到最早一次发送移出统计周期后
+            now = time.monotonic()
+            while self._sent_at and now - self._sent_at[0] >= self.rate_period:
+                self._sent_at.popleft()
+            if len(self._sent_at) >= self.max_rate:
+                self._arm(self._sent_at[0] + self.rate_period - now)
+                return
+            self._timer = None
+            self._sent_at.append(now)
+            batch, dropped = self._take()
+        self._deliver(batch, dropped)
+    
+    def _take(self):
+        """取出等待中的通知（调用方需持有锁）"""
+        if self._pending:
+            self.sent += 1
+        batch = list(self._pending)
+        dropped = self._dropped
+        self._pending.clear()
+        self._dropped = 0
+        return batch, dropped
+    
+    def _deliver(self, batch: List[PendingNotification], dropped: int):
+        try:
+            if len(batch) == 1 and not dropped:
+                self.send(*batch[0])
+            else:
+                self.send(*self._digest(batch, dropped))
+        except Exception as e:
+            print(f"通知发送失败: {e}")
+    
+    def _digest(self, batch: List[PendingNotification], dropped: int) -> PendingNotification:
+        """将多条通知合并为一条摘要，每条通知取消息首行"""
+        total = len(batch) + dropped
+        lines = [f"• {item.message.splitlines()[0] if item.message else item.title}"
+                 for item in batch[:self.max_lines]]
+        hidden = total - len(lines)
+        if hidden > 0:
+            lines.append(f"…另有 {hidden} 条提醒")
+        callback = next((item.callback for item in batch if item.callback), None)
+        scheduled = [item.scheduled_at for item in batch if item.scheduled_at is not None]
+        return PendingNotification(f"{batch[0].title} ({total})", "\n".join(lines), callback,
+                                   max(item.timeout for item in batch),
+                                   min(scheduled) if scheduled else None)
+
+class NotificationHelper(NotificationBackend):
+    def __init__(self, backend: Optional[NotificationBackend] = None):
         self.use_win10toast = self._check_win10toast()
         self.windows_notification = WindowsNotification() if os.name == 'nt' else None
+        # 通知由有界队列和固定工作线程异步显示，默认后端为本类的系统通知
+        self.dispatcher = NotificationDispatcher(backend or self)
+        # 任务提醒经合并限流后发送，避免同一时刻的大量提醒逐条弹出
+        self.coalescer = NotificationCoalescer(self.show_clickable_notification)
+    
+    def show_reminder(self, title: str, message: str,
+                      callback: Optional[Callable] = None,
+                      timeout: int = 10, scheduled_at: Optional[float] = None):
+        """显示任务提醒，短时间内的多条提醒合并为一条摘要通知"""
+        self.coalescer.add(title, message, callback, timeout, scheduled_at)
+    
+    def close(self):
+        """发送等待中的提醒，等待通知队列投递完毕后停止工作线程"""
+        self.coalescer.flush()
+        self.dispatcher.stop(config.NOTIFY_STOP_TIMEOUT)
     
     def _check_win10toast(self) -> bool:
         """检查是否可以使用win10toast"""
@@ -20,8 +169,14 @@ class NotificationHelper:
     
     def show_clickable_notification(self, title: str, message: str, 
                                   callback: Optional[Callable] = None,
-                                  timeout: int = 10):
-        """显示可点击的通知"""
+                                  timeout: int = 10, scheduled_at: Optional[float] = None) -> bool:
+        """显示可点击的通知（放入通知队列异步显示），返回是否被接受"""
+        return self.dispatcher.submit(title, message, callback, timeout, scheduled_at)
+    
+    def show(self, title: str, message: str,
+             callback: Optional[Callable] = None,
+             timeout: int = 10):
+        """在通知工作线程中同步显示系统通知"""
         # 优先使用Windows原生通知
         if self.windows_notification:
             success = self.windows_notification.show_clickable_notification(title, message, callback, timeout)
@@ -40,37 +195,29 @@ class NotificationHelper:
         """使用win10toast显示通知"""
         try:
             from win10toast import ToastNotifier
-            import time
             
             toaster = ToastNotifier()
             
             # 修改消息内容，添加点击提示
             enhanced_message = message + "\n\n点击此通知打开任务界面"
             
-            def show_and_wait():
-                # 显示通知
-                toaster.show_toast(
-                    title,
-                    enhanced_message,
-                    duration=timeout,
-                    threaded=False  # 不使用线程模式
-                )
-                
-                # 检查是否被点击
-                if callback:
-                    # 简单的点击检测：如果通知在超时前消失，认为被点击
-                    start_time = time.time()
-                    time.sleep(1)  # 等待1秒检查通知状态
-                    
-                    # 这里使用一个简单的方法：如果用户在短时间内点击，触发回调
-                    # 注意：这不是完美的解决方案，但是在Windows上相对可靠
-                    try:
-                        callback()
-                    except Exception as e:
-                        print(f"执行回调失败: {e}")
+            # 已在通知工作线程中，直接同步显示
+            toaster.show_toast(
+                title,
+                enhanced_message,
+                duration=timeout,
+                threaded=False  # 不使用线程模式
+            )
             
-            # 在单独线程中运行
-            threading.Thread(target=show_and_wait, daemon=True).start()
+            # 检查是否被点击
+            if callback:
+                # 简单的点击检测：如果通知在超时前消失，认为被点击
+                time.sleep(1)  # 等待1秒检查通知状态
+                
+                # 这里使用一个简单的方法：如果用户在短时间内点击，触发回调
+                # 注意：这不是完美的解决方案，但是在Windows上相对可靠
+                # 回调会打开任务窗口，交给独立线程执行，不占用通知工作线程
+                run_callback_async(callback)
             
         except Exception as e:
             print(f"Win10Toast通知失败: {e}")
@@ -0,0 +1,136 @@
+import heapq
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+from models.task import Task
+
+# 优先级权重，未设置或未知的优先级为0
+PRIORITY_WEIGHTS = {"高": 3, "中": 2, "低": 1}
+PRIORITY_FACTOR = 10
+
+# 任务数不少于该值且安装了NumPy时，rank_tasks/top_tasks使用向量化计算。
+# benchmarks/bench_ranking.py测得约100个任务起向量化排序即更快（每个任务约节省0.7微秒），
+# 但首次使用需导入NumPy（约50毫秒），对一次性的CLI命令只有数万任务以上才划算
+VECTORIZE_MIN_TASKS = 50000
+
+# 截止时间紧急度：过期最高，24小时内次之，更远的按天线性衰减
+OVERDUE_WEIGHT = 1000
+DUE_SOON_WEIGHT = 100
+DUE_SOON_SECONDS = 86400
+FAR_BASE_WEIGHT = 50
+
+
+def urgency_score(priority: Optional[str], seconds_until_due: Optional[float]) -> float:
+    """综合权重：优先级 * 10 + 时间紧急度，越大越靠前"""
+    score = PRIORITY_WEIGHTS.get(priority, 0) * PRIORITY_FACTOR
+    if seconds_until_due is not None:
+        if seconds_until_due < 0:
+            score += OVERDUE_WEIGHT
+        elif seconds_until_due < DUE_SOON_SECONDS:
+            score += DUE_SOON_WEIGHT
+        else:
+            score += max(0, FAR_BASE_WEIGHT - seconds_until_due / DUE_SOON_SECONDS)
+    return score
+
+
+def urgency_key(now: Optional[datetime] = None) -> Callable[[Task], float]:
+    """排序键（紧急度取负），当前时间只取一次"""
+    now = now or datetime.now()
+
+    def key(task: Task) -> float:
+        due = task.due_date
+        return -urgency_score(task.priority, None if due is None else (due - now).total_seconds())
+
+    return key
+
+
+def _use_vectorized(tasks: list, vectorize: Optional[bool]) -> bool:
+    if vectorize is None:
+        vectorize = len(tasks) >= VECTORIZE_MIN_TASKS
+    return vectorize and _numpy() is not None
+
+
+def rank_tasks(tasks: Iterable[Task], now: Optional[datetime] = None,
+               vectorize: Optional[bool] = None) -> List[Task]:
+    """按优先级和截止时间排序，紧急度相同的保持原有顺序
+
+    vectorize为None时按任务数自动选择；未安装NumPy时总是使用纯Python实现。
+    """
+    tasks = list(tasks)
+    if _use_vectorized(tasks, vectorize):
+        np = _numpy()
+        order = np.argsort(-urgency_scores(tasks, now), kind='stable')
+        return [tasks[i] for i in order.tolist()]
+    return sorted(tasks, key=urgency_key(now))
+
+
+def top_tasks(tasks: Iterable[Task], k: int, now: Optional[datetime] = None,
+              vectorize: Optional[bool] = None) -> List[Task]:
+    """取最紧急的k个任务，结果与rank_tasks(tasks)[:k]相同，只需O(n log k)"""
+    tasks = list(tasks)
+    if k <= 0 or not _use_vectorized(tasks, vectorize):
+        return heapq.nsmallest(k, tasks, key=urgency_key(now))
+
+    np = _numpy()
+    keys = -urgency_scores(tasks, now)
+    if k < len(tasks):
+        # 先按第k小的键筛出候选（含并列），候选下标保持原有顺序，再稳定排序
+        threshold = np.partition(keys, k - 1)[k - 1]
+        candidates = np.flatnonzero(keys <= threshold)
+    else:
+        candidates = np.arange(len(tasks))
+    order = candidates[np.argsort(keys[candidates], kind='stable')][:k]
+    return [tasks[i] for i in order.tolist()]
+
+
+_np_module = None
+
+
+def _numpy():
+    """按需导入NumPy（可选依赖），未安装时返回None"""
+    global _np_module
+    if _np_module is None:
+        try:
+            import numpy
+            _np_module = numpy
+        except ImportError:
+            _np_module = False
+    return _np_module or None
+
+
+def urgency_scores(tasks: List[Task], now: Optional[datetime] = None):
+    """用NumPy向量化计算每个任务的紧急度（与urgency_score逐项相等），返回float64数组"""
+    np = _numpy()
+    if np is None:
+        raise RuntimeError("向量化排序需要安装numpy")
+    now = now or datetime.now()
+
+    priorities = np.fromiter((PRIORITY_WEIGHTS.get(task.priority, 0) for task in tasks),
+                             dtype=np.float64, count=len(tasks))
+    # 时间差仍由timedelta.total_seconds()计算，保证与纯Python实现逐项相等；
+    # NumPy从datetime对象构造datetime64数组反而比逐个相减慢得多
+    seconds = np.fromiter(((due - now).total_seconds() if (due := task.due_date) is not None else np.nan
+                           for task in tasks), dtype=np.float64, count=len(tasks))
+    has_due = ~np.isnan(seconds)
+
+    far = np.maximum(0, FAR_BASE_WEIGHT - seconds / DUE_SOON_SECONDS)
+    time_weights = np.where(seconds < 0, OVERDUE_WEIGHT,
+                            np.where(seconds < DUE_SOON_SECONDS, DUE_SOON_WEIGHT, far))
+    return priorities * PRIORITY_FACTOR + np.where(has_due, time_weights, 0)
+
+
+def urgency_sql(due_column: str = 'due_date', priority_column: str = 'priority') -> str:
+    """与urgency_score等价的SQL表达式，用于ORDER BY ... LIMIT在数据库中排序取前N个
+
+    表达式中的3个占位符依次绑定urgency_sql_params(now)。
+    """
+    priority_cases = ' '.join(f"WHEN '{name}' THEN {weight}" for name, weight in PRIORITY_WEIGHTS.items())
+    return (f"((CASE {priority_column} {priority_cases} ELSE 0 END) * {PRIORITY_FACTOR} + "
+            f"CASE WHEN {due_column} IS NULL THEN 0 "
+            f"WHEN {due_column} < ? THEN {OVERDUE_WEIGHT} "
+            f"WHEN {due_column} - ? < {DUE_SOON_SECONDS} THEN {DUE_SOON_WEIGHT} "
+            f"ELSE MAX(0, {FAR_BASE_WEIGHT} - ({due_column} - ?) / {float(DUE_SOON_SECONDS)}) END)")
+
+
+def urgency_sql_params(now: Optional[datetime] = None) -> Tuple[float, float, float]:
+    ts = (now or datetime.now()).timestamp()
+    return ts, ts, ts
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional
+from models.task import Task
+
+# 常用重复规则的简写
+RULE_ALIASES = {
+    'daily': 'FREQ=DAILY',
+    '每天': 'FREQ=DAILY',
+    'weekdays': 'FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR',
+    '工作日': 'FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR',
+    'weekly': 'FREQ=WEEKLY',
+    '每周': 'FREQ=WEEKLY',
+    'monthly': 'FREQ=MONTHLY',
+    '每月': 'FREQ=MONTHLY',
+    'yearly': 'FREQ=YEARLY',
+    '每年': 'FREQ=YEARLY',
+}
+
+_FREQ_NAMES = {'DAILY': '天', 'WEEKLY': '周', 'MONTHLY': '月', 'YEARLY': '年'}
+
+
+def normalize_rule(text: str) -> str:
+    """将用户输入的重复规则规范为RRULE文本（不含"RRULE:"前缀），无效时抛出ValueError"""
+    rule = RULE_ALIASES.get(text.strip().lower(), text.strip())
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[len('RRULE:'):]
+    rule = rule.upper()
+    try:
+        # 以当前时间为起点试算一次，提前发现无法解析或时区不一致的规则
+        _rule(rule, datetime.now().replace(microsecond=0)).after(datetime.now())
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"无效的重复规则: {text}") from e
+    return rule
+
+
+@lru_cache(maxsize=256)
+def _rule(rule: str, anchor: datetime):
+    # dateutil.rrule导入较慢，只在确实用到重复规则时加载
+    from dateutil.rrule import rrulestr
+    return rrulestr(rule, dtstart=anchor)
+
+
+def recurrence_anchor(task: Task) -> Optional[datetime]:
+    """重复任务的起点：优先使用提醒时间，其次使用截止日期"""
+    return task.reminder_time or task.due_date
+
+
+def next_occurrence(task: Task, after: datetime) -> Optional[datetime]:
+    """任务在after之后的下一次发生时间（严格晚于after），规则结束时返回None"""
+    anchor = recurrence_anchor(task)
+    if not task.recurrence or anchor is None:
+        return None
+    return _rule(task.recurrence, anchor).after(after)
+
+
+def occurrences_between(task: Task, start: datetime, end: datetime) -> List[datetime]:
+    """任务在[start, end)内的所有发生时间，按需计算而不写入数据库"""
+    anchor = recurrence_anchor(task)
+    if not task.recurrence or anchor is None:
+        return []
+    return [at for at in _rule(task.recurrence, anchor).between(start, end, inc=True) if at < end]
+
+
+def occurrence_of(task: Task, at: datetime) -> Task:
+    """重复任务在at发生的一次实例（仅内存中的视图，不写入数据库）
+
+    提醒时间和截止日期按相对起点的偏移一起平移。
+    """
+    offset: timedelta = at - recurrence_anchor(task)
+    return Task(task.id, task.content, task.status, task.priority,
+                task.due_date + offset if task.due_date else None,
+                task.reminder_time + offset if task.reminder_time else None,
+                task.created_at, task.recurrence)
+
+
+def advance(task: Task, now: datetime) -> Optional[Task]:
+    """完成重复任务的当前一次，返回以下一次发生时间为新起点的任务，规则已结束时返回None
+
+    当前一次与upcoming()展示给用户的一致：起点已过期或本身不符合规则时，
+    完成的是now之后（含now）的第一次，而不是数据库中的起点。
+    带COUNT的规则同步减去已完成的次数，保证总次数不变。
+    """
+    anchor = recurrence_anchor(task)
+    if not task.recurrence or anchor is None:
+        return None
+    current = next_occurrence(task, now - timedelta(seconds=1))
+    at = next_occurrence(task, current) if current else None
+    if at is None:
+        return None
+    advanced = occurrence_of(task, at)
+    advanced.recurrence = _remaining_rule(task.recurrence, anchor, at)
+    return advanced
+
+
+def _remaining_rule(rule: str, anchor: datetime, at: datetime) -> str:
+    parts = rule.split(';')
+    for index, part in enumerate(parts):
+        if part.startswith('COUNT='):
+            # COUNT规则的发生次数有限，可以直接枚举
+            remaining = sum(1 for occurrence in _rule(rule, anchor) if occurrence >= at)
+            parts[index] = f'COUNT={remaining}'
+    return ';'.join(parts)
+
+
+def upcoming(task: Task, now: Optional[datetime] = None) -> Task:
+    """重复任务返回下一次（含当前时刻）发生的实例，普通任务原样返回"""
+    if not task.recurrence:
+        return task
+    now = now or datetime.now()
+    at = next_occurrence(task, now - timedelta(seconds=1))
+    return occurrence_of(task, at) if at else task
+
+
+def describe_rule(rule: str) -> str:
+    """重复规则的简短中文描述，无法简化时返回原规则"""
+    parts = dict(part.split('=', 1) for part in rule.split(';') if '=' in part)
+    unit = _FREQ_NAMES.get(parts.get('FREQ'))
+    if unit is None or set(parts) - {'FREQ', 'INTERVAL', 'BYDAY'}:
+        return rule
+    if parts.get('BYDAY') == 'MO,TU,WE,TH,FR' and parts['FREQ'] == 'WEEKLY':
+        return '工作日'
+    if 'BYDAY' in parts:
+        return rule
+    interval = int(parts.get('INTERVAL', 1))
+    return f"每{unit}" if interval == 1 else f"每{interval}{unit}"
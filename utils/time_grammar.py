@@ -0,0 +1,306 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+# 只给出日期没有给出时间时使用的默认时刻
+DEFAULT_HOUR = 9
+
+# 只给出时段没有给出时间时使用的默认时刻
+PERIOD_DEFAULT_HOURS = {'morning': 9, 'noon': 12, 'afternoon': 15, 'dusk': 18, 'evening': 20}
+
+# 时段对钟点的修正：下午3点 -> 15点，中午1点 -> 13点
+_AFTERNOON_PERIODS = {'afternoon', 'dusk', 'evening', 'pm'}
+
+_UNIT_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800}
+
+_CN_DIGITS = {'零': 0, '〇': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4,
+              '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+
+# 中文关键字 -> (词类, 值)
+_CN_KEYWORDS = {
+    '今天': ('day', 0), '明天': ('day', 1), '后天': ('day', 2), '大后天': ('day', 3),
+    '今晚': ('day', 0, 'evening'), '明晚': ('day', 1, 'evening'),
+    '今早': ('day', 0, 'morning'), '明早': ('day', 1, 'morning'),
+    '凌晨': ('period', 'night'), '早上': ('period', 'morning'), '早晨': ('period', 'morning'),
+    '上午': ('period', 'morning'), '中午': ('period', 'noon'), '下午': ('period', 'afternoon'),
+    '傍晚': ('period', 'dusk'), '晚上': ('period', 'evening'),
+    '点钟': ('clock',), '点': ('clock',), '时': ('clock',),
+    '半': ('half',), '刻': ('quarter',), '个': ('filler',), '的': ('filler',),
+    '分钟': ('unit', 'minute'), '分': ('unit', 'minute'),
+    '小时': ('unit', 'hour'), '钟头': ('unit', 'hour'),
+    '天': ('unit', 'day'), '周': ('unit', 'week'), '星期': ('unit', 'week'), '礼拜': ('unit', 'week'),
+    '后': ('after',), '以后': ('after',), '之后': ('after',),
+    '月': ('month',), '日': ('monthday',), '号': ('monthday',),
+}
+
+# 周几：前缀为None表示最近的一个（含今天），0为本周，1为下周
+_WEEK_PREFIXES = {'周': None, '星期': None, '礼拜': None,
+                  '这周': 0, '本周': 0, '这星期': 0, '本星期': 0, '这礼拜': 0,
+                  '下周': 1, '下星期': 1, '下礼拜': 1}
+_CN_WEEKDAYS = {'一': 0, '二': 1, '三': 2, '四': 3, '五': 4, '六': 5, '日': 6, '天': 6}
+for _prefix, _week in _WEEK_PREFIXES.items():
+    for _name, _weekday in _CN_WEEKDAYS.items():
+        _CN_KEYWORDS[_prefix + _name] = ('weekday', _week, _weekday)
+
+# 英文单词 -> (词类, 值)
+_EN_WORDS = {
+    'today': ('day', 0), 'tomorrow': ('day', 1), 'tonight': ('day', 0, 'evening'),
+    'morning': ('period', 'morning'), 'noon': ('period', 'noon'),
+    'afternoon': ('period', 'afternoon'), 'evening': ('period', 'evening'),
+    'am': ('period', 'am'), 'pm': ('period', 'pm'),
+    'in': ('in',), 'later': ('after',), 'at': ('filler',), 'a': ('one',), 'an': ('one',),
+    'this': ('week', 0), 'next': ('week', 1),
+    'min': ('unit', 'minute'), 'mins': ('unit', 'minute'),
+    'minute': ('unit', 'minute'), 'minutes': ('unit', 'minute'),
+    'h': ('unit', 'hour'), 'hr': ('unit', 'hour'), 'hrs': ('unit', 'hour'),
+    'hour': ('unit', 'hour'), 'hours': ('unit', 'hour'),
+    'day': ('unit', 'day'), 'days': ('unit', 'day'),
+    'week': ('unit', 'week'), 'weeks': ('unit', 'week'),
+}
+for _index, _name in enumerate(['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']):
+    _EN_WORDS[_name] = ('weekday', None, _index)
+    _EN_WORDS[_name[:3]] = ('weekday', None, _index)
+
+# 单一主正则：每个位置只尝试一次，关键字按长度降序排列保证最长匹配（大后天优先于后天）。
+# 数字限定长度，超长输入在切分阶段即被拒绝
+_TOKEN_RE = re.compile('|'.join([
+    r'(?P<space>[\s,，]+)',
+    r'(?P<num>\d{1,4})',
+    r'(?P<colon>[:：])',
+    r'(?P<keyword>' + '|'.join(sorted(_CN_KEYWORDS, key=len, reverse=True)) + ')',
+    r'(?P<cnum>[零〇一二两三四五六七八九十]{1,4})',
+    r'(?P<word>[a-z]+)',
+]))
+
+
+class TimeExpression(NamedTuple):
+    """解析后的时间表达式，与当前时间无关，可缓存后按不同的now求值"""
+    offset: Optional[timedelta] = None  # 相对时间：3小时后
+    day: Optional[int] = None  # 相对今天的天数
+    weekday: Optional[Tuple[Optional[int], int]] = None  # (周前缀, 周几)
+    month_day: Optional[Tuple[Optional[int], int]] = None  # (月, 日)，月为None表示本月
+    period: Optional[str] = None
+    hour: Optional[int] = None
+    minute: int = 0
+
+    def resolve(self, now: datetime) -> Optional[datetime]:
+        """以now为基准求出具体时间，日期或时刻无效时返回None"""
+        if self.offset is not None:
+            return now.replace(microsecond=0) + self.offset
+
+        target = now.date()
+        if self.day is not None:
+            target += timedelta(days=self.day)
+        elif self.weekday is not None:
+            week, weekday = self.weekday
+            if week is None:
+                target += timedelta(days=(weekday - target.weekday()) % 7)
+            else:
+                target += timedelta(days=7 * week + weekday - target.weekday())
+        elif self.month_day is not None:
+            month, day = self.month_day
+            try:
+                target = target.replace(month=month or target.month, day=day)
+            except ValueError:
+                return None
+
+        hour = self.hour
+        if hour is None:
+            if self.period is None:
+                hour = DEFAULT_HOUR
+            elif self.period in PERIOD_DEFAULT_HOURS:
+                hour = PERIOD_DEFAULT_HOURS[self.period]
+            else:
+                return None
+        elif self.period in _AFTERNOON_PERIODS and hour < 12:
+            hour += 12
+        elif self.period == 'noon' and hour < 11:
+            hour += 12
+        elif self.period == 'am' and hour == 12:
+            hour = 0
+        elif self.period == 'evening' and hour == 12:
+            # 晚上12点即次日零点
+            hour = 0
+            target += timedelta(days=1)
+        if hour > 23 or self.minute > 59:
+            return None
+        return datetime(target.year, target.month, target.day, hour, self.minute)
+
+
+def _chinese_number(text: str) -> int:
+    if '十' not in text:
+        value = 0
+        for char in text:
+            value = value * 10 + _CN_DIGITS[char]
+        return value
+    tens, _, ones = text.partition('十')
+    if '十' in ones or len(tens) > 1 or len(ones) > 1:
+        raise ValueError(text)
+    return (_CN_DIGITS[tens] if tens else 1) * 10 + (_CN_DIGITS[ones] if ones else 0)
+
+
+def tokenize(text: str) -> Optional[List[tuple]]:
+    """单遍扫描切分词元，遇到无法识别的字符返回None"""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            return None
+        pos = match.end()
+        kind, value = match.lastgroup, match.group()
+        if kind == 'num':
+            tokens.append(('num', int(value)))
+        elif kind == 'cnum':
+            try:
+                tokens.append(('num', _chinese_number(value)))
+            except (KeyError, ValueError):
+                return None
+        elif kind == 'keyword':
+            tokens.append(_CN_KEYWORDS[value])
+        elif kind == 'word':
+            token = _EN_WORDS.get(value)
+            if token is None:
+                return None
+            tokens.append(token)
+        elif kind == 'colon':
+            tokens.append(('colon',))
+    return [token for token in tokens if token[0] != 'filler']
+
+
+class _Parser:
+    """按词元从左到右解析，只向前看固定个数的词元，不回溯"""
+
+    def __init__(self, tokens: List[tuple]):
+        self.tokens = tokens
+        self.pos = 0
+        self.fields = {}
+
+    def peek(self, offset: int = 0) -> tuple:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else ('end',)
+
+    def take(self, kind: str) -> Optional[tuple]:
+        token = self.peek()
+        if token[0] != kind:
+            return None
+        self.pos += 1
+        return token
+
+    def set(self, name: str, value):
+        # 每个成分只能出现一次，"明天后天"之类的输入直接拒绝
+        if name in self.fields:
+            raise ValueError(name)
+        self.fields[name] = value
+
+    def parse(self) -> TimeExpression:
+        while self.peek()[0] != 'end':
+            kind = self.peek()[0]
+            if kind == 'in':
+                self.pos += 1
+                self.set('offset', self.duration())
+            elif kind in ('num', 'half', 'one') and self.is_duration():
+                self.set('offset', self.duration())
+                if not self.take('after'):
+                    raise ValueError('after')
+            elif kind == 'num':
+                self.clock_or_date()
+            elif kind == 'day':
+                token = self.tokens[self.pos]
+                self.pos += 1
+                self.set('day', token[1])
+                if len(token) > 2:
+                    self.set('period', token[2])
+            elif kind == 'week':
+                week = self.take('week')[1]
+                token = self.take('weekday')
+                if token is None:
+                    raise ValueError('weekday')
+                self.set('weekday', (week, token[2]))
+            elif kind == 'weekday':
+                token = self.tokens[self.pos]
+                self.pos += 1
+                self.set('weekday', (token[1], token[2]))
+            elif kind == 'period':
+                self.set('period', self.tokens[self.pos][1])
+                self.pos += 1
+            else:
+                raise ValueError(kind)
+        offset = self.fields.get('offset')
+        if offset is not None and len(self.fields) > 1:
+            # "3天后上午9点"：整天数的偏移与时刻组合时按日期处理
+            if offset % timedelta(days=1) or self.fields.keys() & {'day', 'weekday', 'month_day'}:
+                raise ValueError('offset')
+            self.fields['day'] = self.fields.pop('offset').days
+        return TimeExpression(**self.fields)
+
+    def is_duration(self) -> bool:
+        """当前位置是否为时长：数量后紧跟时间单位（可带"半"）"""
+        kind = self.peek()[0]
+        if kind == 'half':
+            return self.peek(1)[0] == 'unit'
+        following = self.peek(1)
+        if following[0] == 'half':
+            following = self.peek(2)
+        return following[0] == 'unit'
+
+    def duration(self) -> timedelta:
+        if self.take('half'):
+            amount = 0.5
+        else:
+            token = self.take('num') or self.take('one')
+            if token is None:
+                raise ValueError('amount')
+            amount = token[1] if token[0] == 'num' else 1
+            if self.take('half'):
+                amount += 0.5
+        unit = self.take('unit')
+        if unit is None:
+            raise ValueError('unit')
+        return timedelta(seconds=amount * _UNIT_SECONDS[unit[1]])
+
+    def clock_or_date(self):
+        number = self.take('num')[1]
+        if self.take('month'):
+            day = self.take('num')
+            if day is None or not self.take('monthday'):
+                raise ValueError('month_day')
+            self.set('month_day', (number, day[1]))
+        elif self.take('monthday'):
+            self.set('month_day', (None, number))
+        elif self.take('clock'):
+            self.set('hour', number)
+            if self.take('half'):
+                self.set('minute', 30)
+            elif self.peek()[0] == 'num':
+                minute = self.take('num')[1]
+                if self.take('quarter'):
+                    minute *= 15
+                elif self.peek() == ('unit', 'minute'):
+                    self.pos += 1
+                self.set('minute', minute)
+        elif self.take('colon'):
+            minute = self.take('num')
+            if minute is None:
+                raise ValueError('minute')
+            self.set('hour', number)
+            self.set('minute', minute[1])
+        elif self.peek() in (('period', 'am'), ('period', 'pm')):
+            self.set('hour', number)
+        else:
+            raise ValueError('num')
+
+
+@lru_cache(maxsize=1024)
+def parse_expression(text: str) -> Optional[TimeExpression]:
+    """解析中英文相对时间表达式（明天 9点、3小时后、下周一、tomorrow 9am），
+    不是自然语言表达式或无法解析时返回None"""
+    tokens = tokenize(text.lower())
+    # 只有数字和冒号的输入（如18:00）交给常用格式解析
+    if not tokens or all(token[0] in ('num', 'colon') for token in tokens):
+        return None
+    try:
+        return _Parser(tokens).parse()
+    except ValueError:
+        return None
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional, Union
+
+def to_epoch(dt: Optional[datetime]) -> Optional[int]:
+    """将本地时间datetime转换为整数时间戳（秒）"""
+    if dt is None:
+        return None
+    return int(dt.timestamp())
+
+def from_epoch(ts: Optional[int]) -> Optional[datetime]:
+    """将整数时间戳转换为本地时间datetime"""
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts)
+
+def iso_to_epoch(value: Union[str, int, float, None]) -> Optional[int]:
+    """将旧版ISO-8601文本时间转换为整数时间戳，无法解析时返回None"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return to_epoch(datetime.fromisoformat(value))
+    except (TypeError, ValueError):
+        return None
@@ -6,29 +6,56 @@ import threading
 import time
 from typing import Callable, Optional
 
+
+def run_callback_async(callback: Callable):
+    """在独立线程中执行通知点击回调
+
+    回调通常会打开任务窗口并阻塞在Tk主循环中，不能占用点击监听线程或通知工作线程。
+    """
+    def run():
+        try:
+            callback()
+        except Exception as e:
+            print(f"执行回调失败: {e}")
+
+    threading.Thread(target=run, name="echo-notification-click", daemon=True).start()
+
 class WindowsNotification:
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
         self.flag_file = os.path.join(self.temp_dir, "echo_notification_clicked.flag")
+        # 正在显示的通知: (进程, 截止时间, 点击回调)
+        self._active = []
+        self._lock = threading.Lock()
+        self._monitor = None
     
     def show_clickable_notification(self, title: str, message: str, 
                                   callback: Optional[Callable] = None,
                                   timeout: int = 10):
-        """显示可点击的Windows通知"""
+        """显示可点击的Windows通知
+
+        启动PowerShell进程后立即返回，点击事件由唯一的监听线程统一检查，
+        不再为每条通知创建线程。
+        """
         try:
             # 清理旧的标志文件
-            if os.path.exists(self.flag_file):
-                os.remove(self.flag_file)
+            with self._lock:
+                if not self._active and os.path.exists(self.flag_file):
+                    os.remove(self.flag_file)
             
             # 创建PowerShell脚本来显示通知
             ps_script = self._create_powershell_script(title, message)
             
-            # 在后台线程中执行
-            threading.Thread(
-                target=self._run_notification_with_callback,
-                args=(ps_script, callback, timeout),
-                daemon=True
-            ).start()
+            process = subprocess.Popen([
+                'powershell', '-Command', ps_script
+            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
+            creationflags=subprocess.CREATE_NO_WINDOW)
+            
+            with self._lock:
+                self._active.append((process, time.time() + timeout + 5, callback))  # 多等5秒
+                if self._monitor is None:
+                    self._monitor = threading.Thread(target=self._monitor_clicks, daemon=True)
+                    self._monitor.start()
             
             return True
             
@@ -64,47 +91,37 @@ $notify.Dispose()
 '''
         return script
     
-    def _run_notification_with_callback(self, ps_script: str, 
-                                      callback: Optional[Callable], 
-                                      timeout: int):
-        """运行通知并监听点击事件"""
-        try:
-            # 执行PowerShell脚本
-            process = subprocess.Popen([
-                'powershell', '-Command', ps_script
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-            creationflags=subprocess.CREATE_NO_WINDOW)
+    def _monitor_clicks(self):
+        """监听点击事件，所有通知都结束后退出"""
+        while True:
+            with self._lock:
+                now = time.time()
+                expired = [entry for entry in self._active if entry[1] <= now]
+                self._active = [entry for entry in self._active if entry[1] > now]
+                clicked = self._active[-1] if self._active and os.path.exists(self.flag_file) else None
+                if not self._active and clicked is None:
+                    self._monitor = None
             
-            # 监听点击事件
-            start_time = time.time()
-            while time.time() - start_time < timeout + 5:  # 多等5秒
-                if os.path.exists(self.flag_file):
-                    # 通知被点击了
-                    print("通知被点击，正在打开任务界面...")
-                    if callback:
-                        try:
-                            callback()
-                        except Exception as e:
-                            print(f"执行回调失败: {e}")
-                    
-                    # 清理标志文件
-                    try:
-                        os.remove(self.flag_file)
-                    except:
-                        pass
-                    break
-                
-                time.sleep(0.5)  # 每0.5秒检查一次
+            for process, _, _ in expired:
+                # 确保进程结束
+                try:
+                    process.terminate()
+                except:
+                    pass
             
-            # 确保进程结束
-            try:
-                process.terminate()
-            except:
-                pass
-                
-        except Exception as e:
-            print(f"运行通知脚本失败: {e}")
-            # 备用方案：显示简单提示
-            print(f"通知: {title} - {message}")
-            if callback:
-                print("要打开任务界面，请运行: python main.py show")
\ No newline at end of file
+            if clicked is not None:
+                # 通知被点击了（标志文件不区分通知，按最近一条的回调处理）
+                print("通知被点击，正在打开任务界面...")
+                # 清理标志文件
+                try:
+                    os.remove(self.flag_file)
+                except:
+                    pass
+                callback = clicked[2]
+                if callback:
+                    run_callback_async(callback)
+            
+            with self._lock:
+                if self._monitor is not threading.current_thread():
+                    return
+            time.sleep(0.5)  # 每0.5秒检查一次